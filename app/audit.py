@@ -4,6 +4,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
 from app.models import AuditActorType, AuditLog
@@ -86,3 +87,73 @@ def log_audit(
         },
     )
     return audit
+
+
+def log_audit_many(
+    db: Session,
+    rows: list[dict[str, Any]],
+    *,
+    request_id: str | None = None,
+    asynchronous_commit: bool = False,
+) -> int:
+    if not rows:
+        return 0
+    ts_utc = datetime.now(timezone.utc)
+    values = [
+        {
+            "ts_utc": ts_utc,
+            "actor_type": row["actor_type"],
+            "actor_id": row["actor_id"],
+            "module": row.get("module") or "CORE",
+            "event_type": row.get("event_type"),
+            "employee_id": row.get("employee_id"),
+            "device_id": row.get("device_id"),
+            "action": row["action"],
+            "entity_type": row.get("entity_type"),
+            "entity_id": row.get("entity_id"),
+            "ip": row.get("ip"),
+            "user_agent": row.get("user_agent"),
+            "success": bool(row["success"]),
+            "details": row.get("details") or {},
+        }
+        for row in rows
+    ]
+    try:
+        if asynchronous_commit:
+            # Best-effort rows: skip waiting for the WAL flush; only this transaction is affected.
+            db.execute(text("SET LOCAL synchronous_commit TO OFF"))
+        db.execute(insert(AuditLog), values)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception(
+            "audit_log_write_failed",
+            extra={
+                "request_id": request_id,
+                "actions": sorted({value["action"] for value in values}),
+                "row_count": len(values),
+            },
+        )
+        return 0
+
+    for value in values:
+        logger.info(
+            "audit_event",
+            extra={
+                "request_id": request_id,
+                "action": value["action"],
+                "audit_module": value["module"],
+                "event_type": value["event_type"],
+                "actor_type": value["actor_type"].value,
+                "actor_id": value["actor_id"],
+                "employee_id": value["employee_id"],
+                "device_id": value["device_id"],
+                "entity_type": value["entity_type"],
+                "entity_id": value["entity_id"],
+                "ip": value["ip"],
+                "user_agent": value["user_agent"],
+                "success": value["success"],
+                "details": value["details"],
+            },
+        )
+    return len(values)
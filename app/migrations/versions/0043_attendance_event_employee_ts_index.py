@@ -0,0 +1,31 @@
+"""attendance event employee/ts index
+
+Revision ID: 0043_attendance_event_employee_ts_index
+Revises: 0042_employee_conversations
+Create Date: 2026-04-06 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0043_attendance_event_employee_ts_index"
+down_revision = "0042_employee_conversations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_attendance_events_employee_ts_active",
+        "attendance_events",
+        ["employee_id", "ts_utc"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_events_employee_ts_active", table_name="attendance_events")
@@ -0,0 +1,29 @@
+"""admin daily report archive date/id index
+
+Revision ID: 0044_admin_daily_report_archive_date_id_index
+Revises: 0043_attendance_event_employee_ts_index
+Create Date: 2026-04-07 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0044_admin_daily_report_archive_date_id_index"
+down_revision = "0043_attendance_event_employee_ts_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_admin_daily_report_archives_report_date_id",
+        "admin_daily_report_archives",
+        ["report_date", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_admin_daily_report_archives_report_date_id", table_name="admin_daily_report_archives")
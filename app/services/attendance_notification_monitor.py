@@ -5,7 +5,7 @@ from datetime import date, datetime, time, timedelta, timezone
 import hashlib
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
@@ -30,7 +30,10 @@ from app.services.attendance import (
     _normalize_ts,
     _resolve_active_open_shift_event,
 )
-from app.services.schedule_plans import resolve_effective_plan_for_employee_day
+from app.services.schedule_plans import (
+    resolve_effective_plan_for_employee_day,
+    resolve_effective_plans_for_employees_day,
+)
 from app.services.weekday_shift_assignments import (
     resolve_employee_day_shift_candidates,
     select_employee_preferred_shift,
@@ -102,6 +105,7 @@ class DayAssessment:
     override_note: str | None
     has_any_activity: bool
     checkin_outside_shift: bool | None
+    existing_event_hashes: frozenset[str] | None = None
 
     @property
     def shift_window_local(self) -> str:
@@ -227,6 +231,8 @@ def _resolve_shift_for_day(
     employee: Employee,
     local_day: date,
     first_checkin_event: AttendanceEvent | None,
+    plans_by_employee_id: dict[int, DepartmentSchedulePlan] | None = None,
+    shifts_by_id: dict[int, DepartmentShift] | None = None,
 ) -> tuple[
     DepartmentSchedulePlan | None,
     DepartmentShift | None,
@@ -249,7 +255,10 @@ def _resolve_shift_for_day(
         overtime_grace_minutes = max(0, int(work_rule.overtime_grace_minutes or 0))
         off_shift_tolerance_minutes = max(0, int(work_rule.off_shift_tolerance_minutes or 0))
 
-    plan = resolve_effective_plan_for_employee_day(session, employee=employee, day_date=local_day)
+    if plans_by_employee_id is not None:
+        plan = plans_by_employee_id.get(employee.id)
+    else:
+        plan = resolve_effective_plan_for_employee_day(session, employee=employee, day_date=local_day)
     if plan is not None:
         if plan.daily_minutes_planned is not None:
             planned_minutes = max(1, int(plan.daily_minutes_planned))
@@ -260,7 +269,12 @@ def _resolve_shift_for_day(
         if plan.off_shift_tolerance_minutes is not None:
             off_shift_tolerance_minutes = max(0, int(plan.off_shift_tolerance_minutes))
 
-    default_shift = session.get(DepartmentShift, employee.shift_id) if employee.shift_id is not None else None
+    def get_shift(shift_id: int) -> DepartmentShift | None:
+        if shifts_by_id is not None and shift_id in shifts_by_id:
+            return shifts_by_id[shift_id]
+        return session.get(DepartmentShift, shift_id)
+
+    default_shift = get_shift(employee.shift_id) if employee.shift_id is not None else None
     weekday_shift_candidates = resolve_employee_day_shift_candidates(
         session,
         employee=employee,
@@ -272,7 +286,7 @@ def _resolve_shift_for_day(
     )
     effective_shift: DepartmentShift | None = None
     if plan is not None and plan.shift_id is not None:
-        effective_shift = session.get(DepartmentShift, plan.shift_id)
+        effective_shift = get_shift(plan.shift_id)
     if effective_shift is None and weekday_shift is not None:
         effective_shift = weekday_shift
     if effective_shift is None and default_shift is not None:
@@ -280,7 +294,7 @@ def _resolve_shift_for_day(
     if effective_shift is None and first_checkin_event is not None:
         shift_id = _extract_shift_id_from_flags(first_checkin_event.flags)
         if shift_id is not None:
-            effective_shift = session.get(DepartmentShift, shift_id)
+            effective_shift = get_shift(shift_id)
 
     override_active = plan is not None and (
         plan.shift_id is not None
@@ -425,6 +439,9 @@ def _build_day_assessment(
     *,
     employee: Employee,
     local_day: date,
+    plans_by_employee_id: dict[int, DepartmentSchedulePlan] | None = None,
+    shifts_by_id: dict[int, DepartmentShift] | None = None,
+    existing_event_hashes: frozenset[str] | None = None,
 ) -> DayAssessment | None:
     manual_override = _resolve_manual_override(session, employee_id=employee.id, local_day=local_day)
     if manual_override is not None and manual_override.is_absent:
@@ -451,6 +468,8 @@ def _build_day_assessment(
         employee=employee,
         local_day=local_day,
         first_checkin_event=first_checkin_event,
+        plans_by_employee_id=plans_by_employee_id,
+        shifts_by_id=shifts_by_id,
     )
 
     if first_checkin_event is not None:
@@ -557,9 +576,32 @@ def _build_day_assessment(
         override_note=override_note,
         has_any_activity=has_any_activity,
         checkin_outside_shift=checkin_outside_shift,
+        existing_event_hashes=existing_event_hashes,
     )
 
 
+def _monitor_base_payload(*, assessment: DayAssessment, event_ts_utc: datetime) -> dict[str, Any]:
+    employee = assessment.employee
+    return {
+        "employee_id": employee.id,
+        "employee_full_name": employee.full_name,
+        "region_name": assessment.region_name,
+        "department_name": assessment.department_name,
+        "shift_date": assessment.local_day.isoformat(),
+        "event_ts_utc": event_ts_utc.isoformat(),
+        "event_ts_local": _format_local_dt(event_ts_utc),
+        "shift_window_local": assessment.shift_window_local,
+        "shift_name": assessment.shift.name if assessment.shift is not None else None,
+        "first_checkin_local": _format_local_dt(assessment.first_checkin_ts_utc),
+        "checkout_local": _format_local_dt(assessment.checkout_ts_utc),
+        "checkout_source": assessment.checkout_source,
+        "checkout_is_manual": assessment.checkout_is_manual,
+        "checkout_is_auto": assessment.checkout_is_auto,
+        "override_active": assessment.override_active,
+        "override_note": assessment.override_note,
+    }
+
+
 def _monitor_payload(
     *,
     assessment: DayAssessment,
@@ -572,27 +614,15 @@ def _monitor_payload(
     actual_time_summary: str,
     suggested_action: str,
     extra: dict[str, Any] | None = None,
+    base_payload: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
+    if base_payload is None:
+        base_payload = _monitor_base_payload(assessment=assessment, event_ts_utc=event_ts_utc)
     payload: dict[str, Any] = {
-        "employee_id": assessment.employee.id,
-        "employee_full_name": assessment.employee.full_name,
-        "region_name": assessment.region_name,
-        "department_name": assessment.department_name,
-        "shift_date": assessment.local_day.isoformat(),
+        **base_payload,
         "notification_type": notification_type,
         "audience": audience,
         "risk_level": risk_level,
-        "event_ts_utc": event_ts_utc.isoformat(),
-        "event_ts_local": _format_local_dt(event_ts_utc),
-        "shift_window_local": assessment.shift_window_local,
-        "shift_name": assessment.shift.name if assessment.shift is not None else None,
-        "first_checkin_local": _format_local_dt(assessment.first_checkin_ts_utc),
-        "checkout_local": _format_local_dt(assessment.checkout_ts_utc),
-        "checkout_source": assessment.checkout_source,
-        "checkout_is_manual": assessment.checkout_is_manual,
-        "checkout_is_auto": assessment.checkout_is_auto,
-        "override_active": assessment.override_active,
-        "override_note": assessment.override_note,
         "title": title,
         "description": description,
         "actual_time_summary": actual_time_summary,
@@ -635,6 +665,30 @@ def _count_consecutive_late_days(session: Session, *, employee_id: int, local_da
     return streak_days
 
 
+def _prefetch_department_shifts(session: Session, *, shift_ids: set[int]) -> dict[int, DepartmentShift]:
+    if not shift_ids:
+        return {}
+    return {
+        shift.id: shift
+        for shift in session.scalars(
+            select(DepartmentShift).where(DepartmentShift.id.in_(sorted(shift_ids)))
+        ).all()
+    }
+
+
+def _load_existing_event_hashes(session: Session, *, local_days: list[date]) -> frozenset[str]:
+    # Event hashes embed the local day, so only jobs for these days can collide; older
+    # rows written before local_day was stored are included so the unique hash never trips.
+    return frozenset(
+        session.scalars(
+            select(NotificationJob.event_hash).where(
+                or_(NotificationJob.local_day.in_(local_days), NotificationJob.local_day.is_(None)),
+                NotificationJob.event_hash.is_not(None),
+            )
+        ).all()
+    )
+
+
 def _create_notification_job(
     session: Session,
     *,
@@ -649,6 +703,7 @@ def _create_notification_job(
     actual_time_summary: str,
     suggested_action: str,
     extra_payload: dict[str, Any] | None = None,
+    base_payload: dict[str, Any] | None = None,
 ) -> NotificationJob | None:
     event_variant = (
         ABSENCE_ADMIN_SUMMARY_EVENT_VARIANT
@@ -662,9 +717,13 @@ def _create_notification_job(
         audience=audience,
         variant=event_variant,
     )
-    existing = session.scalar(select(NotificationJob).where(NotificationJob.event_hash == event_hash))
-    if existing is not None:
-        return None
+    if assessment.existing_event_hashes is not None:
+        if event_hash in assessment.existing_event_hashes:
+            return None
+    else:
+        existing = session.scalar(select(NotificationJob).where(NotificationJob.event_hash == event_hash))
+        if existing is not None:
+            return None
 
     payload = _monitor_payload(
         assessment=assessment,
@@ -677,6 +736,7 @@ def _create_notification_job(
         actual_time_summary=actual_time_summary,
         suggested_action=suggested_action,
         extra=extra_payload,
+        base_payload=base_payload,
     )
     job = NotificationJob(
         employee_id=assessment.employee.id,
@@ -724,6 +784,8 @@ def _schedule_for_both_audiences(
     admin_action: str,
     extra_payload: dict[str, Any] | None = None,
 ) -> None:
+    # Both audiences describe the same event, so the shared payload fields are built once.
+    base_payload = _monitor_base_payload(assessment=assessment, event_ts_utc=event_ts_utc)
     if notification_type in EMPLOYEE_ATTENDANCE_MONITOR_NOTIFICATION_TYPES:
         employee_job = _create_notification_job(
             session,
@@ -738,6 +800,7 @@ def _schedule_for_both_audiences(
             actual_time_summary=actual_time_summary,
             suggested_action=employee_action,
             extra_payload=extra_payload,
+            base_payload=base_payload,
         )
         if employee_job is not None:
             created_jobs.append(employee_job)
@@ -755,6 +818,7 @@ def _schedule_for_both_audiences(
         actual_time_summary=actual_time_summary,
         suggested_action=admin_action,
         extra_payload=extra_payload,
+        base_payload=base_payload,
     )
     if admin_job is not None:
         created_jobs.append(admin_job)
@@ -1182,7 +1246,8 @@ def schedule_attendance_monitor_notifications(
 
     session = db
     reference_utc = _normalize_ts(now_utc)
-    local_today = reference_utc.astimezone(_attendance_timezone()).date()
+    tz = _attendance_timezone()
+    local_today = reference_utc.astimezone(tz).date()
     candidate_days = [local_today - timedelta(days=1), local_today]
     employees = list(
         session.scalars(
@@ -1192,6 +1257,26 @@ def schedule_attendance_monitor_notifications(
         ).all()
     )
 
+    plans_by_day = {
+        local_day: resolve_effective_plans_for_employees_day(
+            session,
+            employees=employees,
+            day_date=local_day,
+        )
+        for local_day in candidate_days
+    }
+    existing_event_hashes = _load_existing_event_hashes(session, local_days=candidate_days)
+    shifts_by_id = _prefetch_department_shifts(
+        session,
+        shift_ids={employee.shift_id for employee in employees if employee.shift_id is not None}
+        | {
+            plan.shift_id
+            for plans_by_employee_id in plans_by_day.values()
+            for plan in plans_by_employee_id.values()
+            if plan.shift_id is not None
+        },
+    )
+
     created_jobs: list[NotificationJob] = []
     any_db_change = False
 
@@ -1201,18 +1286,25 @@ def schedule_attendance_monitor_notifications(
             employee=employee,
             reference_ts_utc=reference_utc,
         )
+        active_open_local_day = (
+            _normalize_ts(active_open_event.ts_utc).astimezone(tz).date()
+            if active_open_event is not None and active_open_event.employee_id == employee.id
+            else None
+        )
 
         for local_day in candidate_days:
-            assessment = _build_day_assessment(session, employee=employee, local_day=local_day)
+            assessment = _build_day_assessment(
+                session,
+                employee=employee,
+                local_day=local_day,
+                plans_by_employee_id=plans_by_day[local_day],
+                shifts_by_id=shifts_by_id,
+                existing_event_hashes=existing_event_hashes,
+            )
             if assessment is None:
                 continue
 
-            is_active_open_day = (
-                active_open_event is not None
-                and active_open_event.employee_id == employee.id
-                and _normalize_ts(active_open_event.ts_utc).astimezone(_attendance_timezone()).date() == local_day
-            )
-            open_event = active_open_event if is_active_open_day else None
+            open_event = active_open_event if active_open_local_day == local_day else None
 
             _schedule_late_checkin(session, created_jobs=created_jobs, assessment=assessment)
             _schedule_off_shift_activity(session, created_jobs=created_jobs, assessment=assessment)
@@ -6,9 +6,10 @@ from typing import Any
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.audit import log_audit
+from app.audit import log_audit_many
 from app.db import SessionLocal
 from app.models import AdminUser, AuditActorType, Employee, NotificationJob, ScheduledNotificationTask
 from app.services.attendance import _attendance_timezone
@@ -237,9 +238,6 @@ def _build_job_for_task(
     target_ids = _task_target_ids(task, audience)
     audience_key = "employee" if audience == TASK_TARGET_EMPLOYEES else "admin"
     idempotency_key = f"{TASK_JOB_TYPE}:{task.id}:{occurrence_date.isoformat()}:{audience_key}"
-    existing = session.scalar(select(NotificationJob).where(NotificationJob.idempotency_key == idempotency_key))
-    if existing is not None:
-        return None
 
     event_id = f"TASK-{task.id}-{occurrence_date.strftime('%Y%m%d')}-{audience_key.upper()}"
     target_summary = _scope_label(audience, scope)
@@ -270,31 +268,36 @@ def _build_job_for_task(
     primary_employee_id = target_ids[0] if audience == TASK_TARGET_EMPLOYEES and len(target_ids) == 1 else None
     primary_admin_user_id = target_ids[0] if audience == TASK_TARGET_ADMINS and len(target_ids) == 1 else None
 
-    job = NotificationJob(
-        employee_id=primary_employee_id,
-        admin_user_id=primary_admin_user_id,
-        job_type=TASK_JOB_TYPE,
-        notification_type=TASK_NOTIFICATION_TYPE,
-        audience=audience_key,
-        risk_level="Bilgi",
-        event_id=event_id,
-        event_hash=_task_event_hash(idempotency_key),
-        local_day=occurrence_date,
-        event_ts_utc=scheduled_at_utc,
-        title=task.title,
-        description=task.message,
-        shift_summary=task.name,
-        actual_time_summary=str(payload["actual_time_summary"]),
-        suggested_action="Bilgilendirme amacli planli gonderim.",
-        payload=payload,
-        scheduled_at_utc=scheduled_at_utc,
-        status="PENDING",
-        attempts=0,
-        last_error=None,
-        idempotency_key=idempotency_key,
-    )
-    session.add(job)
-    return job
+    row = {
+        "employee_id": primary_employee_id,
+        "admin_user_id": primary_admin_user_id,
+        "job_type": TASK_JOB_TYPE,
+        "notification_type": TASK_NOTIFICATION_TYPE,
+        "audience": audience_key,
+        "risk_level": "Bilgi",
+        "event_id": event_id,
+        "event_hash": _task_event_hash(idempotency_key),
+        "local_day": occurrence_date,
+        "event_ts_utc": scheduled_at_utc,
+        "title": task.title,
+        "description": task.message,
+        "shift_summary": task.name,
+        "actual_time_summary": str(payload["actual_time_summary"]),
+        "suggested_action": "Bilgilendirme amacli planli gonderim.",
+        "payload": payload,
+        "scheduled_at_utc": scheduled_at_utc,
+        "status": "PENDING",
+        "attempts": 0,
+        "last_error": None,
+        "idempotency_key": idempotency_key,
+    }
+    inserted = session.scalars(
+        pg_insert(NotificationJob)
+        .on_conflict_do_nothing(index_elements=[NotificationJob.idempotency_key])
+        .returning(NotificationJob),
+        [row],
+    ).all()
+    return inserted[0] if inserted else None
 
 
 def enqueue_due_scheduled_notification_tasks(
@@ -316,6 +319,7 @@ def enqueue_due_scheduled_notification_tasks(
     )
 
     created_jobs: list[NotificationJob] = []
+    audit_rows: list[dict[str, Any]] = []
     changed = False
     for task in tasks:
         next_run_at_utc = get_task_next_run_at_utc(task, reference_utc=reference_utc)
@@ -344,26 +348,26 @@ def enqueue_due_scheduled_notification_tasks(
             task.is_active = False
         changed = True
 
-        log_audit(
-            session,
-            actor_type=AuditActorType.SYSTEM,
-            actor_id="notification_task_scheduler",
-            action="SCHEDULED_NOTIFICATION_TASK_ENQUEUED",
-            success=True,
-            entity_type="scheduled_notification_task",
-            entity_id=str(task.id),
-            details={
-                "task_name": task.name,
-                "target": task.target,
-                "schedule_kind": task.schedule_kind,
-                "occurrence_date": occurrence_date.isoformat(),
-                "scheduled_at_utc": next_run_at_utc.isoformat(),
-                "created_job_ids": [job.id for job in created_jobs if job.id is not None],
-            },
+        audit_rows.append(
+            {
+                "actor_type": AuditActorType.SYSTEM,
+                "actor_id": "notification_task_scheduler",
+                "action": "SCHEDULED_NOTIFICATION_TASK_ENQUEUED",
+                "success": True,
+                "entity_type": "scheduled_notification_task",
+                "entity_id": str(task.id),
+                "details": {
+                    "task_name": task.name,
+                    "target": task.target,
+                    "schedule_kind": task.schedule_kind,
+                    "occurrence_date": occurrence_date.isoformat(),
+                    "scheduled_at_utc": next_run_at_utc.isoformat(),
+                    "created_job_ids": [job.id for job in created_jobs if job.id is not None],
+                },
+            }
         )
 
     if changed:
         session.commit()
-        for job in created_jobs:
-            session.refresh(job)
+    log_audit_many(session, audit_rows)
     return created_jobs
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import base64
+from bisect import bisect_left
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
 import hashlib
 import logging
 import os
@@ -10,12 +11,16 @@ import re
 import smtplib
 import unicodedata
 from email.message import EmailMessage
-from typing import Any
+from email.policy import SMTP as SMTP_EMAIL_POLICY
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Callable
 
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, case, delete, func, literal_column, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, selectinload
 
-from app.audit import log_audit
+from app.audit import log_audit_many
 from app.db import SessionLocal
 from app.models import (
     AdminNotificationEmailTarget,
@@ -25,6 +30,7 @@ from app.models import (
     AttendanceEvent,
     AttendanceType,
     Department,
+    DepartmentSchedulePlan,
     DepartmentShift,
     Device,
     Employee,
@@ -50,9 +56,10 @@ from app.services.attendance import (
     _normalize_ts,
 )
 from app.services.push_notifications import send_push_to_admins, send_push_to_employees
-from app.services.schedule_plans import resolve_effective_plan_for_employee_day
+from app.services.schedule_plans import resolve_effective_plans_for_employees_day
 from app.services.weekday_shift_assignments import (
-    resolve_employee_day_shift_candidates,
+    build_department_weekday_shift_map,
+    list_department_weekday_shift_assignments,
     select_employee_preferred_shift,
 )
 from app.settings import get_public_base_url, get_settings
@@ -69,6 +76,9 @@ DEFAULT_OFF_SHIFT_TOLERANCE_MINUTES = 0
 DEFAULT_ESCALATION_DELAY_MINUTES = 30
 DEFAULT_MISSED_CHECKOUT_NIGHTLY_REMINDER_LOCAL_TIME = time(21, 30)
 MAX_NOTIFICATION_ATTEMPTS = 5
+EMAIL_BATCH_ABORT_MIN_ATTEMPTS = 3
+EMAIL_BATCH_ABORT_FAILURE_RATIO_DENOMINATOR = 3
+EMAIL_BATCH_IDLE_PROBE_SECONDS = 30.0
 JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT = "EMPLOYEE_MISSED_CHECKOUT"
 JOB_TYPE_ADMIN_ESCALATION_MISSED_CHECKOUT = "ADMIN_ESCALATION_MISSED_CHECKOUT"
 JOB_TYPE_EMPLOYEE_OVERTIME_9H = "EMPLOYEE_OVERTIME_9H"
@@ -81,11 +91,22 @@ JOB_TYPE_ADMIN_SCHEDULED_BROADCAST = "ADMIN_SCHEDULED_BROADCAST"
 JOB_TYPE_DEMO_MONITOR = "DEMO_MONITOR"
 DRIVER_DEPARTMENT_KEYWORDS = ("surucu", "sofor", "driver")
 GROUPED_ADMIN_ABSENCE_PREVIEW_LIMIT = 8
+AUTO_CHECKOUT_REPAIR_YIELD_PER = 500
+ARCHIVE_EMPLOYEE_INDEX_YIELD_PER = 1000
 
 logger = logging.getLogger("app.notifications")
 
 ARCHIVE_DATA_ENC_PREFIX = b"ENCV1:"
-EMAIL_ADDRESS_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+ADMIN_NOTIFICATION_EMAILS_SESSION_INFO_KEY = "admin_notification_emails"
+EMAIL_ADDRESS_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+HHMM_LOCAL_TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{1,2})")
+_match_email_address = EMAIL_ADDRESS_PATTERN.fullmatch
+
+
+@lru_cache(maxsize=1)
+def _build_archive_file_cipher(material: str) -> Fernet:
+    derived = base64.urlsafe_b64encode(hashlib.sha256(material.encode("utf-8")).digest())
+    return Fernet(derived)
 
 
 def _archive_file_cipher() -> Fernet | None:
@@ -98,8 +119,7 @@ def _archive_file_cipher() -> Fernet | None:
         or (settings.jwt_secret or "").strip()
         or "dev-archive-vault-key"
     )
-    derived = base64.urlsafe_b64encode(hashlib.sha256(material.encode("utf-8")).digest())
-    return Fernet(derived)
+    return _build_archive_file_cipher(material)
 
 
 def encrypt_archive_file_data(raw_file_data: bytes) -> bytes:
@@ -144,6 +164,21 @@ class OpenShiftNotificationRecord:
     checkin_outside_shift: bool | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class _OpenShiftLookups:
+    plans_by_employee_id: dict[int, DepartmentSchedulePlan]
+    manual_overrides_by_employee_id: dict[int, ManualDayOverride]
+    work_rules_by_department_id: dict[int, WorkRule]
+    weekday_shifts_by_department_id: dict[int, list[DepartmentShift]]
+    shifts_by_id: dict[int, DepartmentShift]
+
+
+@dataclass(frozen=True, slots=True)
+class _EmployeeLabel:
+    full_name: str
+    department_name: str | None = None
+
+
 @dataclass(frozen=True, slots=True)
 class NotificationMessage:
     recipients: list[str]
@@ -169,10 +204,8 @@ class NotificationChannel:
 
 
 def normalize_notification_email(value: str) -> str | None:
-    normalized = " ".join((value or "").strip().lower().split())
-    if not normalized:
-        return None
-    if not EMAIL_ADDRESS_PATTERN.match(normalized):
+    normalized = (value or "").strip().lower()
+    if "@" not in normalized or _match_email_address(normalized) is None:
         return None
     return normalized
 
@@ -191,13 +224,21 @@ def list_admin_notification_email_targets(
     return list(session.scalars(stmt).all())
 
 
+def _active_admin_emails(session: Session) -> list[str]:
+    stmt = (
+        select(AdminNotificationEmailTarget.email)
+        .where(AdminNotificationEmailTarget.is_active.is_(True))
+        .order_by(
+            AdminNotificationEmailTarget.email.asc(),
+            AdminNotificationEmailTarget.id.asc(),
+        )
+    )
+    return [email for email in session.scalars(stmt).all() if (email or "").strip()]
+
+
 def get_admin_notification_email_recipients(session: Session) -> list[str]:
     try:
-        return [
-            row.email
-            for row in list_admin_notification_email_targets(session, include_inactive=False)
-            if (row.email or "").strip()
-        ]
+        return _active_admin_emails(session)
     except Exception as exc:
         logger.warning(
             "admin_notification_email_targets_unavailable",
@@ -213,12 +254,12 @@ def replace_admin_notification_email_targets(
     actor_username: str | None,
 ) -> list[AdminNotificationEmailTarget]:
     actor = (actor_username or "").strip() or "admin"
-    normalized_emails = sorted(
-        {
+    normalized_emails = list(
+        dict.fromkeys(
             normalized
             for normalized in (normalize_notification_email(item) for item in emails)
             if normalized is not None
-        }
+        )
     )
 
     existing_rows = list_admin_notification_email_targets(session, include_inactive=True)
@@ -247,6 +288,8 @@ def replace_admin_notification_email_targets(
             row.updated_by_username = actor
 
     session.commit()
+    session.info.pop(ADMIN_NOTIFICATION_EMAILS_SESSION_INFO_KEY, None)
+    # Rows are expired by the commit; one list query reloads them all instead of a refresh per row.
     return list_admin_notification_email_targets(session, include_inactive=True)
 
 
@@ -257,15 +300,15 @@ def send_admin_notification_test_email(
     subject: str | None = None,
     body: str | None = None,
 ) -> dict[str, Any]:
-    resolved_recipients = sorted(
-        {
+    resolved_recipients = list(
+        dict.fromkeys(
             normalized
             for normalized in (
                 normalize_notification_email(item)
                 for item in (recipients or get_admin_notification_email_recipients(session))
             )
             if normalized is not None
-        }
+        )
     )
     email_channel = EmailChannel()
     message = NotificationMessage(
@@ -279,13 +322,23 @@ def send_admin_notification_test_email(
         "ok": sent_count > 0,
         "sent": sent_count,
         "mode": str(result.get("mode") or "unknown"),
-        "recipients": resolved_recipients,
+        "recipients": sorted(resolved_recipients),
         "configured": bool(email_channel.enabled and email_channel.configured),
         "error": None if sent_count > 0 else str(result.get("error") or result.get("mode") or "EMAIL_NOT_SENT"),
         "channel": email_channel.config_status(),
     }
 
 
+def _is_smtp_connection_failure(exc: BaseException) -> bool:
+    if isinstance(
+        exc,
+        (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPAuthenticationError),
+    ):
+        return True
+    # SMTPException subclasses OSError, so plain socket errors are told apart from SMTP replies.
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
 class EmailChannel(NotificationChannel):
     def __init__(self) -> None:
         settings = get_settings()
@@ -297,6 +350,87 @@ class EmailChannel(NotificationChannel):
         self.smtp_from = (os.getenv("SMTP_FROM") or "").strip()
         self.smtp_use_tls = (os.getenv("SMTP_USE_TLS") or "true").strip().lower() not in {"0", "false", "no"}
         self.configured = bool(self.smtp_host and self.smtp_from)
+        self._batch_open = False
+        self._smtp: smtplib.SMTP | None = None
+        self._smtp_last_used = 0.0
+        self._batch_attempts = 0
+        self._batch_failures = 0
+        self._message_template: EmailMessage | None = None
+
+    def __enter__(self) -> EmailChannel:
+        self.open()
+        return self
+
+    def __exit__(self, *_exc_info: Any) -> None:
+        self.close()
+
+    def open(self) -> None:
+        self._batch_open = True
+        self._batch_attempts = 0
+        self._batch_failures = 0
+        self._message_template = None
+
+    def close(self) -> None:
+        self._batch_open = False
+        self._message_template = None
+        smtp_client, self._smtp = self._smtp, None
+        if smtp_client is None:
+            return
+        try:
+            smtp_client.quit()
+        except Exception:
+            smtp_client.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_client = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15)
+        try:
+            if self.smtp_use_tls:
+                smtp_client.starttls()
+            if self.smtp_user:
+                smtp_client.login(self.smtp_user, self.smtp_pass)
+        except Exception:
+            smtp_client.close()
+            raise
+        return smtp_client
+
+    def _batch_connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            # Back-to-back sends trust the open session; only an idle one may have been dropped by the server.
+            if monotonic() - self._smtp_last_used < EMAIL_BATCH_IDLE_PROBE_SECONDS:
+                return self._smtp
+            try:
+                status_code, _reply = self._smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                status_code = 0
+            if status_code == 250:
+                return self._smtp
+            self._smtp.close()
+            self._smtp = None
+        self._smtp = self._connect()
+        self._smtp_last_used = monotonic()
+        return self._smtp
+
+    def _batch_aborted(self) -> bool:
+        return (
+            self._batch_attempts >= EMAIL_BATCH_ABORT_MIN_ATTEMPTS
+            and self._batch_failures * EMAIL_BATCH_ABORT_FAILURE_RATIO_DENOMINATOR >= self._batch_attempts
+        )
+
+    def _send_in_batch(self, email_message: EmailMessage) -> None:
+        self._batch_attempts += 1
+        try:
+            self._batch_connection().send_message(email_message)
+            self._smtp_last_used = monotonic()
+        except Exception as exc:
+            # Refused recipients and other per-message replies leave the session usable;
+            # only a broken connection counts toward aborting the batch.
+            if not _is_smtp_connection_failure(exc):
+                raise
+            self._batch_failures += 1
+            if self._smtp is not None:
+                self._smtp.close()
+                self._smtp = None
+            raise
 
     def send(self, message: NotificationMessage) -> dict[str, Any]:
         recipients = [item.strip() for item in message.recipients if item and item.strip()]
@@ -341,24 +475,58 @@ class EmailChannel(NotificationChannel):
                 "recipients": recipients,
             }
 
-        email_message = EmailMessage()
-        email_message["From"] = self.smtp_from
-        email_message["To"] = ", ".join(recipients)
-        email_message["Subject"] = message.subject
-        email_message.set_content(message.body)
+        if self._batch_open and self._batch_aborted():
+            logger.warning(
+                "email_channel_batch_aborted",
+                extra={
+                    "subject": message.subject,
+                    "batch_attempts": self._batch_attempts,
+                    "batch_failures": self._batch_failures,
+                },
+            )
+            return {
+                "mode": "batch_aborted",
+                "sent": 0,
+                "recipients": recipients,
+            }
 
-        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15) as smtp_client:
-            if self.smtp_use_tls:
-                smtp_client.starttls()
-            if self.smtp_user:
-                smtp_client.login(self.smtp_user, self.smtp_pass)
-            smtp_client.send_message(email_message)
+        email_message = self._build_email_message(
+            recipients=recipients,
+            subject=message.subject,
+            body=message.body,
+        )
+
+        if self._batch_open:
+            self._send_in_batch(email_message)
+        else:
+            with self._connect() as smtp_client:
+                smtp_client.send_message(email_message)
         return {
             "mode": "sent",
             "sent": len(recipients),
             "recipients": recipients,
         }
 
+    def _build_email_message(self, *, recipients: list[str], subject: str, body: str) -> EmailMessage:
+        # Explicit charset/CTE skips set_content's try-every-encoding heuristic;
+        # the SMTP policy keeps non-ASCII (Turkish) subjects encodable.
+        if self._batch_open and self._message_template is not None:
+            # Batch sends are sequential and serialized by send_message, so the
+            # previous message can be cleared and refilled in place.
+            email_message = self._message_template
+            del email_message["To"]
+            del email_message["Subject"]
+            email_message.clear_content()
+        else:
+            email_message = EmailMessage(policy=SMTP_EMAIL_POLICY)
+            email_message["From"] = self.smtp_from
+            if self._batch_open:
+                self._message_template = email_message
+        email_message["To"] = ", ".join(recipients)
+        email_message["Subject"] = subject
+        email_message.set_content(body, charset="utf-8", cte="quoted-printable")
+        return email_message
+
     def config_status(self) -> dict[str, Any]:
         missing_fields: list[str] = []
         if not self.smtp_host:
@@ -409,22 +577,21 @@ def _parse_shift_id_from_flags(flags: dict[str, Any] | None) -> int | None:
 
 
 def _parse_hhmm_local_time(raw: str | None) -> time | None:
-    normalized = (raw or "").strip()
-    if not normalized:
-        return None
-    parts = normalized.split(":")
-    if len(parts) != 2:
+    match = HHMM_LOCAL_TIME_PATTERN.fullmatch((raw or "").strip())
+    if match is None:
         return None
-    hour_text, minute_text = parts
-    if not hour_text.isdigit() or not minute_text.isdigit():
-        return None
-    hour = int(hour_text)
-    minute = int(minute_text)
-    if hour < 0 or hour > 23 or minute < 0 or minute > 59:
+    hour = int(match.group(1))
+    minute = int(match.group(2))
+    if hour > 23 or minute > 59:
         return None
     return time(hour=hour, minute=minute)
 
 
+def _format_local_minute(value: datetime) -> str:
+    # Same output as strftime("%Y-%m-%d %H:%M") without re-parsing the format per call.
+    return f"{value.year:04d}-{value.month:02d}-{value.day:02d} {value.hour:02d}:{value.minute:02d}"
+
+
 def _nightly_missed_checkout_local_time() -> time:
     settings = get_settings()
     parsed = _parse_hhmm_local_time(settings.missed_checkout_nightly_reminder_local_time)
@@ -482,19 +649,101 @@ def _is_checkin_outside_shift(
     return not in_shift_window
 
 
+def _load_open_shift_lookups(
+    session: Session,
+    *,
+    candidates: list[tuple[Employee, AttendanceEvent]],
+    local_day: date,
+) -> _OpenShiftLookups:
+    employees = [employee for employee, _first_in_event in candidates]
+    employee_ids = [employee.id for employee in employees]
+    department_ids = sorted(
+        {employee.department_id for employee in employees if employee.department_id is not None}
+    )
+
+    plans_by_employee_id = resolve_effective_plans_for_employees_day(
+        session,
+        employees=employees,
+        day_date=local_day,
+    )
+
+    manual_overrides_by_employee_id: dict[int, ManualDayOverride] = {}
+    if employee_ids:
+        for manual_override in session.scalars(
+            select(ManualDayOverride).where(
+                ManualDayOverride.employee_id.in_(employee_ids),
+                ManualDayOverride.day_date == local_day,
+            )
+        ).all():
+            manual_overrides_by_employee_id.setdefault(manual_override.employee_id, manual_override)
+
+    work_rules_by_department_id: dict[int, WorkRule] = {}
+    weekday_shifts_by_department_id: dict[int, list[DepartmentShift]] = {}
+    if department_ids:
+        for work_rule in session.scalars(
+            select(WorkRule)
+            .where(WorkRule.department_id.in_(department_ids))
+            .order_by(WorkRule.id.asc())
+        ).all():
+            work_rules_by_department_id.setdefault(work_rule.department_id, work_rule)
+        weekday_shift_map = build_department_weekday_shift_map(
+            list_department_weekday_shift_assignments(
+                session,
+                department_ids=department_ids,
+                weekday=local_day.weekday(),
+                active_only=True,
+            )
+        )
+        weekday_shifts_by_department_id = {
+            department_id: list(weekday_shift_map[department_id][local_day.weekday()])
+            for department_id in weekday_shift_map
+        }
+
+    shifts_by_id: dict[int, DepartmentShift] = {}
+    shift_ids: set[int] = set()
+    for employee, first_in_event in candidates:
+        if employee.shift is not None:
+            shifts_by_id[employee.shift.id] = employee.shift
+        elif employee.shift_id is not None:
+            shift_ids.add(employee.shift_id)
+        plan = plans_by_employee_id.get(employee.id)
+        if plan is not None and plan.shift_id is not None:
+            shift_ids.add(plan.shift_id)
+        event_shift_id = _parse_shift_id_from_flags(first_in_event.flags)
+        if event_shift_id is not None:
+            shift_ids.add(event_shift_id)
+    shift_ids.difference_update(shifts_by_id)
+    if shift_ids:
+        for shift in session.scalars(
+            select(DepartmentShift).where(DepartmentShift.id.in_(sorted(shift_ids)))
+        ).all():
+            shifts_by_id[shift.id] = shift
+
+    return _OpenShiftLookups(
+        plans_by_employee_id=plans_by_employee_id,
+        manual_overrides_by_employee_id=manual_overrides_by_employee_id,
+        work_rules_by_department_id=work_rules_by_department_id,
+        weekday_shifts_by_department_id=weekday_shifts_by_department_id,
+        shifts_by_id=shifts_by_id,
+    )
+
+
 def _build_open_shift_record(
     session: Session,
     *,
     employee: Employee,
     local_day: date,
     first_in_event: AttendanceEvent,
+    lookups: _OpenShiftLookups | None = None,
 ) -> OpenShiftNotificationRecord | None:
-    manual_override = session.scalar(
-        select(ManualDayOverride).where(
-            ManualDayOverride.employee_id == employee.id,
-            ManualDayOverride.day_date == local_day,
+    if lookups is None:
+        lookups = _load_open_shift_lookups(
+            session,
+            candidates=[(employee, first_in_event)],
+            local_day=local_day,
         )
-    )
+
+    manual_override = lookups.manual_overrides_by_employee_id.get(employee.id)
     if manual_override is not None and (manual_override.is_absent or manual_override.out_ts is not None):
         return None
 
@@ -502,19 +751,13 @@ def _build_open_shift_record(
     grace_minutes = DEFAULT_GRACE_MINUTES
     off_shift_tolerance_minutes = DEFAULT_OFF_SHIFT_TOLERANCE_MINUTES
     if employee.department_id is not None:
-        work_rule = session.scalar(
-            select(WorkRule).where(WorkRule.department_id == employee.department_id)
-        )
+        work_rule = lookups.work_rules_by_department_id.get(employee.department_id)
         if work_rule is not None:
             planned_minutes = work_rule.daily_minutes_planned
             grace_minutes = work_rule.grace_minutes
             off_shift_tolerance_minutes = max(0, int(work_rule.off_shift_tolerance_minutes or 0))
 
-    plan = resolve_effective_plan_for_employee_day(
-        session,
-        employee=employee,
-        day_date=local_day,
-    )
+    plan = lookups.plans_by_employee_id.get(employee.id)
     if plan is not None:
         if plan.daily_minutes_planned is not None:
             planned_minutes = plan.daily_minutes_planned
@@ -525,24 +768,20 @@ def _build_open_shift_record(
 
     shift: DepartmentShift | None = None
     if plan is not None and plan.shift_id is not None:
-        shift = session.get(DepartmentShift, plan.shift_id)
-    if shift is None:
+        shift = lookups.shifts_by_id.get(plan.shift_id)
+    if shift is None and employee.department_id is not None:
         weekday_shift = select_employee_preferred_shift(
             employee=employee,
-            shifts=resolve_employee_day_shift_candidates(
-                session,
-                employee=employee,
-                day_date=local_day,
-            ),
+            shifts=lookups.weekday_shifts_by_department_id.get(employee.department_id, []),
         )
         if weekday_shift is not None:
             shift = weekday_shift
     if shift is None and employee.shift_id is not None:
-        shift = session.get(DepartmentShift, employee.shift_id)
+        shift = lookups.shifts_by_id.get(employee.shift_id)
     if shift is None:
         event_shift_id = _parse_shift_id_from_flags(first_in_event.flags)
         if event_shift_id is not None:
-            shift = session.get(DepartmentShift, event_shift_id)
+            shift = lookups.shifts_by_id.get(event_shift_id)
 
     shift_end_local_dt = _resolve_shift_end_local_dt(
         local_day=local_day,
@@ -557,10 +796,8 @@ def _build_open_shift_record(
         minutes=DEFAULT_ESCALATION_DELAY_MINUTES
     )
     department_name: str | None = None
-    if employee.department_id is not None:
-        department = session.get(Department, employee.department_id)
-        if department is not None and department.name:
-            department_name = department.name
+    if employee.department is not None and employee.department.name:
+        department_name = employee.department.name
     checkin_outside_shift = _is_checkin_outside_shift(
         first_checkin_ts_utc=first_in_event.ts_utc,
         shift=shift,
@@ -600,46 +837,54 @@ def get_employees_with_open_shift(
     employees = list(
         session.scalars(
             select(Employee)
+            .options(selectinload(Employee.department), selectinload(Employee.shift))
             .where(Employee.is_active.is_(True))
             .order_by(Employee.id.asc())
         ).all()
     )
+    if not employees:
+        return []
+    employees_by_id = {employee.id: employee for employee in employees}
 
-    records: list[OpenShiftNotificationRecord] = []
-    for employee in employees:
-        first_in = session.scalar(
-            select(AttendanceEvent)
-            .where(
-                AttendanceEvent.employee_id == employee.id,
-                AttendanceEvent.type == AttendanceType.IN,
-                AttendanceEvent.ts_utc >= day_start_utc,
-                AttendanceEvent.ts_utc < day_end_utc,
-                AttendanceEvent.deleted_at.is_(None),
-            )
-            .order_by(AttendanceEvent.ts_utc.asc(), AttendanceEvent.id.asc())
+    day_events = session.scalars(
+        select(AttendanceEvent)
+        .where(
+            AttendanceEvent.employee_id.in_(list(employees_by_id)),
+            AttendanceEvent.ts_utc >= day_start_utc,
+            AttendanceEvent.ts_utc < day_end_utc,
+            AttendanceEvent.deleted_at.is_(None),
         )
-        if first_in is None:
-            continue
-
-        last_out = session.scalar(
-            select(AttendanceEvent)
-            .where(
-                AttendanceEvent.employee_id == employee.id,
-                AttendanceEvent.type == AttendanceType.OUT,
-                AttendanceEvent.ts_utc >= day_start_utc,
-                AttendanceEvent.ts_utc < day_end_utc,
-                AttendanceEvent.deleted_at.is_(None),
-            )
-            .order_by(AttendanceEvent.ts_utc.desc(), AttendanceEvent.id.desc())
+        .order_by(
+            AttendanceEvent.employee_id.asc(),
+            AttendanceEvent.ts_utc.asc(),
+            AttendanceEvent.id.asc(),
         )
-        if last_out is not None:
-            continue
+    ).all()
+    first_in_by_employee_id: dict[int, AttendanceEvent] = {}
+    checked_out_employee_ids: set[int] = set()
+    for event in day_events:
+        if event.type == AttendanceType.OUT:
+            checked_out_employee_ids.add(event.employee_id)
+        elif event.type == AttendanceType.IN:
+            first_in_by_employee_id.setdefault(event.employee_id, event)
+
+    candidates = [
+        (employees_by_id[employee_id], first_in)
+        for employee_id, first_in in sorted(first_in_by_employee_id.items())
+        if employee_id in employees_by_id and employee_id not in checked_out_employee_ids
+    ]
+    if not candidates:
+        return []
 
+    lookups = _load_open_shift_lookups(session, candidates=candidates, local_day=local_day)
+    records: list[OpenShiftNotificationRecord] = []
+    for employee, first_in in candidates:
         record = _build_open_shift_record(
             session,
             local_day=local_day,
             employee=employee,
             first_in_event=first_in,
+            lookups=lookups,
         )
         if record is not None:
             records.append(record)
@@ -663,37 +908,64 @@ def get_employees_with_stale_open_shift(
     employees = list(
         session.scalars(
             select(Employee)
+            .options(selectinload(Employee.department), selectinload(Employee.shift))
             .where(Employee.is_active.is_(True))
             .order_by(Employee.id.asc())
         ).all()
     )
+    if not employees:
+        return []
+    employees_by_id = {employee.id: employee for employee in employees}
 
-    records: list[OpenShiftNotificationRecord] = []
-    for employee in employees:
-        latest_event = session.scalar(
-            select(AttendanceEvent)
-            .where(
-                AttendanceEvent.employee_id == employee.id,
-                AttendanceEvent.deleted_at.is_(None),
+    # One LIMIT 1 probe per employee walks the (employee_id, ts_utc) index instead of
+    # sorting every employee's full event history.
+    latest_event_id = (
+        select(AttendanceEvent.id)
+        .where(
+            AttendanceEvent.employee_id == Employee.id,
+            AttendanceEvent.deleted_at.is_(None),
+        )
+        .order_by(AttendanceEvent.ts_utc.desc(), AttendanceEvent.id.desc())
+        .limit(1)
+        .correlate(Employee)
+        .scalar_subquery()
+    )
+    latest_events = session.scalars(
+        select(AttendanceEvent).where(
+            AttendanceEvent.id.in_(
+                select(latest_event_id).where(Employee.id.in_(list(employees_by_id)))
             )
-            .order_by(AttendanceEvent.ts_utc.desc(), AttendanceEvent.id.desc())
         )
-        if latest_event is None or latest_event.type != AttendanceType.IN:
+    ).all()
+    latest_event_by_employee_id: dict[int, AttendanceEvent] = {}
+    for event in latest_events:
+        latest_event_by_employee_id.setdefault(event.employee_id, event)
+
+    candidates_by_open_day: dict[date, list[tuple[Employee, AttendanceEvent]]] = {}
+    for employee_id, latest_event in sorted(latest_event_by_employee_id.items()):
+        employee = employees_by_id.get(employee_id)
+        if employee is None or latest_event.type != AttendanceType.IN:
             continue
-
         open_local_day = _normalize_ts(latest_event.ts_utc).astimezone(tz).date()
         if open_local_day >= local_today:
             continue
+        candidates_by_open_day.setdefault(open_local_day, []).append((employee, latest_event))
 
-        record = _build_open_shift_record(
-            session,
-            local_day=open_local_day,
-            employee=employee,
-            first_in_event=latest_event,
-        )
-        if record is not None:
-            records.append(record)
+    records: list[OpenShiftNotificationRecord] = []
+    for open_local_day, candidates in candidates_by_open_day.items():
+        lookups = _load_open_shift_lookups(session, candidates=candidates, local_day=open_local_day)
+        for employee, latest_event in candidates:
+            record = _build_open_shift_record(
+                session,
+                local_day=open_local_day,
+                employee=employee,
+                first_in_event=latest_event,
+                lookups=lookups,
+            )
+            if record is not None:
+                records.append(record)
 
+    records.sort(key=lambda item: item.employee_id)
     return records
 
 
@@ -715,66 +987,7 @@ def _build_idempotency_key(*, job_type: str, employee_id: int, local_day: date)
     return f"{job_type}:{employee_id}:{local_day.isoformat()}"
 
 
-def _has_pending_or_sent_job(session: Session, *, idempotency_key: str) -> bool:
-    existing = session.scalar(
-        select(NotificationJob.id).where(
-            NotificationJob.idempotency_key == idempotency_key,
-            NotificationJob.status.in_(("PENDING", "SENT")),
-        )
-    )
-    return existing is not None
-
-
-def _build_notification_payload(
-    *,
-    local_day: date,
-    shift_end_local: time,
-    grace_deadline_utc: datetime,
-    escalation_deadline_utc: datetime,
-    overtime_alert_at_utc: datetime | None = None,
-    employee_id: int | None = None,
-    employee_full_name: str | None = None,
-    department_name: str | None = None,
-    shift_name: str | None = None,
-    shift_start_local: time | None = None,
-    first_checkin_ts_utc: datetime | None = None,
-    checkin_outside_shift: bool | None = None,
-) -> dict[str, str]:
-    payload: dict[str, str] = {
-        "shift_date": local_day.isoformat(),
-        "planned_checkout_time": shift_end_local.isoformat(timespec="minutes"),
-        "grace_deadline_utc": grace_deadline_utc.isoformat(),
-        "escalation_deadline_utc": escalation_deadline_utc.isoformat(),
-    }
-    if employee_id is not None:
-        payload["employee_id"] = str(employee_id)
-    if employee_full_name:
-        payload["employee_full_name"] = employee_full_name
-    if department_name:
-        payload["department_name"] = department_name
-    if shift_name:
-        payload["shift_name"] = shift_name
-    if shift_start_local is not None:
-        payload["shift_start_time"] = shift_start_local.isoformat(timespec="minutes")
-        payload["shift_window_local"] = (
-            f"{shift_start_local.isoformat(timespec='minutes')}"
-            f"-{shift_end_local.isoformat(timespec='minutes')}"
-        )
-    if first_checkin_ts_utc is not None:
-        first_checkin_utc = _normalize_ts(first_checkin_ts_utc)
-        payload["first_checkin_utc"] = first_checkin_utc.isoformat()
-        payload["first_checkin_local"] = first_checkin_utc.astimezone(_attendance_timezone()).strftime(
-            "%Y-%m-%d %H:%M"
-        )
-    if checkin_outside_shift is not None:
-        payload["checkin_outside_shift"] = "true" if checkin_outside_shift else "false"
-    if overtime_alert_at_utc is not None:
-        payload["overtime_alert_at_utc"] = overtime_alert_at_utc.isoformat()
-    return payload
-
-
-def _create_notification_job_if_needed(
-    session: Session,
+def _build_notification_job_row(
     *,
     job_type: str,
     employee_id: int,
@@ -782,28 +995,37 @@ def _create_notification_job_if_needed(
     scheduled_at_utc: datetime,
     payload: dict[str, str],
     idempotency_key: str | None = None,
-) -> NotificationJob | None:
-    resolved_idempotency_key = idempotency_key or _build_idempotency_key(
-        job_type=job_type,
-        employee_id=employee_id,
-        local_day=local_day,
-    )
-    if _has_pending_or_sent_job(session, idempotency_key=resolved_idempotency_key):
-        return None
+) -> dict[str, Any]:
+    return {
+        "employee_id": employee_id,
+        "admin_user_id": None,
+        "job_type": job_type,
+        "payload": payload,
+        "scheduled_at_utc": scheduled_at_utc,
+        "status": "PENDING",
+        "attempts": 0,
+        "last_error": None,
+        "idempotency_key": idempotency_key
+        or _build_idempotency_key(
+            job_type=job_type,
+            employee_id=employee_id,
+            local_day=local_day,
+        ),
+    }
 
-    job = NotificationJob(
-        employee_id=employee_id,
-        admin_user_id=None,
-        job_type=job_type,
-        payload=payload,
-        scheduled_at_utc=scheduled_at_utc,
-        status="PENDING",
-        attempts=0,
-        last_error=None,
-        idempotency_key=resolved_idempotency_key,
+
+def _insert_notification_jobs_if_absent(
+    session: Session,
+    rows: list[dict[str, Any]],
+) -> list[NotificationJob]:
+    if not rows:
+        return []
+    stmt = (
+        pg_insert(NotificationJob)
+        .on_conflict_do_nothing(index_elements=[NotificationJob.idempotency_key])
+        .returning(NotificationJob)
     )
-    session.add(job)
-    return job
+    return list(session.scalars(stmt, rows).all())
 
 
 def _claim_due_pending_jobs(
@@ -812,28 +1034,40 @@ def _claim_due_pending_jobs(
     now_utc: datetime,
     limit: int,
 ) -> list[NotificationJob]:
-    with session.begin():
-        stmt = (
-            select(NotificationJob)
-            .where(
-                NotificationJob.status == "PENDING",
-                NotificationJob.scheduled_at_utc <= now_utc,
-            )
-            .order_by(NotificationJob.scheduled_at_utc.asc(), NotificationJob.id.asc())
-            .limit(limit)
-            .with_for_update(skip_locked=True)
+    due_ids = (
+        select(NotificationJob.id)
+        .where(
+            NotificationJob.status == "PENDING",
+            NotificationJob.scheduled_at_utc <= now_utc,
         )
+        .order_by(NotificationJob.scheduled_at_utc.asc(), NotificationJob.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(NotificationJob)
+        .where(NotificationJob.id.in_(due_ids))
+        .values(status="SENDING")
+        .returning(NotificationJob)
+        .execution_options(synchronize_session="fetch")
+    )
+    with session.begin():
         jobs = list(session.scalars(stmt).all())
-        for job in jobs:
-            job.status = "SENDING"
+    # RETURNING does not preserve the subquery order.
+    jobs.sort(key=lambda job: (job.scheduled_at_utc, job.id))
     return jobs
 
 
 def _admin_notification_emails(session: Session) -> list[str]:
-    return get_admin_notification_email_recipients(session)
+    # Memoized on the session so a send batch resolves the admin targets once.
+    admin_emails = session.info.get(ADMIN_NOTIFICATION_EMAILS_SESSION_INFO_KEY)
+    if admin_emails is None:
+        admin_emails = get_admin_notification_email_recipients(session)
+        session.info[ADMIN_NOTIFICATION_EMAILS_SESSION_INFO_KEY] = admin_emails
+    return list(admin_emails)
 
 
-def _employee_notification_emails(session: Session, *, job: NotificationJob) -> list[str]:
+def _employee_notification_emails(job: NotificationJob) -> list[str]:
     if (
         job.job_type == JOB_TYPE_ATTENDANCE_MONITOR
         and str(job.audience or "").strip().lower() == AUDIENCE_EMPLOYEE
@@ -841,44 +1075,11 @@ def _employee_notification_emails(session: Session, *, job: NotificationJob) ->
     ):
         return []
 
-    payload = job.payload or {}
-    values: set[str] = set()
-    payload_email = payload.get("employee_email")
+    # Employees carry no email column; the job payload is the only address source.
+    payload_email = (job.payload or {}).get("employee_email")
     if isinstance(payload_email, str) and payload_email.strip():
-        values.add(payload_email.strip())
-
-    payload_employee_ids = payload.get("employee_ids")
-    if isinstance(payload_employee_ids, list):
-        employee_ids = sorted(
-            {
-                int(value)
-                for value in payload_employee_ids
-                if isinstance(value, int) and value > 0
-            }
-        )
-        if employee_ids:
-            employees = list(session.scalars(select(Employee).where(Employee.id.in_(employee_ids))).all())
-            for employee in employees:
-                employee_email = getattr(employee, "email", None)
-                if isinstance(employee_email, str) and employee_email.strip():
-                    values.add(employee_email.strip())
-
-    payload_employee_scope = str(payload.get("employee_scope") or "").strip().lower()
-    if payload_employee_scope == "all":
-        employees = list(session.scalars(select(Employee).where(Employee.is_active.is_(True))).all())
-        for employee in employees:
-            employee_email = getattr(employee, "email", None)
-            if isinstance(employee_email, str) and employee_email.strip():
-                values.add(employee_email.strip())
-
-    if job.employee_id is not None:
-        employee = session.get(Employee, job.employee_id)
-        if employee is not None:
-            employee_email = getattr(employee, "email", None)
-            if isinstance(employee_email, str) and employee_email.strip():
-                values.add(employee_email.strip())
-
-    return sorted(values)
+        return [payload_email.strip()]
+    return []
 
 
 def _payload_bool(value: Any) -> bool | None:
@@ -1016,23 +1217,340 @@ def _build_grouped_admin_absence_message(session: Session, jobs: list[Notificati
     )
 
 
-def _build_message_for_job(session: Session, job: NotificationJob) -> NotificationMessage:
+_CHECKIN_OUTSIDE_SHIFT_TEXT: dict[bool | None, str] = {True: "Evet", False: "Hayır", None: "Bilinmiyor"}
+_EMPLOYEE_MISSED_CHECKOUT_BODY = (
+    "Çalışan: {employee_display}\n"
+    "Vardiya günü: {shift_date}\n"
+    "Giriş (yerel): {first_checkin_local}\n"
+    "Çıkış (yerel): {checkout_local}\n"
+    "Planlı çıkış saati: {planned_checkout_time}\n"
+    "Grace deadline (UTC): {grace_deadline}\n"
+    "Lütfen mesai çıkış kaydınızı tamamlayın."
+).format
+_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY_BODY = (
+    "Calisan: {employee_display}\n"
+    "Vardiya gunu: {shift_date}\n"
+    "Giris (yerel): {first_checkin_local}\n"
+    "Cikis (yerel): {checkout_local}\n"
+    "Acik kaldigi gun sayisi: {open_day_count}\n"
+    "Gece hatirlatma tarihi: {reminder_day}\n"
+    "Gece hatirlatma saati: {reminder_time}\n"
+    "Mesainizi kapatmayi unuttuysaniz lutfen hemen cikis yapin."
+).format
+_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT_BODY = (
+    "Calisan: {employee_display}\n"
+    "Vardiya gunu: {shift_date}\n"
+    "Giris (yerel): {first_checkin_local}\n"
+    "Otomatik cikis (yerel): {auto_checkout_local}\n"
+    "Acik kaldigi gun sayisi: {open_day_count}\n"
+    "Mesai kaydiniz gece 00:00 sonrasinda sistem tarafindan otomatik kapatildi."
+).format
+_ADMIN_ESCALATION_MISSED_CHECKOUT_BODY = (
+    "Çalışan: {employee_display}\n"
+    "Departman: {department_name}\n"
+    "Vardiya: {shift_line}\n"
+    "Vardiya günü: {shift_date}\n"
+    "Vardiya dışı giriş: {checkin_outside_shift_text}\n"
+    "Giriş (yerel): {first_checkin_local}\n"
+    "Giriş (UTC): {first_checkin_utc}\n"
+    "Çıkış (yerel): {checkout_local}\n"
+    "Planlı çıkış saati: {planned_checkout_time}\n"
+    "Grace deadline (UTC): {grace_deadline}\n"
+    "Eskalasyon deadline (UTC): {escalation_deadline}\n"
+    "Aksiyon: Çalışanı kontrol edin ve gerekirse manuel çıkış kaydı oluşturun."
+).format
+_ADMIN_MISSING_CHECKIN_BODY = (
+    "Calisan: {employee_display}\n"
+    "Departman: {department_name}\n"
+    "Gun: {shift_date}\n"
+    "Ilk cikis (yerel): {first_checkout_local}\n"
+    "Ilk cikis (UTC): {first_checkout_utc}\n"
+    "Son cikis (yerel): {last_checkout_local}\n"
+    "Son cikis (UTC): {last_checkout_utc}\n"
+    "Aksiyon: Giris kaydi eksik gorunuyor. Kaydi ve cihaz akisini kontrol edin."
+).format
+_ADMIN_AUTO_MIDNIGHT_CHECKOUT_BODY = (
+    "Calisan: {employee_display}\n"
+    "Departman: {department_name}\n"
+    "Vardiya: {shift_line}\n"
+    "Vardiya gunu: {shift_date}\n"
+    "Giris (yerel): {first_checkin_local}\n"
+    "Otomatik cikis (yerel): {auto_checkout_local}\n"
+    "Otomatik cikis (UTC): {auto_checkout_utc}\n"
+    "Neden: Cikis yapilmadan gece 00:00 sonrasi vardiya disi acik mesai algilandi."
+).format
+_EMPLOYEE_OVERTIME_9H_BODY = (
+    "Calisan #{employee_id} icin {shift_date} vardiyasinda 9 saat siniri asildi.\n"
+    "Planli cikis saati: {planned_checkout_time}\n"
+    "9 saat asim esigi (UTC): {overtime_alert_at}\n"
+    "Lutfen cikis kaydini tamamlayin."
+).format
+_ADMIN_DAILY_REPORT_READY_BODY = (
+    "{report_date} gunune ait gunluk puantaj Excel arsivi hazirlandi.\n"
+    "Arsiv ID: {archive_id}\n"
+    "Indirme linki: {archive_url}"
+).format
+_ATTENDANCE_MONITOR_BODY = (
+    "Baslik:\n{title}\n\n"
+    "Aciklama:\n{description}\n\n"
+    "Olay Zamani:\n{event_time}\n\n"
+    "Vardiya Bilgisi:\n{shift_summary}\n\n"
+    "Gerceklesen Saat:\n{actual_time_summary}\n\n"
+    "Risk Seviyesi:\n{risk_level}\n\n"
+    "Islem Onerisi:\n{suggested_action}\n\n"
+    "Event ID:\n{event_id}"
+).format
+
+
+def _build_employee_missed_checkout_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    return NotificationMessage(
+        recipients=_employee_notification_emails(job),
+        subject="Puantaj Uyarısı: Çıkış Kaydı Eksik",
+        body=_EMPLOYEE_MISSED_CHECKOUT_BODY(**context),
+    )
+
+
+def _build_employee_missed_checkout_nightly_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    return NotificationMessage(
+        recipients=_employee_notification_emails(job),
+        subject="Puantaj Hatirlatma: Acik Mesai Kaydi",
+        body=_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY_BODY(
+            **context,
+            open_day_count=str(payload.get("open_day_count", "-")),
+            reminder_day=str(payload.get("nightly_reminder_local_day", "-")),
+            reminder_time=str(payload.get("nightly_reminder_local_time", "-")),
+        ),
+    )
+
+
+def _build_employee_auto_midnight_checkout_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    return NotificationMessage(
+        recipients=_employee_notification_emails(job),
+        subject="Puantaj Bilgi: Mesai otomatik kapatildi",
+        body=_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT_BODY(
+            **context,
+            auto_checkout_local=str(payload.get("auto_checkout_local", "-")),
+            open_day_count=str(payload.get("open_day_count", "-")),
+        ),
+    )
+
+
+def _build_admin_escalation_missed_checkout_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    return NotificationMessage(
+        recipients=_admin_notification_emails(session),
+        subject="Puantaj Eskalasyon: Çıkış Eksikliği Devam Ediyor",
+        body=_ADMIN_ESCALATION_MISSED_CHECKOUT_BODY(**context),
+    )
+
+
+def _build_admin_missing_checkin_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    return NotificationMessage(
+        recipients=_admin_notification_emails(session),
+        subject="Puantaj Uyari: Giris Kaydi Eksik",
+        body=_ADMIN_MISSING_CHECKIN_BODY(
+            **context,
+            first_checkout_local=str(payload.get("first_checkout_local", "-")),
+            first_checkout_utc=str(payload.get("first_checkout_utc", "-")),
+            last_checkout_local=str(payload.get("last_checkout_local", "-")),
+            last_checkout_utc=str(payload.get("last_checkout_utc", "-")),
+        ),
+    )
+
+
+def _build_admin_auto_midnight_checkout_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    return NotificationMessage(
+        recipients=_admin_notification_emails(session),
+        subject="Puantaj Uyari: Gece otomatik cikis uygulandi",
+        body=_ADMIN_AUTO_MIDNIGHT_CHECKOUT_BODY(
+            **context,
+            auto_checkout_local=str(payload.get("auto_checkout_local", "-")),
+            auto_checkout_utc=str(payload.get("auto_checkout_utc", "-")),
+        ),
+    )
+
+
+def _build_employee_overtime_9h_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    return NotificationMessage(
+        recipients=_employee_notification_emails(job),
+        subject="Puantaj Uyarisi: 9 Saat Siniri Asildi",
+        body=_EMPLOYEE_OVERTIME_9H_BODY(
+            employee_id=job.employee_id,
+            shift_date=context["shift_date"],
+            planned_checkout_time=context["planned_checkout_time"],
+            overtime_alert_at=str(payload.get("overtime_alert_at_utc", "-")),
+        ),
+    )
+
+
+def _build_admin_daily_report_ready_message(
+    session: Session,
+    job: NotificationJob,
+    context: dict[str, str],
+) -> NotificationMessage:
+    payload = job.payload or {}
+    archive_id = payload.get("archive_id")
+    archive_url = (
+        f"{get_public_base_url()}/admin-panel/archive-download?archive_id={archive_id}"
+        if archive_id
+        else f"{get_public_base_url()}/admin-panel/archive-download"
+    )
+    return NotificationMessage(
+        recipients=_admin_notification_emails(session),
+        subject="Puantaj Raporu Hazir: Gunluk Arsiv",
+        body=_ADMIN_DAILY_REPORT_READY_BODY(
+            report_date=str(payload.get("report_date", "-")),
+            archive_id=archive_id,
+            archive_url=archive_url,
+        ),
+    )
+
+
+_JOB_MESSAGE_BUILDERS: dict[
+    str,
+    Callable[[Session, NotificationJob, dict[str, str]], NotificationMessage],
+] = {
+    JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT: _build_employee_missed_checkout_message,
+    JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY: _build_employee_missed_checkout_nightly_message,
+    JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT: _build_employee_auto_midnight_checkout_message,
+    JOB_TYPE_ADMIN_ESCALATION_MISSED_CHECKOUT: _build_admin_escalation_missed_checkout_message,
+    JOB_TYPE_ADMIN_MISSING_CHECKIN: _build_admin_missing_checkin_message,
+    JOB_TYPE_ADMIN_AUTO_MIDNIGHT_CHECKOUT: _build_admin_auto_midnight_checkout_message,
+    JOB_TYPE_EMPLOYEE_OVERTIME_9H: _build_employee_overtime_9h_message,
+    JOB_TYPE_ADMIN_DAILY_REPORT_READY: _build_admin_daily_report_ready_message,
+}
+
+
+@lru_cache(maxsize=32)
+def _local_day_window_utc(local_day: date, tz: tzinfo) -> tuple[datetime, datetime]:
+    local_start = datetime.combine(local_day, time.min, tzinfo=tz)
+    local_end = local_start + timedelta(days=1)
+    return local_start.astimezone(timezone.utc), local_end.astimezone(timezone.utc)
+
+
+def _job_needs_employee_label(job: NotificationJob) -> bool:
+    payload = job.payload or {}
+    return job.employee_id is not None and not (
+        payload.get("employee_full_name") and payload.get("department_name")
+    )
+
+
+def _load_employee_labels(session: Session, *, employee_ids: set[int]) -> dict[int, _EmployeeLabel]:
+    if not employee_ids:
+        return {}
+    rows = session.execute(
+        select(Employee.id, Employee.full_name, Department.name)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .where(Employee.id.in_(sorted(employee_ids)))
+    ).all()
+    return {
+        int(employee_id): _EmployeeLabel(full_name=full_name, department_name=department_name)
+        for employee_id, full_name, department_name in rows
+    }
+
+
+def _job_attendance_day(job: NotificationJob) -> date | None:
+    # Attendance-monitor messages never render the day's check-in/check-out times.
+    if job.employee_id is None or job.job_type == JOB_TYPE_ATTENDANCE_MONITOR or job.notification_type:
+        return None
+    return _payload_local_day((job.payload or {}).get("shift_date"))
+
+
+def _load_day_attendance_bounds(
+    session: Session,
+    *,
+    keys: set[tuple[int, date]],
+) -> dict[tuple[int, date], tuple[datetime | None, datetime | None]]:
+    if not keys:
+        return {}
+    tz = _attendance_timezone()
+    windows = [_local_day_window_utc(local_day, tz) for _employee_id, local_day in keys]
+    rows = session.execute(
+        select(AttendanceEvent.employee_id, AttendanceEvent.type, AttendanceEvent.ts_utc).where(
+            AttendanceEvent.employee_id.in_(sorted({employee_id for employee_id, _local_day in keys})),
+            AttendanceEvent.ts_utc >= min(start_utc for start_utc, _end_utc in windows),
+            AttendanceEvent.ts_utc < max(end_utc for _start_utc, end_utc in windows),
+            AttendanceEvent.deleted_at.is_(None),
+        )
+    ).all()
+    bounds: dict[tuple[int, date], tuple[datetime | None, datetime | None]] = {key: (None, None) for key in keys}
+    for employee_id, event_type, ts_utc in rows:
+        event_ts_utc = _normalize_ts(ts_utc)
+        key = (int(employee_id), event_ts_utc.astimezone(tz).date())
+        if key not in bounds:
+            continue
+        first_in_utc, last_out_utc = bounds[key]
+        if event_type == AttendanceType.IN and (first_in_utc is None or event_ts_utc < first_in_utc):
+            bounds[key] = (event_ts_utc, last_out_utc)
+        elif event_type == AttendanceType.OUT and (last_out_utc is None or event_ts_utc > last_out_utc):
+            bounds[key] = (first_in_utc, event_ts_utc)
+    return bounds
+
+
+def _build_message_for_job(
+    session: Session,
+    job: NotificationJob,
+    *,
+    employee_labels: dict[int, _EmployeeLabel] | None = None,
+    day_attendance_bounds: dict[tuple[int, date], tuple[datetime | None, datetime | None]] | None = None,
+) -> NotificationMessage:
     payload = job.payload or {}
     shift_date = str(payload.get("shift_date", "-"))
     planned_checkout_time = str(payload.get("planned_checkout_time", "-"))
     grace_deadline = str(payload.get("grace_deadline_utc", "-"))
     escalation_deadline = str(payload.get("escalation_deadline_utc", "-"))
-    employee = session.get(Employee, job.employee_id) if job.employee_id is not None else None
-    employee_name = str(payload.get("employee_full_name") or (employee.full_name if employee is not None else "-"))
+    employee_label: _EmployeeLabel | None = None
+    if _job_needs_employee_label(job):
+        if employee_labels is not None:
+            employee_label = employee_labels.get(job.employee_id)
+        else:
+            employee = session.get(Employee, job.employee_id, options=[joinedload(Employee.department)])
+            if employee is not None:
+                employee_label = _EmployeeLabel(
+                    full_name=employee.full_name,
+                    department_name=employee.department.name if employee.department is not None else None,
+                )
+    employee_name = str(
+        payload.get("employee_full_name") or (employee_label.full_name if employee_label is not None else "-")
+    )
     employee_id_text = str(payload.get("employee_id") or (job.employee_id if job.employee_id is not None else "-"))
     employee_display = f"#{employee_id_text} - {employee_name}"
     department_name = str(
         payload.get("department_name")
-        or (
-            employee.department.name
-            if employee is not None and employee.department is not None and employee.department.name
-            else "-"
-        )
+        or (employee_label.department_name if employee_label is not None else None)
+        or "-"
     )
     shift_name = str(payload.get("shift_name", "-"))
     shift_window_local = str(payload.get("shift_window_local", "-"))
@@ -1040,53 +1558,41 @@ def _build_message_for_job(session: Session, job: NotificationJob) -> Notificati
     first_checkin_local = str(payload.get("first_checkin_local", "-"))
     first_checkin_utc = str(payload.get("first_checkin_utc", "-"))
     checkout_local = "KAYIT YOK"
-    local_day = _payload_local_day(payload.get("shift_date"))
-    if local_day is not None and job.employee_id is not None:
+    local_day = _job_attendance_day(job)
+    if local_day is not None:
         tz = _attendance_timezone()
-        day_reference_utc = datetime.combine(local_day, time(12, 0), tzinfo=tz).astimezone(timezone.utc)
-        day_start_utc, day_end_utc = _local_day_bounds_utc(day_reference_utc)
-        first_in = session.scalar(
-            select(AttendanceEvent)
-            .where(
-                AttendanceEvent.employee_id == job.employee_id,
-                AttendanceEvent.type == AttendanceType.IN,
-                AttendanceEvent.ts_utc >= day_start_utc,
-                AttendanceEvent.ts_utc < day_end_utc,
-                AttendanceEvent.deleted_at.is_(None),
+        if day_attendance_bounds is not None:
+            first_in_ts_utc, last_out_ts_utc = day_attendance_bounds.get(
+                (int(job.employee_id), local_day),
+                (None, None),
             )
-            .order_by(AttendanceEvent.ts_utc.asc(), AttendanceEvent.id.asc())
-        )
-        if first_in is not None:
-            first_in_utc = _normalize_ts(first_in.ts_utc)
-            first_checkin_local = first_in_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M")
+        else:
+            day_start_utc, day_end_utc = _local_day_window_utc(local_day, tz)
+            first_in_ts_utc, last_out_ts_utc = session.execute(
+                select(
+                    func.min(case((AttendanceEvent.type == AttendanceType.IN, AttendanceEvent.ts_utc))),
+                    func.max(case((AttendanceEvent.type == AttendanceType.OUT, AttendanceEvent.ts_utc))),
+                ).where(
+                    AttendanceEvent.employee_id == job.employee_id,
+                    AttendanceEvent.ts_utc >= day_start_utc,
+                    AttendanceEvent.ts_utc < day_end_utc,
+                    AttendanceEvent.deleted_at.is_(None),
+                )
+            ).one()
+        if first_in_ts_utc is not None:
+            first_in_utc = _normalize_ts(first_in_ts_utc)
+            first_checkin_local = _format_local_minute(first_in_utc.astimezone(tz))
             first_checkin_utc = first_in_utc.isoformat()
-
-        last_out = session.scalar(
-            select(AttendanceEvent)
-            .where(
-                AttendanceEvent.employee_id == job.employee_id,
-                AttendanceEvent.type == AttendanceType.OUT,
-                AttendanceEvent.ts_utc >= day_start_utc,
-                AttendanceEvent.ts_utc < day_end_utc,
-                AttendanceEvent.deleted_at.is_(None),
-            )
-            .order_by(AttendanceEvent.ts_utc.desc(), AttendanceEvent.id.desc())
-        )
-        if last_out is not None:
-            checkout_local = _normalize_ts(last_out.ts_utc).astimezone(tz).strftime("%Y-%m-%d %H:%M")
-    checkin_outside_shift = _payload_bool(payload.get("checkin_outside_shift"))
-    checkin_outside_shift_text = (
-        "Evet"
-        if checkin_outside_shift is True
-        else ("Hayır" if checkin_outside_shift is False else "Bilinmiyor")
-    )
+        if last_out_ts_utc is not None:
+            checkout_local = _format_local_minute(_normalize_ts(last_out_ts_utc).astimezone(tz))
+    checkin_outside_shift_text = _CHECKIN_OUTSIDE_SHIFT_TEXT[_payload_bool(payload.get("checkin_outside_shift"))]
 
     if job.job_type == JOB_TYPE_ATTENDANCE_MONITOR or job.notification_type:
         audience = str(job.audience or payload.get("audience") or AUDIENCE_EMPLOYEE).strip().lower()
         recipients = (
             _admin_notification_emails(session)
             if audience == AUDIENCE_ADMIN
-            else _employee_notification_emails(session, job=job)
+            else _employee_notification_emails(job)
         )
         if job.job_type == JOB_TYPE_ADMIN_SCHEDULED_BROADCAST:
             title = str(job.title or payload.get("title") or "Planli Bildirim")
@@ -1098,177 +1604,181 @@ def _build_message_for_job(session: Session, job: NotificationJob) -> Notificati
             )
 
         title = str(job.title or payload.get("title") or "Puantaj Bildirimi")
-        description = str(job.description or payload.get("description") or "-")
-        event_time = str(payload.get("event_ts_local") or payload.get("event_ts_utc") or "-")
-        shift_summary = str(job.shift_summary or payload.get("shift_window_local") or shift_line or "-")
-        actual_time_summary = str(job.actual_time_summary or payload.get("actual_time_summary") or "-")
-        risk_level = str(job.risk_level or payload.get("risk_level") or "-")
-        suggested_action = str(job.suggested_action or payload.get("suggested_action") or "-")
-        event_id = str(job.event_id or payload.get("event_id") or f"JOB-{job.id}")
-
         return NotificationMessage(
             recipients=recipients,
             subject=title,
-            body=(
-                f"Baslik:\n{title}\n\n"
-                f"Aciklama:\n{description}\n\n"
-                f"Olay Zamani:\n{event_time}\n\n"
-                f"Vardiya Bilgisi:\n{shift_summary}\n\n"
-                f"Gerceklesen Saat:\n{actual_time_summary}\n\n"
-                f"Risk Seviyesi:\n{risk_level}\n\n"
-                f"Islem Onerisi:\n{suggested_action}\n\n"
-                f"Event ID:\n{event_id}"
+            body=_ATTENDANCE_MONITOR_BODY(
+                title=title,
+                description=str(job.description or payload.get("description") or "-"),
+                event_time=str(payload.get("event_ts_local") or payload.get("event_ts_utc") or "-"),
+                shift_summary=str(job.shift_summary or payload.get("shift_window_local") or shift_line or "-"),
+                actual_time_summary=str(job.actual_time_summary or payload.get("actual_time_summary") or "-"),
+                risk_level=str(job.risk_level or payload.get("risk_level") or "-"),
+                suggested_action=str(job.suggested_action or payload.get("suggested_action") or "-"),
+                event_id=str(job.event_id or payload.get("event_id") or f"JOB-{job.id}"),
             ),
         )
 
-    if job.job_type == JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT:
-        recipients = _employee_notification_emails(session, job=job)
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Uyarısı: Çıkış Kaydı Eksik",
-            body=(
-                f"Çalışan: {employee_display}\n"
-                f"Vardiya günü: {shift_date}\n"
-                f"Giriş (yerel): {first_checkin_local}\n"
-                f"Çıkış (yerel): {checkout_local}\n"
-                f"Planlı çıkış saati: {planned_checkout_time}\n"
-                f"Grace deadline (UTC): {grace_deadline}\n"
-                f"Lütfen mesai çıkış kaydınızı tamamlayın."
-            ),
-        )
+    try:
+        builder = _JOB_MESSAGE_BUILDERS[job.job_type]
+    except KeyError:
+        raise ValueError(f"Unsupported notification job_type: {job.job_type}") from None
+    return builder(
+        session,
+        job,
+        {
+            "employee_display": employee_display,
+            "department_name": department_name,
+            "shift_line": shift_line,
+            "shift_date": shift_date,
+            "planned_checkout_time": planned_checkout_time,
+            "grace_deadline": grace_deadline,
+            "escalation_deadline": escalation_deadline,
+            "first_checkin_local": first_checkin_local,
+            "first_checkin_utc": first_checkin_utc,
+            "checkout_local": checkout_local,
+            "checkin_outside_shift_text": checkin_outside_shift_text,
+        },
+    )
 
-    if job.job_type == JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY:
-        recipients = _employee_notification_emails(session, job=job)
-        reminder_day = str(payload.get("nightly_reminder_local_day", "-"))
-        reminder_time = str(payload.get("nightly_reminder_local_time", "-"))
-        open_day_count = str(payload.get("open_day_count", "-"))
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Hatirlatma: Acik Mesai Kaydi",
-            body=(
-                f"Calisan: {employee_display}\n"
-                f"Vardiya gunu: {shift_date}\n"
-                f"Giris (yerel): {first_checkin_local}\n"
-                f"Cikis (yerel): {checkout_local}\n"
-                f"Acik kaldigi gun sayisi: {open_day_count}\n"
-                f"Gece hatirlatma tarihi: {reminder_day}\n"
-                f"Gece hatirlatma saati: {reminder_time}\n"
-                "Mesainizi kapatmayi unuttuysaniz lutfen hemen cikis yapin."
-            ),
-        )
 
-    if job.job_type == JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT:
-        recipients = _employee_notification_emails(session, job=job)
-        auto_checkout_local = str(payload.get("auto_checkout_local", "-"))
-        open_day_count = str(payload.get("open_day_count", "-"))
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Bilgi: Mesai otomatik kapatildi",
-            body=(
-                f"Calisan: {employee_display}\n"
-                f"Vardiya gunu: {shift_date}\n"
-                f"Giris (yerel): {first_checkin_local}\n"
-                f"Otomatik cikis (yerel): {auto_checkout_local}\n"
-                f"Acik kaldigi gun sayisi: {open_day_count}\n"
-                "Mesai kaydiniz gece 00:00 sonrasinda sistem tarafindan otomatik kapatildi."
-            ),
-        )
+def _send_employee_job_push(
+    session: Session,
+    job: NotificationJob,
+    message: NotificationMessage,
+) -> dict[str, Any]:
+    if job.employee_id is None:
+        return {"total_targets": 0, "sent": 0, "failed": 0, "deactivated": 0, "failures": []}
+    return send_push_to_employees(
+        session,
+        employee_ids=[job.employee_id],
+        title=message.subject,
+        body=message.body,
+        data={
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "employee_id": job.employee_id,
+            "payload": job.payload or {},
+        },
+    )
 
-    if job.job_type == JOB_TYPE_ADMIN_ESCALATION_MISSED_CHECKOUT:
-        recipients = _admin_notification_emails(session)
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Eskalasyon: Çıkış Eksikliği Devam Ediyor",
-            body=(
-                f"Çalışan: {employee_display}\n"
-                f"Departman: {department_name}\n"
-                f"Vardiya: {shift_line}\n"
-                f"Vardiya günü: {shift_date}\n"
-                f"Vardiya dışı giriş: {checkin_outside_shift_text}\n"
-                f"Giriş (yerel): {first_checkin_local}\n"
-                f"Giriş (UTC): {first_checkin_utc}\n"
-                f"Çıkış (yerel): {checkout_local}\n"
-                f"Planlı çıkış saati: {planned_checkout_time}\n"
-                f"Grace deadline (UTC): {grace_deadline}\n"
-                f"Eskalasyon deadline (UTC): {escalation_deadline}\n"
-                "Aksiyon: Çalışanı kontrol edin ve gerekirse manuel çıkış kaydı oluşturun."
-            ),
-        )
 
-    if job.job_type == JOB_TYPE_ADMIN_MISSING_CHECKIN:
-        recipients = _admin_notification_emails(session)
-        first_checkout_local = str(payload.get("first_checkout_local", "-"))
-        first_checkout_utc = str(payload.get("first_checkout_utc", "-"))
-        last_checkout_local = str(payload.get("last_checkout_local", "-"))
-        last_checkout_utc = str(payload.get("last_checkout_utc", "-"))
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Uyari: Giris Kaydi Eksik",
-            body=(
-                f"Calisan: {employee_display}\n"
-                f"Departman: {department_name}\n"
-                f"Gun: {shift_date}\n"
-                f"Ilk cikis (yerel): {first_checkout_local}\n"
-                f"Ilk cikis (UTC): {first_checkout_utc}\n"
-                f"Son cikis (yerel): {last_checkout_local}\n"
-                f"Son cikis (UTC): {last_checkout_utc}\n"
-                "Aksiyon: Giris kaydi eksik gorunuyor. Kaydi ve cihaz akisini kontrol edin."
-            ),
-        )
+def _send_admin_escalation_missed_checkout_push(
+    session: Session,
+    job: NotificationJob,
+    message: NotificationMessage,
+) -> dict[str, Any]:
+    payload = job.payload or {}
+    return send_push_to_admins(
+        session,
+        admin_user_ids=None,
+        title=message.subject,
+        body=message.body,
+        data={
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "employee_id": job.employee_id,
+            "employee_full_name": payload.get("employee_full_name"),
+            "department_name": payload.get("department_name"),
+            "shift_date": payload.get("shift_date"),
+            "first_checkin_local": payload.get("first_checkin_local"),
+            "planned_checkout_time": payload.get("planned_checkout_time"),
+            "url": "/admin-panel/notifications",
+        },
+    )
 
-    if job.job_type == JOB_TYPE_ADMIN_AUTO_MIDNIGHT_CHECKOUT:
-        recipients = _admin_notification_emails(session)
-        auto_checkout_local = str(payload.get("auto_checkout_local", "-"))
-        auto_checkout_utc = str(payload.get("auto_checkout_utc", "-"))
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Uyari: Gece otomatik cikis uygulandi",
-            body=(
-                f"Calisan: {employee_display}\n"
-                f"Departman: {department_name}\n"
-                f"Vardiya: {shift_line}\n"
-                f"Vardiya gunu: {shift_date}\n"
-                f"Giris (yerel): {first_checkin_local}\n"
-                f"Otomatik cikis (yerel): {auto_checkout_local}\n"
-                f"Otomatik cikis (UTC): {auto_checkout_utc}\n"
-                "Neden: Cikis yapilmadan gece 00:00 sonrasi vardiya disi acik mesai algilandi."
-            ),
-        )
 
-    if job.job_type == JOB_TYPE_EMPLOYEE_OVERTIME_9H:
-        recipients = _employee_notification_emails(session, job=job)
-        overtime_alert_at = str(payload.get("overtime_alert_at_utc", "-"))
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Uyarisi: 9 Saat Siniri Asildi",
-            body=(
-                f"Calisan #{job.employee_id} icin {shift_date} vardiyasinda 9 saat siniri asildi.\n"
-                f"Planli cikis saati: {planned_checkout_time}\n"
-                f"9 saat asim esigi (UTC): {overtime_alert_at}\n"
-                "Lutfen cikis kaydini tamamlayin."
-            ),
-        )
+def _send_admin_missing_checkin_push(
+    session: Session,
+    job: NotificationJob,
+    message: NotificationMessage,
+) -> dict[str, Any]:
+    payload = job.payload or {}
+    employee_id = payload.get("employee_id") or job.employee_id
+    target_url = (
+        f"/admin-panel/employees/{employee_id}"
+        if employee_id is not None
+        else "/admin-panel/notifications"
+    )
+    return send_push_to_admins(
+        session,
+        admin_user_ids=None,
+        title=message.subject,
+        body=message.body,
+        data={
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "employee_id": employee_id,
+            "employee_full_name": payload.get("employee_full_name"),
+            "department_name": payload.get("department_name"),
+            "shift_date": payload.get("shift_date"),
+            "first_checkout_local": payload.get("first_checkout_local"),
+            "url": target_url,
+        },
+    )
+
+
+def _send_admin_auto_midnight_checkout_push(
+    session: Session,
+    job: NotificationJob,
+    message: NotificationMessage,
+) -> dict[str, Any]:
+    payload = job.payload or {}
+    return send_push_to_admins(
+        session,
+        admin_user_ids=None,
+        title=message.subject,
+        body=message.body,
+        data={
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "employee_id": job.employee_id,
+            "employee_full_name": payload.get("employee_full_name"),
+            "department_name": payload.get("department_name"),
+            "shift_date": payload.get("shift_date"),
+            "auto_checkout_local": payload.get("auto_checkout_local"),
+            "url": "/admin-panel/notifications",
+        },
+    )
+
 
-    if job.job_type == JOB_TYPE_ADMIN_DAILY_REPORT_READY:
-        recipients = _admin_notification_emails(session)
-        report_date = str(payload.get("report_date", "-"))
-        archive_id = payload.get("archive_id")
-        archive_url = (
-            f"{get_public_base_url()}/admin-panel/archive-download?archive_id={archive_id}"
+def _send_admin_daily_report_ready_push(
+    session: Session,
+    job: NotificationJob,
+    message: NotificationMessage,
+) -> dict[str, Any]:
+    payload = job.payload or {}
+    archive_id = payload.get("archive_id")
+    return send_push_to_admins(
+        session,
+        admin_user_ids=None,
+        title=message.subject,
+        body=message.body,
+        data={
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "archive_id": archive_id,
+            "report_date": payload.get("report_date"),
+            "url": f"/admin-panel/archive-download?archive_id={archive_id}"
             if archive_id
-            else f"{get_public_base_url()}/admin-panel/archive-download"
-        )
-        return NotificationMessage(
-            recipients=recipients,
-            subject="Puantaj Raporu Hazir: Gunluk Arsiv",
-            body=(
-                f"{report_date} gunune ait gunluk puantaj Excel arsivi hazirlandi.\n"
-                f"Arsiv ID: {archive_id}\n"
-                f"Indirme linki: {archive_url}"
-            ),
-        )
+            else "/admin-panel/archive-download",
+        },
+    )
+
 
-    raise ValueError(f"Unsupported notification job_type: {job.job_type}")
+_JOB_PUSH_SENDERS: dict[
+    str,
+    Callable[[Session, NotificationJob, NotificationMessage], dict[str, Any]],
+] = {
+    JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT: _send_employee_job_push,
+    JOB_TYPE_EMPLOYEE_OVERTIME_9H: _send_employee_job_push,
+    JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY: _send_employee_job_push,
+    JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT: _send_employee_job_push,
+    JOB_TYPE_ADMIN_ESCALATION_MISSED_CHECKOUT: _send_admin_escalation_missed_checkout_push,
+    JOB_TYPE_ADMIN_MISSING_CHECKIN: _send_admin_missing_checkin_push,
+    JOB_TYPE_ADMIN_AUTO_MIDNIGHT_CHECKOUT: _send_admin_auto_midnight_checkout_push,
+    JOB_TYPE_ADMIN_DAILY_REPORT_READY: _send_admin_daily_report_ready_push,
+}
 
 
 def _send_push_for_job(
@@ -1332,111 +1842,11 @@ def _send_push_for_job(
             },
         )
 
-    if job.job_type in {
-        JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT,
-        JOB_TYPE_EMPLOYEE_OVERTIME_9H,
-        JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY,
-        JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT,
-    }:
-        if job.employee_id is None:
-            return {"total_targets": 0, "sent": 0, "failed": 0, "deactivated": 0, "failures": []}
-        return send_push_to_employees(
-            session,
-            employee_ids=[job.employee_id],
-            title=message.subject,
-            body=message.body,
-            data={
-                "job_id": job.id,
-                "job_type": job.job_type,
-                "employee_id": job.employee_id,
-                "payload": job.payload or {},
-            },
-        )
-
-    if job.job_type == JOB_TYPE_ADMIN_ESCALATION_MISSED_CHECKOUT:
-        payload = job.payload or {}
-        return send_push_to_admins(
-            session,
-            admin_user_ids=None,
-            title=message.subject,
-            body=message.body,
-            data={
-                "job_id": job.id,
-                "job_type": job.job_type,
-                "employee_id": job.employee_id,
-                "employee_full_name": payload.get("employee_full_name"),
-                "department_name": payload.get("department_name"),
-                "shift_date": payload.get("shift_date"),
-                "first_checkin_local": payload.get("first_checkin_local"),
-                "planned_checkout_time": payload.get("planned_checkout_time"),
-                "url": "/admin-panel/notifications",
-            },
-        )
-
-    if job.job_type == JOB_TYPE_ADMIN_MISSING_CHECKIN:
-        payload = job.payload or {}
-        employee_id = payload.get("employee_id") or job.employee_id
-        target_url = (
-            f"/admin-panel/employees/{employee_id}"
-            if employee_id is not None
-            else "/admin-panel/notifications"
-        )
-        return send_push_to_admins(
-            session,
-            admin_user_ids=None,
-            title=message.subject,
-            body=message.body,
-            data={
-                "job_id": job.id,
-                "job_type": job.job_type,
-                "employee_id": employee_id,
-                "employee_full_name": payload.get("employee_full_name"),
-                "department_name": payload.get("department_name"),
-                "shift_date": payload.get("shift_date"),
-                "first_checkout_local": payload.get("first_checkout_local"),
-                "url": target_url,
-            },
-        )
-
-    if job.job_type == JOB_TYPE_ADMIN_AUTO_MIDNIGHT_CHECKOUT:
-        payload = job.payload or {}
-        return send_push_to_admins(
-            session,
-            admin_user_ids=None,
-            title=message.subject,
-            body=message.body,
-            data={
-                "job_id": job.id,
-                "job_type": job.job_type,
-                "employee_id": job.employee_id,
-                "employee_full_name": payload.get("employee_full_name"),
-                "department_name": payload.get("department_name"),
-                "shift_date": payload.get("shift_date"),
-                "auto_checkout_local": payload.get("auto_checkout_local"),
-                "url": "/admin-panel/notifications",
-            },
-        )
-
-    if job.job_type == JOB_TYPE_ADMIN_DAILY_REPORT_READY:
-        payload = job.payload or {}
-        archive_id = payload.get("archive_id")
-        return send_push_to_admins(
-            session,
-            admin_user_ids=None,
-            title=message.subject,
-            body=message.body,
-            data={
-                "job_id": job.id,
-                "job_type": job.job_type,
-                "archive_id": archive_id,
-                "report_date": payload.get("report_date"),
-                "url": f"/admin-panel/archive-download?archive_id={archive_id}"
-                if archive_id
-                else "/admin-panel/archive-download",
-            },
-        )
-
-    return {"total_targets": 0, "sent": 0, "failed": 0, "deactivated": 0, "failures": []}
+    try:
+        sender = _JOB_PUSH_SENDERS[job.job_type]
+    except KeyError:
+        return {"total_targets": 0, "sent": 0, "failed": 0, "deactivated": 0, "failures": []}
+    return sender(session, job, message)
 
 
 def _send_grouped_admin_absence_push(
@@ -1502,7 +1912,6 @@ def _mark_job_sent(
     job.status = "SENT"
     job.last_error = None
     session.commit()
-    session.refresh(job)
     return job
 
 
@@ -1528,7 +1937,6 @@ def _mark_job_failure(
         job.status = "FAILED"
 
     session.commit()
-    session.refresh(job)
     return job
 
 
@@ -1646,6 +2054,7 @@ def _process_grouped_admin_absence_jobs(
     reference_utc: datetime,
     email_enabled: bool,
     email_channel: NotificationChannel,
+    audit_rows: list[dict[str, Any]],
 ) -> list[NotificationJob]:
     ordered_jobs = sorted(jobs, key=lambda item: (item.scheduled_at_utc, item.id or 0))
     if not ordered_jobs:
@@ -1710,23 +2119,24 @@ def _process_grouped_admin_absence_jobs(
             if sent_job is None:
                 continue
             processed.append(sent_job)
-            log_audit(
-                session,
-                actor_type=AuditActorType.SYSTEM,
-                actor_id="notification_runner",
-                action="NOTIFICATION_JOB_SENT",
-                success=True,
-                entity_type="notification_job",
-                entity_id=str(sent_job.id),
-                details={
-                    "job_type": sent_job.job_type,
-                    "employee_id": sent_job.employee_id,
-                    "attempts": sent_job.attempts,
-                    "idempotency_key": sent_job.idempotency_key,
-                    "grouped_delivery": True,
-                    "grouped_absence_count": len(ordered_jobs),
-                    "primary_job_id": primary_job.id,
-                },
+            audit_rows.append(
+                {
+                    "actor_type": AuditActorType.SYSTEM,
+                    "actor_id": "notification_runner",
+                    "action": "NOTIFICATION_JOB_SENT",
+                    "success": True,
+                    "entity_type": "notification_job",
+                    "entity_id": str(sent_job.id),
+                    "details": {
+                        "job_type": sent_job.job_type,
+                        "employee_id": sent_job.employee_id,
+                        "attempts": sent_job.attempts,
+                        "idempotency_key": sent_job.idempotency_key,
+                        "grouped_delivery": True,
+                        "grouped_absence_count": len(ordered_jobs),
+                        "primary_job_id": primary_job.id,
+                    },
+                }
             )
     except Exception as exc:
         for job in ordered_jobs:
@@ -1739,24 +2149,25 @@ def _process_grouped_admin_absence_jobs(
             if failed_job is None:
                 continue
             processed.append(failed_job)
-            log_audit(
-                session,
-                actor_type=AuditActorType.SYSTEM,
-                actor_id="notification_runner",
-                action="NOTIFICATION_JOB_FAILED",
-                success=False,
-                entity_type="notification_job",
-                entity_id=str(failed_job.id),
-                details={
-                    "job_type": failed_job.job_type,
-                    "employee_id": failed_job.employee_id,
-                    "attempts": failed_job.attempts,
-                    "status": failed_job.status,
-                    "error": failed_job.last_error,
-                    "grouped_delivery": True,
-                    "grouped_absence_count": len(ordered_jobs),
-                    "primary_job_id": primary_job.id,
-                },
+            audit_rows.append(
+                {
+                    "actor_type": AuditActorType.SYSTEM,
+                    "actor_id": "notification_runner",
+                    "action": "NOTIFICATION_JOB_FAILED",
+                    "success": False,
+                    "entity_type": "notification_job",
+                    "entity_id": str(failed_job.id),
+                    "details": {
+                        "job_type": failed_job.job_type,
+                        "employee_id": failed_job.employee_id,
+                        "attempts": failed_job.attempts,
+                        "status": failed_job.status,
+                        "error": failed_job.last_error,
+                        "grouped_delivery": True,
+                        "grouped_absence_count": len(ordered_jobs),
+                        "primary_job_id": primary_job.id,
+                    },
+                }
             )
 
     return processed
@@ -1802,9 +2213,13 @@ def _midnight_trigger_local_dt(local_day: date) -> datetime:
     )
 
 
-def _resolve_effective_auto_checkout_utc(record: OpenShiftNotificationRecord) -> tuple[datetime, datetime]:
-    trigger_local_dt = _midnight_trigger_local_dt(record.local_day)
-    trigger_utc = trigger_local_dt.astimezone(timezone.utc)
+def _resolve_effective_auto_checkout_utc(
+    record: OpenShiftNotificationRecord,
+    *,
+    trigger_utc: datetime | None = None,
+) -> tuple[datetime, datetime]:
+    if trigger_utc is None:
+        trigger_utc = _midnight_trigger_local_dt(record.local_day).astimezone(timezone.utc)
     planned_checkout_utc = _normalize_ts(record.planned_checkout_ts_utc)
     effective_checkout_utc = min(planned_checkout_utc, trigger_utc)
     first_checkin_utc = _normalize_ts(record.first_checkin_ts_utc)
@@ -1822,23 +2237,22 @@ def _refresh_auto_checkout_notification_jobs(
     trigger_utc: datetime,
 ) -> None:
     tz = _attendance_timezone()
+    auto_checkout_local = auto_checkout_utc.astimezone(tz)
     payload_updates = {
         "auto_checkout_utc": auto_checkout_utc.isoformat(),
-        "auto_checkout_local": auto_checkout_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M"),
-        "auto_checkout_local_day": auto_checkout_utc.astimezone(tz).date().isoformat(),
+        "auto_checkout_local": _format_local_minute(auto_checkout_local),
+        "auto_checkout_local_day": auto_checkout_local.date().isoformat(),
         "open_day_count": str(max(1, (trigger_utc.astimezone(tz).date() - local_day).days + 1)),
     }
     idempotency_keys = (
         f"{JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT}:{employee_id}:{local_day.isoformat()}",
         f"{JOB_TYPE_ADMIN_AUTO_MIDNIGHT_CHECKOUT}:{employee_id}:{local_day.isoformat()}",
     )
-    for key in idempotency_keys:
-        job = session.scalar(select(NotificationJob).where(NotificationJob.idempotency_key == key))
-        if job is None:
-            continue
-        payload = dict(job.payload) if isinstance(job.payload, dict) else {}
-        payload.update(payload_updates)
-        job.payload = payload
+    jobs = session.scalars(
+        select(NotificationJob).where(NotificationJob.idempotency_key.in_(idempotency_keys))
+    ).all()
+    for job in jobs:
+        job.payload = {**(job.payload if isinstance(job.payload, dict) else {}), **payload_updates}
         if job.status in {"PENDING", "SENDING"}:
             job.scheduled_at_utc = trigger_utc
 
@@ -1854,21 +2268,30 @@ def repair_auto_midnight_checkout_events(
     session = db
     _ = _normalize_ts(now_utc)
     tz = _attendance_timezone()
-    candidates = list(
-        session.scalars(
-            select(AttendanceEvent)
-            .options(selectinload(AttendanceEvent.employee))
-            .where(
-                AttendanceEvent.type == AttendanceType.OUT,
-                AttendanceEvent.created_by_admin.is_(True),
-                AttendanceEvent.deleted_at.is_(None),
-                AttendanceEvent.note == "Sistem gece 00:00 otomatik cikis",
-            )
-            .order_by(AttendanceEvent.ts_utc.asc(), AttendanceEvent.id.asc())
-        ).all()
+    candidates_stmt = (
+        select(AttendanceEvent)
+        .options(
+            load_only(
+                AttendanceEvent.id,
+                AttendanceEvent.employee_id,
+                AttendanceEvent.type,
+                AttendanceEvent.ts_utc,
+                AttendanceEvent.flags,
+                AttendanceEvent.note,
+            ),
+            selectinload(AttendanceEvent.employee),
+        )
+        .where(
+            AttendanceEvent.type == AttendanceType.OUT,
+            AttendanceEvent.created_by_admin.is_(True),
+            AttendanceEvent.deleted_at.is_(None),
+            AttendanceEvent.note == "Sistem gece 00:00 otomatik cikis",
+        )
+        .order_by(AttendanceEvent.ts_utc.asc(), AttendanceEvent.id.asc())
+        .execution_options(yield_per=AUTO_CHECKOUT_REPAIR_YIELD_PER)
     )
     repaired_count = 0
-    for event in candidates:
+    for event in session.scalars(candidates_stmt):
         flags = event.flags if isinstance(event.flags, dict) else {}
         if not bool(flags.get("AUTO_CHECKOUT_AT_MIDNIGHT")):
             continue
@@ -1888,16 +2311,19 @@ def repair_auto_midnight_checkout_events(
         else:
             shift_day = event_local_dt.date() - timedelta(days=1)
 
-        employee = event.employee or session.get(Employee, event.employee_id)
+        # employee_id is a non-null FK, so selectinload has already resolved every employee.
+        employee = event.employee
         if employee is None:
             continue
+        # The shift day's local window equals [midnight trigger of the previous day, trigger of shift_day).
+        shift_day_start_utc, shift_day_end_utc = _local_day_window_utc(shift_day, tz)
         first_in_event = session.scalar(
             select(AttendanceEvent)
             .where(
                 AttendanceEvent.employee_id == event.employee_id,
                 AttendanceEvent.type == AttendanceType.IN,
-                AttendanceEvent.ts_utc >= _midnight_trigger_local_dt(shift_day - timedelta(days=1)).astimezone(timezone.utc),
-                AttendanceEvent.ts_utc < _midnight_trigger_local_dt(shift_day).astimezone(timezone.utc),
+                AttendanceEvent.ts_utc >= shift_day_start_utc,
+                AttendanceEvent.ts_utc < shift_day_end_utc,
                 AttendanceEvent.deleted_at.is_(None),
             )
             .order_by(AttendanceEvent.ts_utc.asc(), AttendanceEvent.id.asc())
@@ -1914,16 +2340,21 @@ def repair_auto_midnight_checkout_events(
         if record is None or _record_shift_covers_midnight(record):
             continue
 
-        expected_checkout_utc, trigger_utc = _resolve_effective_auto_checkout_utc(record)
+        # The midnight trigger of shift_day is the end of its local window, already computed above.
+        expected_checkout_utc, trigger_utc = _resolve_effective_auto_checkout_utc(
+            record,
+            trigger_utc=shift_day_end_utc,
+        )
         current_checkout_utc = _normalize_ts(event.ts_utc)
         if expected_checkout_utc >= current_checkout_utc:
             continue
 
-        new_flags = dict(flags)
-        new_flags["AUTO_CHECKOUT_TRIGGER_LOCAL"] = trigger_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M")
-        new_flags["AUTO_CHECKOUT_EFFECTIVE_LOCAL"] = expected_checkout_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M")
-        new_flags["AUTO_CHECKOUT_EFFECTIVE_UTC"] = expected_checkout_utc.isoformat()
-        event.flags = new_flags
+        event.flags = {
+            **flags,
+            "AUTO_CHECKOUT_TRIGGER_LOCAL": _format_local_minute(trigger_utc.astimezone(tz)),
+            "AUTO_CHECKOUT_EFFECTIVE_LOCAL": _format_local_minute(expected_checkout_utc.astimezone(tz)),
+            "AUTO_CHECKOUT_EFFECTIVE_UTC": expected_checkout_utc.isoformat(),
+        }
         event.ts_utc = expected_checkout_utc
         event.note = "Sistem gece 00:00 otomatik cikis tetikledi"
         _refresh_auto_checkout_notification_jobs(
@@ -1975,35 +2406,48 @@ def get_employees_with_missing_checkin(
         ).all()
     )
 
+    # A three-day lookback cannot span two DST transitions; equal end offsets mean one fixed offset.
+    lookback_offset = lookback_start_local.utcoffset()
+    if lookback_offset != lookback_end_utc.astimezone(tz).utcoffset():
+        lookback_offset = None
+
     events_by_employee: dict[int, list[AttendanceEvent]] = {}
+    day_events_by_employee: dict[int, dict[date, list[AttendanceEvent]]] = {}
     for event in events:
-        events_by_employee.setdefault(int(event.employee_id), []).append(event)
+        employee_id = int(event.employee_id)
+        events_by_employee.setdefault(employee_id, []).append(event)
+        normalized_ts_utc = _normalize_ts(event.ts_utc)
+        if lookback_offset is not None:
+            local_day = (normalized_ts_utc + lookback_offset).date()
+        else:
+            local_day = normalized_ts_utc.astimezone(tz).date()
+        if local_day in candidate_days:
+            day_events_by_employee.setdefault(employee_id, {}).setdefault(local_day, []).append(event)
 
     records: list[MissingCheckinNotificationRecord] = []
-    for employee_id, employee_events in events_by_employee.items():
-        employee = employee_events[0].employee if employee_events else None
+    for employee_id, events_by_day in day_events_by_employee.items():
+        employee_events = events_by_employee[employee_id]
+        employee = employee_events[0].employee
         if employee is None or not employee.is_active:
             continue
 
-        events_by_day: dict[date, list[AttendanceEvent]] = {}
-        for event in employee_events:
-            local_day = _normalize_ts(event.ts_utc).astimezone(tz).date()
-            if local_day not in candidate_days:
-                continue
-            events_by_day.setdefault(local_day, []).append(event)
-
+        event_ts_utc: list[datetime] | None = None
         for local_day, day_events in events_by_day.items():
-            day_in_events = [event for event in day_events if event.type == AttendanceType.IN]
-            day_out_events = [event for event in day_events if event.type == AttendanceType.OUT]
-            if day_in_events or not day_out_events:
+            has_checkin = False
+            day_out_events: list[AttendanceEvent] = []
+            for event in day_events:
+                if event.type == AttendanceType.IN:
+                    has_checkin = True
+                    break
+                day_out_events.append(event)
+            if has_checkin or not day_out_events:
                 continue
 
             first_checkout = day_out_events[0]
-            previous_event = None
-            for candidate in employee_events:
-                if candidate.ts_utc >= first_checkout.ts_utc:
-                    break
-                previous_event = candidate
+            if event_ts_utc is None:
+                event_ts_utc = [event.ts_utc for event in employee_events]
+            previous_index = bisect_left(event_ts_utc, first_checkout.ts_utc)
+            previous_event = employee_events[previous_index - 1] if previous_index > 0 else None
 
             if _is_valid_overnight_checkout_without_same_day_checkin(
                 session,
@@ -2045,7 +2489,7 @@ def schedule_missing_checkin_notifications(
     reference_utc = _normalize_ts(now_utc)
     tz = _attendance_timezone()
     records = get_employees_with_missing_checkin(reference_utc, db=session)
-    created_jobs: list[NotificationJob] = []
+    job_rows: list[dict[str, Any]] = []
 
     for record in records:
         first_checkout_utc = _normalize_ts(record.first_checkout_ts_utc)
@@ -2055,22 +2499,22 @@ def schedule_missing_checkin_notifications(
             "employee_full_name": record.employee_full_name,
             "department_name": record.department_name or "-",
             "shift_date": record.local_day.isoformat(),
-            "first_checkout_local": first_checkout_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M"),
+            "first_checkout_local": _format_local_minute(first_checkout_utc.astimezone(tz)),
             "first_checkout_utc": first_checkout_utc.isoformat(),
-            "last_checkout_local": last_checkout_utc.astimezone(tz).strftime("%Y-%m-%d %H:%M"),
+            "last_checkout_local": _format_local_minute(last_checkout_utc.astimezone(tz)),
             "last_checkout_utc": last_checkout_utc.isoformat(),
         }
-        job = _create_notification_job_if_needed(
-            session,
-            job_type=JOB_TYPE_ADMIN_MISSING_CHECKIN,
-            employee_id=record.employee_id,
-            local_day=record.local_day,
-            scheduled_at_utc=reference_utc,
-            payload=payload,
+        job_rows.append(
+            _build_notification_job_row(
+                job_type=JOB_TYPE_ADMIN_MISSING_CHECKIN,
+                employee_id=record.employee_id,
+                local_day=record.local_day,
+                scheduled_at_utc=reference_utc,
+                payload=payload,
+            )
         )
-        if job is not None:
-            created_jobs.append(job)
 
+    created_jobs = _insert_notification_jobs_if_absent(session, job_rows)
     if not created_jobs:
         return []
 
@@ -2111,6 +2555,7 @@ def _build_archive_employee_index(
             AttendanceEvent.ts_utc >= start_utc,
             AttendanceEvent.ts_utc < end_utc,
         )
+        .distinct()
     )
     if department_id is not None:
         stmt = stmt.where(Employee.department_id == department_id)
@@ -2122,16 +2567,17 @@ def _build_archive_employee_index(
             )
         )
 
-    unique_ids: set[int] = set()
-    unique_names: set[str] = set()
-    for employee_id_value, full_name in session.execute(stmt).all():
+    # DISTINCT yields one row per employee and ORDER BY keeps the ids sorted, so only names need deduping.
+    sorted_ids: list[int] = []
+    unique_names: dict[str, None] = {}
+    stmt = stmt.order_by(Employee.id.asc()).execution_options(yield_per=ARCHIVE_EMPLOYEE_INDEX_YIELD_PER)
+    for employee_id_value, full_name in session.execute(stmt):
         if isinstance(employee_id_value, int) and employee_id_value > 0:
-            unique_ids.add(employee_id_value)
+            sorted_ids.append(employee_id_value)
         normalized_name = _normalize_archive_employee_name(str(full_name or ""))
         if normalized_name:
-            unique_names.add(normalized_name)
+            unique_names[normalized_name] = None
 
-    sorted_ids = sorted(unique_ids)
     sorted_names = sorted(unique_names)
     ids_index = f",{','.join(str(item) for item in sorted_ids)}," if sorted_ids else None
     names_index = "|".join(sorted_names) if sorted_names else None
@@ -2148,17 +2594,12 @@ def _cleanup_expired_daily_report_archives(
         return 0
 
     cutoff_date = local_now_date - timedelta(days=retention_days)
-    stale_archives = list(
-        session.scalars(
-            select(AdminDailyReportArchive).where(AdminDailyReportArchive.report_date < cutoff_date)
-        ).all()
-    )
-    if not stale_archives:
-        return 0
-
-    for archive in stale_archives:
-        session.delete(archive)
-    return len(stale_archives)
+    deleted_ids = session.scalars(
+        delete(AdminDailyReportArchive)
+        .where(AdminDailyReportArchive.report_date < cutoff_date)
+        .returning(AdminDailyReportArchive.id)
+    ).all()
+    return len(deleted_ids)
 
 
 def _cleanup_archive_overflow(
@@ -2168,22 +2609,21 @@ def _cleanup_archive_overflow(
     if max_rows <= 0:
         return 0
 
-    overflow_rows = list(
-        session.scalars(
-            select(AdminDailyReportArchive)
-            .order_by(
-                AdminDailyReportArchive.report_date.desc(),
-                AdminDailyReportArchive.id.desc(),
-            )
-            .offset(max_rows)
-        ).all()
+    overflow_ids = (
+        select(AdminDailyReportArchive.id)
+        .order_by(
+            AdminDailyReportArchive.report_date.desc(),
+            AdminDailyReportArchive.id.desc(),
+        )
+        .offset(max_rows)
     )
-    if not overflow_rows:
-        return 0
-
-    for archive in overflow_rows:
-        session.delete(archive)
-    return len(overflow_rows)
+    deleted_ids = session.scalars(
+        delete(AdminDailyReportArchive)
+        .where(AdminDailyReportArchive.id.in_(overflow_ids))
+        .returning(AdminDailyReportArchive.id)
+        .execution_options(synchronize_session="fetch")
+    ).all()
+    return len(deleted_ids)
 
 
 def _ensure_daily_report_notification_job(
@@ -2195,53 +2635,49 @@ def _ensure_daily_report_notification_job(
     scheduled_at_utc: datetime,
 ) -> tuple[NotificationJob | None, str]:
     idempotency_key = f"{JOB_TYPE_ADMIN_DAILY_REPORT_READY}:{report_date.isoformat()}"
-    existing_job = session.scalar(
-        select(NotificationJob).where(NotificationJob.idempotency_key == idempotency_key)
-    )
-    if existing_job is None:
-        job = NotificationJob(
-            employee_id=None,
-            admin_user_id=None,
-            job_type=JOB_TYPE_ADMIN_DAILY_REPORT_READY,
-            payload={
-                "report_date": report_date.isoformat(),
-                "archive_id": archive_id,
-                "file_name": file_name,
-            },
-            scheduled_at_utc=scheduled_at_utc,
-            status="PENDING",
-            attempts=0,
-            last_error=None,
-            idempotency_key=idempotency_key,
-        )
-        session.add(job)
-        return job, "created"
-
-    if existing_job.status in {"FAILED", "CANCELED"}:
-        existing_job.status = "PENDING"
-        existing_job.scheduled_at_utc = scheduled_at_utc
-        existing_job.attempts = 0
-        existing_job.last_error = None
-        existing_job.payload = {
+    insert_stmt = pg_insert(NotificationJob).values(
+        employee_id=None,
+        admin_user_id=None,
+        job_type=JOB_TYPE_ADMIN_DAILY_REPORT_READY,
+        payload={
             "report_date": report_date.isoformat(),
             "archive_id": archive_id,
             "file_name": file_name,
-        }
-        return existing_job, "reactivated"
-
-    return None, "unchanged"
+        },
+        scheduled_at_utc=scheduled_at_utc,
+        status="PENDING",
+        attempts=0,
+        last_error=None,
+        idempotency_key=idempotency_key,
+    )
+    # Only FAILED/CANCELED jobs are reactivated; any other existing job makes the upsert return no row.
+    # xmax is 0 for freshly inserted rows, which tells a new job apart from a reactivated one.
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[NotificationJob.idempotency_key],
+        set_={
+            "status": "PENDING",
+            "scheduled_at_utc": insert_stmt.excluded.scheduled_at_utc,
+            "attempts": 0,
+            "last_error": None,
+            "payload": insert_stmt.excluded.payload,
+            "updated_at": datetime.now(timezone.utc),
+        },
+        where=NotificationJob.status.in_(("FAILED", "CANCELED")),
+    ).returning(NotificationJob, literal_column("xmax = 0").label("inserted"))
+    row = session.execute(stmt).first()
+    if row is None:
+        return None, "unchanged"
+    job, inserted = row
+    return job, "created" if inserted else "reactivated"
 
 
 def _as_int(value: Any, default: int = 0) -> int:
-    if isinstance(value, bool):
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
         return default
-    if isinstance(value, int):
-        return value
-    if isinstance(value, str):
-        raw = value.strip()
-        if raw.isdigit():
-            return int(raw)
-    return default
 
 
 def get_notification_channel_health() -> dict[str, Any]:
@@ -2273,19 +2709,38 @@ def get_daily_report_job_health(
     session = db
     reference_utc = _normalize_ts(now_utc or datetime.now(timezone.utc))
     local_now = reference_utc.astimezone(_attendance_timezone())
+    local_time = local_now.time()
     report_date = local_now.date() - timedelta(days=1)
     idempotency_key = f"{JOB_TYPE_ADMIN_DAILY_REPORT_READY}:{report_date.isoformat()}"
-    try:
-        job = session.scalar(
-            select(NotificationJob).where(NotificationJob.idempotency_key == idempotency_key)
+    job_subquery = (
+        select(NotificationJob)
+        .where(NotificationJob.idempotency_key == idempotency_key)
+        .subquery()
+    )
+    archive_subquery = (
+        select(
+            AdminDailyReportArchive.id,
+            AdminDailyReportArchive.created_at,
+            AdminDailyReportArchive.employee_count,
+            AdminDailyReportArchive.file_size_bytes,
         )
-        archive = session.scalar(
-            select(AdminDailyReportArchive).where(
-                AdminDailyReportArchive.report_date == report_date,
-                AdminDailyReportArchive.department_id.is_(None),
-                AdminDailyReportArchive.region_id.is_(None),
-            )
+        .where(
+            AdminDailyReportArchive.report_date == report_date,
+            AdminDailyReportArchive.department_id.is_(None),
+            AdminDailyReportArchive.region_id.is_(None),
         )
+        .subquery()
+    )
+    # Both sides match at most one row, so a full join on true returns the job and archive in one round trip.
+    health_stmt = select(
+        aliased(NotificationJob, job_subquery),
+        archive_subquery.c.id,
+        archive_subquery.c.created_at,
+        archive_subquery.c.employee_count,
+        archive_subquery.c.file_size_bytes,
+    ).select_from(job_subquery).join(archive_subquery, true(), full=True)
+    try:
+        row = session.execute(health_stmt).first()
     except Exception as exc:
         return {
             "report_date": report_date.isoformat(),
@@ -2313,21 +2768,20 @@ def get_daily_report_job_health(
             "alarms": ["DAILY_REPORT_HEALTH_QUERY_FAILED"],
         }
 
-    alarms: list[str] = []
-    archive_exists = archive is not None
-    archive_id = int(archive.id) if archive is not None else None
-    archive_created_at = (
-        archive.created_at.isoformat()
-        if archive is not None and archive.created_at is not None
-        else None
+    job, archive_id, archive_created_at_utc, archive_employee_count, archive_file_size_bytes = (
+        row if row is not None else (None, None, None, None, None)
     )
-    archive_employee_count = int(archive.employee_count or 0) if archive is not None else 0
-    archive_file_size_bytes = int(archive.file_size_bytes or 0) if archive is not None else 0
-    if (not archive_exists) and local_now.time() >= time(0, 15):
+    alarms: list[str] = []
+    archive_exists = archive_id is not None
+    archive_id = int(archive_id) if archive_id is not None else None
+    archive_created_at = archive_created_at_utc.isoformat() if archive_created_at_utc is not None else None
+    archive_employee_count = int(archive_employee_count or 0)
+    archive_file_size_bytes = int(archive_file_size_bytes or 0)
+    if (not archive_exists) and local_time >= time(0, 15):
         alarms.append("DAILY_REPORT_ARCHIVE_MISSING")
 
     if job is None:
-        if local_now.time() >= time(0, 15):
+        if local_time >= time(0, 15):
             alarms.append("DAILY_REPORT_JOB_MISSING")
         return {
             "report_date": report_date.isoformat(),
@@ -2372,11 +2826,11 @@ def get_daily_report_job_health(
 
     if job.status == "FAILED":
         alarms.append("DAILY_REPORT_JOB_FAILED")
-    if local_now.time() >= time(0, 30) and job.status in {"PENDING", "SENDING"}:
+    if local_time >= time(0, 30) and job.status in {"PENDING", "SENDING"}:
         alarms.append("DAILY_REPORT_JOB_STUCK")
     if job.status == "SENT" and not delivery_succeeded:
         alarms.append("DAILY_REPORT_DELIVERY_EMPTY")
-    if target_zero and local_now.time() >= time(0, 30):
+    if target_zero and local_time >= time(0, 30):
         alarms.append("DAILY_REPORT_TARGET_ZERO")
     if archive_id is not None and payload_archive_id is not None and payload_archive_id != archive_id:
         alarms.append("DAILY_REPORT_ARCHIVE_MISMATCH")
@@ -2480,65 +2934,69 @@ def schedule_daily_admin_report_archive_notifications(
     deleted_archive_count_by_limit = _cleanup_archive_overflow(session)
     deleted_archive_count = deleted_archive_count_by_expiry + deleted_archive_count_by_limit
 
-    if archive_created or ensured_job is not None or deleted_archive_count > 0:
-        session.commit()
-
-    if ensured_job is not None:
-        session.refresh(ensured_job)
-
-    if archive_created and ensured_job is not None:
-        log_audit(
-            session,
-            actor_type=AuditActorType.SYSTEM,
-            actor_id="notification_scheduler",
-            action="ADMIN_DAILY_REPORT_ARCHIVE_CREATED",
-            success=True,
-            entity_type="admin_daily_report_archive",
-            entity_id=str(archive.id),
-            details={
-                "report_date": report_date.isoformat(),
-                "file_name": archive.file_name,
-                "file_size_bytes": archive_bytes_len,
-                "employee_count": employee_count,
-                "notification_job_id": ensured_job.id,
-            },
-        )
+    audit_rows: list[dict[str, Any]] = []
     if ensured_job is not None:
-        log_audit(
-            session,
-            actor_type=AuditActorType.SYSTEM,
-            actor_id="notification_scheduler",
-            action="NOTIFICATION_JOB_CREATED",
-            success=True,
-            entity_type="notification_job",
-            entity_id=str(ensured_job.id),
-            details={
-                "job_type": ensured_job.job_type,
-                "idempotency_key": ensured_job.idempotency_key,
-                "scheduled_at_utc": ensured_job.scheduled_at_utc.isoformat(),
-                "report_date": report_date.isoformat(),
-                "archive_id": archive.id,
-                "job_state": ensured_job_state,
-            },
+        session.flush()
+        if archive_created:
+            audit_rows.append(
+                {
+                    "actor_type": AuditActorType.SYSTEM,
+                    "actor_id": "notification_scheduler",
+                    "action": "ADMIN_DAILY_REPORT_ARCHIVE_CREATED",
+                    "success": True,
+                    "entity_type": "admin_daily_report_archive",
+                    "entity_id": str(archive.id),
+                    "details": {
+                        "report_date": report_date.isoformat(),
+                        "file_name": archive.file_name,
+                        "file_size_bytes": archive_bytes_len,
+                        "employee_count": employee_count,
+                        "notification_job_id": ensured_job.id,
+                    },
+                }
+            )
+        audit_rows.append(
+            {
+                "actor_type": AuditActorType.SYSTEM,
+                "actor_id": "notification_scheduler",
+                "action": "NOTIFICATION_JOB_CREATED",
+                "success": True,
+                "entity_type": "notification_job",
+                "entity_id": str(ensured_job.id),
+                "details": {
+                    "job_type": ensured_job.job_type,
+                    "idempotency_key": ensured_job.idempotency_key,
+                    "scheduled_at_utc": ensured_job.scheduled_at_utc.isoformat(),
+                    "report_date": report_date.isoformat(),
+                    "archive_id": archive.id,
+                    "job_state": ensured_job_state,
+                },
+            }
         )
     if deleted_archive_count > 0:
-        log_audit(
-            session,
-            actor_type=AuditActorType.SYSTEM,
-            actor_id="notification_scheduler",
-            action="ADMIN_DAILY_REPORT_ARCHIVE_CLEANUP",
-            success=True,
-            entity_type="admin_daily_report_archive",
-            entity_id=None,
-            details={
-                "deleted_count": deleted_archive_count,
-                "deleted_by_expiry": deleted_archive_count_by_expiry,
-                "deleted_by_limit": deleted_archive_count_by_limit,
-                "retention_days": max(0, int(get_settings().daily_report_archive_retention_days)),
-                "max_rows": max(0, int(get_settings().daily_report_archive_max_rows)),
-            },
+        settings = get_settings()
+        audit_rows.append(
+            {
+                "actor_type": AuditActorType.SYSTEM,
+                "actor_id": "notification_scheduler",
+                "action": "ADMIN_DAILY_REPORT_ARCHIVE_CLEANUP",
+                "success": True,
+                "entity_type": "admin_daily_report_archive",
+                "entity_id": None,
+                "details": {
+                    "deleted_count": deleted_archive_count,
+                    "deleted_by_expiry": deleted_archive_count_by_expiry,
+                    "deleted_by_limit": deleted_archive_count_by_limit,
+                    "retention_days": max(0, int(settings.daily_report_archive_retention_days)),
+                    "max_rows": max(0, int(settings.daily_report_archive_max_rows)),
+                },
+            }
         )
 
+    if archive_created or ensured_job is not None or deleted_archive_count > 0:
+        session.commit()
+    log_audit_many(session, audit_rows)
+
     if ensured_job is None:
         return []
     return [ensured_job]
@@ -2560,10 +3018,19 @@ def send_pending_notifications(
                 channel=channel,
             )
 
+    if channel is None:
+        with EmailChannel() as batch_channel:
+            return send_pending_notifications(
+                limit=limit,
+                now_utc=now_utc,
+                db=db,
+                channel=batch_channel,
+            )
+
     session = db
     reference_utc = _normalize_ts(now_utc or datetime.now(timezone.utc))
     email_enabled = bool(get_settings().notification_email_enabled)
-    email_channel = channel or EmailChannel()
+    email_channel = channel
 
     claimed_jobs = _claim_due_pending_jobs(
         session,
@@ -2582,8 +3049,25 @@ def send_pending_notifications(
         current_jobs_by_id[int(current_job.id)] = current_job
         if _is_grouped_admin_absence_job(current_job):
             grouped_admin_absence_jobs.setdefault(_grouped_admin_absence_key(current_job), []).append(current_job)
+    employee_labels = _load_employee_labels(
+        session,
+        employee_ids={
+            int(current_job.employee_id)
+            for current_job in current_jobs_by_id.values()
+            if _job_needs_employee_label(current_job)
+        },
+    )
+    day_attendance_bounds = _load_day_attendance_bounds(
+        session,
+        keys={
+            (int(current_job.employee_id), local_day)
+            for current_job in current_jobs_by_id.values()
+            if (local_day := _job_attendance_day(current_job)) is not None
+        },
+    )
 
     processed: list[NotificationJob] = []
+    audit_rows: list[dict[str, Any]] = []
     handled_group_keys: set[str] = set()
     for claimed in claimed_jobs:
         try:
@@ -2602,6 +3086,7 @@ def send_pending_notifications(
                         reference_utc=reference_utc,
                         email_enabled=email_enabled,
                         email_channel=email_channel,
+                        audit_rows=audit_rows,
                     )
                 )
                 continue
@@ -2636,7 +3121,12 @@ def send_pending_notifications(
                 if sent_job is not None:
                     processed.append(sent_job)
                 continue
-            message = _build_message_for_job(session, current_job)
+            message = _build_message_for_job(
+                session,
+                current_job,
+                employee_labels=employee_labels,
+                day_attendance_bounds=day_attendance_bounds,
+            )
             push_summary: dict[str, Any] = {
                 "total_targets": 0,
                 "sent": 0,
@@ -2723,28 +3213,29 @@ def send_pending_notifications(
                 )
                 if sent_job is not None:
                     processed.append(sent_job)
-                    log_audit(
-                        session,
-                        actor_type=AuditActorType.SYSTEM,
-                        actor_id="notification_runner",
-                        action="NOTIFICATION_JOB_SKIPPED_NO_TARGET",
-                        success=True,
-                        entity_type="notification_job",
-                        entity_id=str(sent_job.id),
-                        details={
-                            "job_type": sent_job.job_type,
-                            "employee_id": sent_job.employee_id,
-                            "attempts": sent_job.attempts,
-                            "idempotency_key": sent_job.idempotency_key,
-                            "push_total_targets": push_total_targets,
-                            "push_sent": push_sent,
-                            "push_failed": push_failed,
-                            "push_deactivated": push_deactivated,
-                            "email_mode": email_result.get("mode"),
-                            "email_sent": email_sent,
-                            "target_zero": True,
-                            "skipped_no_targets": True,
-                        },
+                    audit_rows.append(
+                        {
+                            "actor_type": AuditActorType.SYSTEM,
+                            "actor_id": "notification_runner",
+                            "action": "NOTIFICATION_JOB_SKIPPED_NO_TARGET",
+                            "success": True,
+                            "entity_type": "notification_job",
+                            "entity_id": str(sent_job.id),
+                            "details": {
+                                "job_type": sent_job.job_type,
+                                "employee_id": sent_job.employee_id,
+                                "attempts": sent_job.attempts,
+                                "idempotency_key": sent_job.idempotency_key,
+                                "push_total_targets": push_total_targets,
+                                "push_sent": push_sent,
+                                "push_failed": push_failed,
+                                "push_deactivated": push_deactivated,
+                                "email_mode": email_result.get("mode"),
+                                "email_sent": email_sent,
+                                "target_zero": True,
+                                "skipped_no_targets": True,
+                            },
+                        }
                     )
                 continue
             if not delivery_ok:
@@ -2774,26 +3265,27 @@ def send_pending_notifications(
             )
             if sent_job is not None:
                 processed.append(sent_job)
-                log_audit(
-                    session,
-                    actor_type=AuditActorType.SYSTEM,
-                    actor_id="notification_runner",
-                    action="NOTIFICATION_JOB_SENT",
-                    success=True,
-                    entity_type="notification_job",
-                    entity_id=str(sent_job.id),
-                    details={
-                        "job_type": sent_job.job_type,
-                        "employee_id": sent_job.employee_id,
-                        "attempts": sent_job.attempts,
-                        "idempotency_key": sent_job.idempotency_key,
-                        "push_total_targets": push_total_targets,
-                        "push_sent": push_sent,
-                        "push_failed": push_failed,
-                        "push_deactivated": push_deactivated,
-                        "email_mode": email_result.get("mode"),
-                        "email_sent": email_sent,
-                    },
+                audit_rows.append(
+                    {
+                        "actor_type": AuditActorType.SYSTEM,
+                        "actor_id": "notification_runner",
+                        "action": "NOTIFICATION_JOB_SENT",
+                        "success": True,
+                        "entity_type": "notification_job",
+                        "entity_id": str(sent_job.id),
+                        "details": {
+                            "job_type": sent_job.job_type,
+                            "employee_id": sent_job.employee_id,
+                            "attempts": sent_job.attempts,
+                            "idempotency_key": sent_job.idempotency_key,
+                            "push_total_targets": push_total_targets,
+                            "push_sent": push_sent,
+                            "push_failed": push_failed,
+                            "push_deactivated": push_deactivated,
+                            "email_mode": email_result.get("mode"),
+                            "email_sent": email_sent,
+                        },
+                    }
                 )
         except Exception as exc:
             failed_job = _mark_job_failure(
@@ -2804,21 +3296,24 @@ def send_pending_notifications(
             )
             if failed_job is not None:
                 processed.append(failed_job)
-                log_audit(
-                    session,
-                    actor_type=AuditActorType.SYSTEM,
-                    actor_id="notification_runner",
-                    action="NOTIFICATION_JOB_FAILED",
-                    success=False,
-                    entity_type="notification_job",
-                    entity_id=str(failed_job.id),
-                    details={
-                        "job_type": failed_job.job_type,
-                        "employee_id": failed_job.employee_id,
-                        "attempts": failed_job.attempts,
-                        "status": failed_job.status,
-                        "error": failed_job.last_error,
-                    },
+                audit_rows.append(
+                    {
+                        "actor_type": AuditActorType.SYSTEM,
+                        "actor_id": "notification_runner",
+                        "action": "NOTIFICATION_JOB_FAILED",
+                        "success": False,
+                        "entity_type": "notification_job",
+                        "entity_id": str(failed_job.id),
+                        "details": {
+                            "job_type": failed_job.job_type,
+                            "employee_id": failed_job.employee_id,
+                            "attempts": failed_job.attempts,
+                            "status": failed_job.status,
+                            "error": failed_job.last_error,
+                        },
+                    }
                 )
 
+    # Job state transitions are already committed, so only the audit rows ride the async commit.
+    log_audit_many(session, audit_rows, asynchronous_commit=get_settings().audit_commit_async)
     return processed
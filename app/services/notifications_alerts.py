@@ -3,9 +3,15 @@ from __future__ import annotations
 import json
 import logging
 import os
+import random
 import smtplib
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from email.message import EmailMessage
+from email.utils import parsedate_to_datetime
+from functools import partial
 from typing import Any
 from urllib import error as urllib_error
 from urllib import request as urllib_request
@@ -14,6 +20,10 @@ from app.settings import get_settings
 
 logger = logging.getLogger("app.notification_alerts")
 
+ALARM_POST_MAX_ATTEMPTS = 4
+ALARM_POST_BACKOFF_SECONDS = 0.5
+ALARM_POST_RETRY_AFTER_MAX_SECONDS = 10
+
 
 def _utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -22,12 +32,70 @@ def _utcnow_iso() -> str:
 def _normalize_alarm_codes(raw: Any) -> list[str]:
     if not isinstance(raw, list):
         return []
-    values: list[str] = []
-    for item in raw:
-        normalized = str(item or "").strip()
-        if normalized:
-            values.append(normalized)
-    return values
+    return [normalized for normalized in (str(item or "").strip() for item in raw) if normalized]
+
+
+def _parse_retry_after_seconds(raw_value: str | None) -> float | None:
+    value = (raw_value or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _http_failure_retry_after(status_code: int, headers: Any) -> float | None:
+    if status_code != 429 and status_code < 500:
+        return None
+    retry_after = _parse_retry_after_seconds(headers.get("Retry-After") if headers is not None else None)
+    return 0.0 if retry_after is None else retry_after
+
+
+def _post_json_once(
+    request: urllib_request.Request,
+    *,
+    timeout_seconds: int,
+) -> tuple[dict[str, Any], float | None]:
+    try:
+        with urllib_request.urlopen(request, timeout=max(1, timeout_seconds)) as response:
+            status_code = int(getattr(response, "status", 200) or 200)
+            if 200 <= status_code < 300:
+                return {
+                    "ok": True,
+                    "status_code": status_code,
+                    "error": None,
+                }, None
+            return {
+                "ok": False,
+                "status_code": status_code,
+                "error": response.read(512).decode("utf-8", errors="ignore"),
+            }, _http_failure_retry_after(status_code, response.headers)
+    except urllib_error.HTTPError as exc:
+        error_body = exc.read(512).decode("utf-8", errors="ignore")
+        return {
+            "ok": False,
+            "status_code": int(exc.code),
+            "error": error_body or str(exc),
+        }, _http_failure_retry_after(int(exc.code), exc.headers)
+    except (urllib_error.URLError, ConnectionError) as exc:
+        # The request never reached the receiver (DNS, refused, reset, connect timeout), so resending is safe.
+        return {
+            "ok": False,
+            "status_code": None,
+            "error": str(exc),
+        }, 0.0
+    except Exception as exc:  # read timeouts may already have delivered; bad URLs never will
+        return {
+            "ok": False,
+            "status_code": None,
+            "error": str(exc),
+        }, None
 
 
 def _post_json(
@@ -50,28 +118,26 @@ def _post_json(
         if normalized_key and normalized_value:
             request.add_header(normalized_key, normalized_value)
 
-    try:
-        with urllib_request.urlopen(request, timeout=max(1, timeout_seconds)) as response:
-            status_code = int(getattr(response, "status", 200) or 200)
-            response_body = response.read(512).decode("utf-8", errors="ignore")
-            return {
-                "ok": 200 <= status_code < 300,
-                "status_code": status_code,
-                "error": None if 200 <= status_code < 300 else response_body,
-            }
-    except urllib_error.HTTPError as exc:
-        error_body = exc.read(512).decode("utf-8", errors="ignore")
-        return {
-            "ok": False,
-            "status_code": int(exc.code),
-            "error": error_body or str(exc),
-        }
-    except Exception as exc:  # pragma: no cover - network/timeout defensive path
-        return {
-            "ok": False,
-            "status_code": None,
-            "error": str(exc),
-        }
+    result, retry_after = _post_json_once(request, timeout_seconds=timeout_seconds)
+    for attempt in range(1, ALARM_POST_MAX_ATTEMPTS):
+        if retry_after is None or retry_after > ALARM_POST_RETRY_AFTER_MAX_SECONDS:
+            break
+        backoff_seconds = max(
+            retry_after,
+            ALARM_POST_BACKOFF_SECONDS * (2 ** (attempt - 1)) + random.uniform(0, 0.3),
+        )
+        logger.warning(
+            "notification_alarm_post_retry",
+            extra={
+                "attempt": attempt + 1,
+                "max_attempts": ALARM_POST_MAX_ATTEMPTS,
+                "status_code": result["status_code"],
+                "backoff_seconds": round(backoff_seconds, 3),
+            },
+        )
+        time.sleep(backoff_seconds)
+        result, retry_after = _post_json_once(request, timeout_seconds=timeout_seconds)
+    return result
 
 
 def _send_alarm_email(*, recipients: list[str], subject: str, body: str) -> dict[str, Any]:
@@ -122,16 +188,55 @@ def _send_alarm_email(*, recipients: list[str], subject: str, body: str) -> dict
     }
 
 
+def _send_alarm_email_safely(*, recipients: list[str], subject: str, body: str) -> dict[str, Any]:
+    try:
+        return _send_alarm_email(recipients=recipients, subject=subject, body=body)
+    except Exception as exc:  # pragma: no cover - smtp runtime defensive path
+        return {
+            "configured": True,
+            "ok": False,
+            "sent": 0,
+            "error": str(exc),
+        }
+
+
+def _run_alarm_deliveries(deliveries: dict[str, Callable[[], dict[str, Any]]]) -> dict[str, dict[str, Any]]:
+    if len(deliveries) <= 1:
+        return {name: deliver() for name, deliver in deliveries.items()}
+    # Channels are independent network calls, so the slowest one bounds the dispatch instead of their sum.
+    with ThreadPoolExecutor(max_workers=len(deliveries), thread_name_prefix="alarm") as executor:
+        futures = {name: executor.submit(deliver) for name, deliver in deliveries.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
 def dispatch_daily_report_alarm(
     *,
     daily_report_health: dict[str, Any],
     cleared: bool,
 ) -> dict[str, Any]:
     settings = get_settings()
+    status_text = "CLEARED" if cleared else "ALARM"
+    any_channel_configured = bool(
+        (settings.notification_alarm_webhook_url or "").strip()
+        or (settings.notification_alarm_discord_webhook_url or "").strip()
+        or (
+            (settings.notification_alarm_telegram_bot_token or "").strip()
+            and (settings.notification_alarm_telegram_chat_id or "").strip()
+        )
+        or (settings.notification_email_enabled and (settings.notification_alarm_email_to or "").strip())
+    )
+    if not any_channel_configured:
+        logger.debug("notification_daily_report_alarm_no_channels", extra={"status": status_text})
+        return {
+            "status": status_text,
+            "configured_channels": 0,
+            "successful_channels": 0,
+            "channels": {},
+        }
+
     alarms = _normalize_alarm_codes(daily_report_health.get("alarms"))
     report_date = str(daily_report_health.get("report_date") or "-")
     evaluated_at_utc = str(daily_report_health.get("evaluated_at_utc") or _utcnow_iso())
-    status_text = "CLEARED" if cleared else "ALARM"
     title = f"[{status_text}] Daily report job health ({report_date})"
     body = (
         f"status={daily_report_health.get('status') or '-'} "
@@ -161,47 +266,24 @@ def dispatch_daily_report_alarm(
         },
     }
 
+    deliveries: dict[str, Callable[[], dict[str, Any]]] = {}
     webhook_url = (settings.notification_alarm_webhook_url or "").strip()
     webhook_token = (settings.notification_alarm_webhook_token or "").strip()
-    webhook_result = {
-        "configured": bool(webhook_url),
-        "ok": False,
-        "status_code": None,
-        "error": None,
-    }
     if webhook_url:
         webhook_headers: dict[str, str] = {}
         if webhook_token:
             webhook_headers["Authorization"] = f"Bearer {webhook_token}"
-        webhook_result = {
-            "configured": True,
-            **_post_json(url=webhook_url, payload=payload, headers=webhook_headers),
-        }
+        deliveries["webhook"] = partial(_post_json, url=webhook_url, payload=payload, headers=webhook_headers)
 
     discord_webhook_url = (settings.notification_alarm_discord_webhook_url or "").strip()
-    discord_result = {
-        "configured": bool(discord_webhook_url),
-        "ok": False,
-        "status_code": None,
-        "error": None,
-    }
     if discord_webhook_url:
         discord_payload = {
             "content": f"**{title}**\n{body}",
         }
-        discord_result = {
-            "configured": True,
-            **_post_json(url=discord_webhook_url, payload=discord_payload),
-        }
+        deliveries["discord"] = partial(_post_json, url=discord_webhook_url, payload=discord_payload)
 
     telegram_token = (settings.notification_alarm_telegram_bot_token or "").strip()
     telegram_chat_id = (settings.notification_alarm_telegram_chat_id or "").strip()
-    telegram_result = {
-        "configured": bool(telegram_token and telegram_chat_id),
-        "ok": False,
-        "status_code": None,
-        "error": None,
-    }
     if telegram_token and telegram_chat_id:
         telegram_url = f"https://api.telegram.org/bot{telegram_token}/sendMessage"
         telegram_payload = {
@@ -209,10 +291,7 @@ def dispatch_daily_report_alarm(
             "text": f"{title}\n{body}",
             "disable_notification": bool(cleared),
         }
-        telegram_result = {
-            "configured": True,
-            **_post_json(url=telegram_url, payload=telegram_payload),
-        }
+        deliveries["telegram"] = partial(_post_json, url=telegram_url, payload=telegram_payload)
 
     email_targets = (
         [
@@ -223,6 +302,43 @@ def dispatch_daily_report_alarm(
         if settings.notification_email_enabled
         else []
     )
+    if email_targets:
+        deliveries["email"] = partial(
+            _send_alarm_email_safely,
+            recipients=email_targets,
+            subject=title,
+            body=body,
+        )
+
+    delivery_results = _run_alarm_deliveries(deliveries)
+
+    webhook_result = {
+        "configured": bool(webhook_url),
+        "ok": False,
+        "status_code": None,
+        "error": None,
+    }
+    if "webhook" in delivery_results:
+        webhook_result = {"configured": True, **delivery_results["webhook"]}
+
+    discord_result = {
+        "configured": bool(discord_webhook_url),
+        "ok": False,
+        "status_code": None,
+        "error": None,
+    }
+    if "discord" in delivery_results:
+        discord_result = {"configured": True, **delivery_results["discord"]}
+
+    telegram_result = {
+        "configured": bool(telegram_token and telegram_chat_id),
+        "ok": False,
+        "status_code": None,
+        "error": None,
+    }
+    if "telegram" in delivery_results:
+        telegram_result = {"configured": True, **delivery_results["telegram"]}
+
     email_result = {
         "enabled": bool(settings.notification_email_enabled),
         "configured": bool(email_targets),
@@ -232,20 +348,8 @@ def dispatch_daily_report_alarm(
     }
     if not settings.notification_email_enabled:
         email_result["error"] = "EMAIL_DISABLED"
-    elif email_targets:
-        try:
-            email_result = _send_alarm_email(
-                recipients=email_targets,
-                subject=title,
-                body=body,
-            )
-        except Exception as exc:  # pragma: no cover - smtp runtime defensive path
-            email_result = {
-                "configured": True,
-                "ok": False,
-                "sent": 0,
-                "error": str(exc),
-            }
+    elif "email" in delivery_results:
+        email_result = delivery_results["email"]
 
     channels = {
         "webhook": webhook_result,
@@ -6,7 +6,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.errors import ApiError
 from app.models import Device, DevicePasskey, Employee, WebAuthnChallenge
@@ -40,6 +40,28 @@ except Exception:  # pragma: no cover - dependency runtime guard
     UserVerificationRequirement = None  # type: ignore[assignment]
 
 
+def _options_to_json_dict_fallback(options: Any) -> dict[str, Any]:
+    return json.loads(options_to_json(options))
+
+
+try:
+    from webauthn.helpers import options_to_json_dict
+except ImportError:  # pragma: no cover - webauthn < 2.6 has no dict helper
+    options_to_json_dict = _options_to_json_dict_fallback  # type: ignore[assignment]
+
+
+_RUNTIME_READY = all(
+    dependency is not None
+    for dependency in (
+        generate_registration_options,
+        generate_authentication_options,
+        options_to_json,
+        verify_registration_response,
+        verify_authentication_response,
+        base64url_to_bytes,
+    )
+)
+
 PASSKEY_PURPOSE_REGISTER = "PASSKEY_REGISTER"
 PASSKEY_PURPOSE_RECOVER = "PASSKEY_RECOVER"
 
@@ -64,14 +86,7 @@ def _ensure_runtime() -> None:
             code="PASSKEY_DISABLED",
             message="Passkey modu devre disi.",
         )
-    if (
-        generate_registration_options is None
-        or generate_authentication_options is None
-        or options_to_json is None
-        or verify_registration_response is None
-        or verify_authentication_response is None
-        or base64url_to_bytes is None
-    ):
+    if not _RUNTIME_READY:
         raise ApiError(
             status_code=500,
             code="PASSKEY_RUNTIME_UNAVAILABLE",
@@ -81,7 +96,9 @@ def _ensure_runtime() -> None:
 
 def _resolve_active_device(db: Session, device_fingerprint: str) -> Device:
     device = db.scalar(
-        select(Device).where(
+        select(Device)
+        .options(joinedload(Device.employee))
+        .where(
             Device.device_fingerprint == device_fingerprint,
             Device.is_active.is_(True),
         )
@@ -114,7 +131,13 @@ def _build_expiry() -> datetime:
     return _utc_now() + timedelta(minutes=minutes)
 
 
-def _load_valid_challenge(db: Session, *, challenge_id: int, purpose: str) -> WebAuthnChallenge:
+def _load_valid_challenge(
+    db: Session,
+    *,
+    challenge_id: int,
+    purpose: str,
+    now: datetime | None = None,
+) -> WebAuthnChallenge:
     challenge = db.get(WebAuthnChallenge, challenge_id)
     if challenge is None or challenge.purpose != purpose:
         raise ApiError(
@@ -123,7 +146,8 @@ def _load_valid_challenge(db: Session, *, challenge_id: int, purpose: str) -> We
             message="Passkey challenge bulunamadi.",
         )
 
-    now = _utc_now()
+    if now is None:
+        now = _utc_now()
     if challenge.used_at is not None:
         raise ApiError(
             status_code=409,
@@ -159,22 +183,20 @@ def create_registration_options(
     _ensure_runtime()
     device = _resolve_active_device(db, device_fingerprint)
 
-    active_passkeys = list(
-        db.scalars(
-            select(DevicePasskey).where(
-                DevicePasskey.device_id == device.id,
-                DevicePasskey.is_active.is_(True),
-            )
-        ).all()
-    )
+    active_credential_ids = db.scalars(
+        select(DevicePasskey.credential_id).where(
+            DevicePasskey.device_id == device.id,
+            DevicePasskey.is_active.is_(True),
+        )
+    ).all()
 
     exclude_credentials: list[PublicKeyCredentialDescriptor] = []
     if PublicKeyCredentialDescriptor is not None and base64url_to_bytes is not None:
-        for passkey in active_passkeys:
+        for credential_id in active_credential_ids:
             try:
                 exclude_credentials.append(
                     PublicKeyCredentialDescriptor(
-                        id=base64url_to_bytes(passkey.credential_id),
+                        id=base64url_to_bytes(credential_id),
                     )
                 )
             except Exception:
@@ -199,7 +221,7 @@ def create_registration_options(
         ),
         exclude_credentials=exclude_credentials,
     )
-    options_json = json.loads(options_to_json(options))
+    options_json = options_to_json_dict(options)
     challenge_value = str(options_json.get("challenge") or "").strip()
     if not challenge_value:
         raise ApiError(
@@ -229,7 +251,13 @@ def verify_registration(
     credential: dict[str, Any],
 ) -> DevicePasskey:
     _ensure_runtime()
-    challenge = _load_valid_challenge(db, challenge_id=challenge_id, purpose=PASSKEY_PURPOSE_REGISTER)
+    now = _utc_now()
+    challenge = _load_valid_challenge(
+        db,
+        challenge_id=challenge_id,
+        purpose=PASSKEY_PURPOSE_REGISTER,
+        now=now,
+    )
     if challenge.device_id is None:
         raise ApiError(
             status_code=409,
@@ -284,7 +312,7 @@ def verify_registration(
             sign_count=sign_count,
             transports=transports,
             is_active=True,
-            last_used_at=_utc_now(),
+            last_used_at=now,
         )
         db.add(passkey)
     else:
@@ -293,9 +321,9 @@ def verify_registration(
         passkey.sign_count = sign_count
         passkey.transports = transports
         passkey.is_active = True
-        passkey.last_used_at = _utc_now()
+        passkey.last_used_at = now
 
-    challenge.used_at = _utc_now()
+    challenge.used_at = now
     db.commit()
     db.refresh(passkey)
     return passkey
@@ -317,7 +345,7 @@ def create_recover_options(
             else None
         ),
     )
-    options_json = json.loads(options_to_json(options))
+    options_json = options_to_json_dict(options)
     challenge_value = str(options_json.get("challenge") or "").strip()
     if not challenge_value:
         raise ApiError(
@@ -347,7 +375,13 @@ def verify_recover(
     credential: dict[str, Any],
 ) -> Device:
     _ensure_runtime()
-    challenge = _load_valid_challenge(db, challenge_id=challenge_id, purpose=PASSKEY_PURPOSE_RECOVER)
+    now = _utc_now()
+    challenge = _load_valid_challenge(
+        db,
+        challenge_id=challenge_id,
+        purpose=PASSKEY_PURPOSE_RECOVER,
+        now=now,
+    )
 
     credential_id = None
     if isinstance(credential, dict):
@@ -374,7 +408,7 @@ def verify_recover(
             message="Bu passkey kayitli degil.",
         )
 
-    device = db.get(Device, passkey.device_id)
+    device = db.get(Device, passkey.device_id, options=[joinedload(Device.employee)])
     if device is None or not device.is_active:
         raise ApiError(
             status_code=404,
@@ -406,8 +440,8 @@ def verify_recover(
         ) from exc
 
     passkey.sign_count = int(getattr(verification, "new_sign_count", passkey.sign_count) or 0)
-    passkey.last_used_at = _utc_now()
-    challenge.used_at = _utc_now()
+    passkey.last_used_at = now
+    challenge.used_at = now
     db.commit()
     db.refresh(device)
     return device
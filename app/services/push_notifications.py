@@ -1,12 +1,23 @@
 from __future__ import annotations
 
 import json
+import os
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
+from urllib.parse import urlparse
 
-from pywebpush import WebPushException, webpush
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import requests
+from py_vapid import Vapid
+from pywebpush import WebPushException, WebPusher
+from requests.adapters import HTTPAdapter
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session, contains_eager
+from urllib3.util.retry import Retry
 
 from app.db import SessionLocal
 from app.errors import ApiError
@@ -19,17 +30,34 @@ from app.models import (
 )
 from app.settings import get_public_base_url, get_settings, is_push_enabled
 
+PUSH_DELIVERY_MAX_WORKERS = 32
+VAPID_TOKEN_TTL_SECONDS = 12 * 60 * 60
+PUSH_HTTP_TIMEOUT_SECONDS = (3, 10)
 
-def _utcnow() -> datetime:
-    return datetime.now(timezone.utc)
 
+@dataclass(frozen=True, slots=True)
+class _DevicePushTarget:
+    id: int
+    device_id: int
+    employee_id: int | None
+    endpoint: str
+    p256dh: str
+    auth: str
+    is_active: bool
 
-def _as_utc_datetime(value: datetime | None) -> datetime | None:
-    if value is None:
-        return None
-    if value.tzinfo is None:
-        return value.replace(tzinfo=timezone.utc)
-    return value.astimezone(timezone.utc)
+
+@dataclass(frozen=True, slots=True)
+class _AdminPushTarget:
+    id: int
+    admin_user_id: int | None
+    admin_username: str
+    endpoint: str
+    p256dh: str
+    auth: str
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 def _resolve_vapid_subject(raw_subject: str | None) -> str:
@@ -238,6 +266,7 @@ def list_active_push_subscriptions(
         select(DevicePushSubscription)
         .join(Device, Device.id == DevicePushSubscription.device_id)
         .join(Employee, Employee.id == Device.employee_id)
+        .options(contains_eager(DevicePushSubscription.device))
         .where(
             DevicePushSubscription.is_active.is_(True),
             Device.is_active.is_(True),
@@ -326,42 +355,82 @@ def list_active_admin_push_subscriptions(
     return list(db.scalars(stmt).all())
 
 
-def _send_to_subscription_row(
+@lru_cache(maxsize=1)
+def _push_http_session() -> requests.Session:
+    # Keep-alive connections per push origin let a broadcast skip the TCP+TLS handshake after the first few sends.
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        # Push POSTs are not idempotent: only retry when the connection never opened.
+        max_retries=Retry(
+            total=1,
+            connect=1,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.2,
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        ),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+def _push_audience(endpoint: str) -> str:
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def _sign_vapid_headers(audiences: Iterable[str]) -> dict[str, dict[str, str]]:
+    settings = get_settings()
+    private_key = settings.push_vapid_private_key or ""
+    if os.path.isfile(private_key):
+        vapid = Vapid.from_file(private_key_file=private_key)
+    else:
+        vapid = Vapid.from_string(private_key=private_key)
+    subject = _resolve_vapid_subject(settings.push_vapid_subject)
+    expires_at = int(time.time()) + VAPID_TOKEN_TTL_SECONDS
+    # The VAPID JWT only depends on the push service origin, so one signature covers every endpoint there.
+    return {
+        audience: vapid.sign({"aud": audience, "sub": subject, "exp": expires_at})
+        for audience in set(audiences)
+    }
+
+
+def _deliver_push(
     *,
     endpoint: str,
     p256dh: str,
     auth_key: str,
-    title: str,
-    body: str,
-    data: dict[str, Any] | None,
+    payload_bytes: bytes,
+    vapid_headers: dict[str, str],
 ) -> tuple[bool, str | None, int | None]:
-    if not is_push_enabled():
-        return False, "push_disabled", None
-
-    settings = get_settings()
-    vapid_subject = _resolve_vapid_subject(settings.push_vapid_subject)
-    payload = {
-        "title": title,
-        "body": body,
-        "data": _with_push_delivery_defaults(data),
-        "ts_utc": _utcnow().isoformat(),
-    }
     try:
-        webpush(
-            subscription_info={
+        response = WebPusher(
+            {
                 "endpoint": endpoint,
                 "keys": {
                     "p256dh": p256dh,
                     "auth": auth_key,
                 },
             },
-            data=json.dumps(payload),
-            vapid_private_key=settings.push_vapid_private_key,
-            vapid_claims={"sub": vapid_subject},
-            content_encoding="aes128gcm",
-            headers={"Urgency": "high"},
+            requests_session=_push_http_session(),
+        ).send(
+            payload_bytes,
+            {"Urgency": "high", **vapid_headers},
             ttl=3600,
+            content_encoding="aes128gcm",
+            timeout=PUSH_HTTP_TIMEOUT_SECONDS,
         )
+        if response.status_code > 202:
+            raise WebPushException(
+                "Push failed: {} {}\nResponse body:{}".format(
+                    response.status_code, response.reason, response.text
+                ),
+                response=response,
+            )
         return True, None, None
     except WebPushException as exc:
         status_code: int | None = None
@@ -372,6 +441,89 @@ def _send_to_subscription_row(
         return False, str(exc), None
 
 
+def _send_to_subscription_row(
+    *,
+    endpoint: str,
+    p256dh: str,
+    auth_key: str,
+    title: str,
+    body: str,
+    data: dict[str, Any] | None,
+) -> tuple[bool, str | None, int | None]:
+    return _send_to_subscription_rows(
+        [(endpoint, p256dh, auth_key)],
+        title=title,
+        body=body,
+        data=data,
+    )[0]
+
+
+def _send_to_subscription_rows(
+    targets: list[tuple[str, str, str]],
+    *,
+    title: str,
+    body: str,
+    data: dict[str, Any] | None,
+) -> list[tuple[bool, str | None, int | None]]:
+    if not targets:
+        return []
+    if not is_push_enabled():
+        return [(False, "push_disabled", None)] * len(targets)
+    try:
+        vapid_headers_by_audience = _sign_vapid_headers(
+            _push_audience(endpoint) for endpoint, _, _ in targets
+        )
+    except Exception as exc:  # pragma: no cover - defensive path
+        return [(False, str(exc), None)] * len(targets)
+    # Only the ECE wrapping depends on the recipient, so the plaintext is built once per batch.
+    payload_bytes = json.dumps(
+        {
+            "title": title,
+            "body": body,
+            "data": _with_push_delivery_defaults(data),
+            "ts_utc": _utcnow().isoformat(),
+        }
+    ).encode("utf-8")
+
+    def deliver(target: tuple[str, str, str]) -> tuple[bool, str | None, int | None]:
+        endpoint, p256dh, auth_key = target
+        return _deliver_push(
+            endpoint=endpoint,
+            p256dh=p256dh,
+            auth_key=auth_key,
+            payload_bytes=payload_bytes,
+            vapid_headers=vapid_headers_by_audience[_push_audience(endpoint)],
+        )
+
+    if len(targets) == 1:
+        return [deliver(targets[0])]
+    # Each delivery is a blocking POST to the push service; overlap them and keep ORM writes on the caller thread.
+    with ThreadPoolExecutor(
+        max_workers=min(PUSH_DELIVERY_MAX_WORKERS, len(targets)),
+        thread_name_prefix="webpush",
+    ) as executor:
+        return list(executor.map(deliver, targets))
+
+
+def _apply_push_delivery_outcomes(
+    db: Session,
+    model: type[DevicePushSubscription] | type[AdminPushSubscription],
+    *,
+    sent_ids: list[int],
+    failed_updates: list[dict[str, Any]],
+    now_utc: datetime,
+) -> None:
+    if sent_ids:
+        db.execute(
+            update(model)
+            .where(model.id.in_(sent_ids))
+            .values(last_error=None, last_seen_at=now_utc)
+        )
+    if failed_updates:
+        # Error texts differ per row, so these go out as one executemany UPDATE keyed by primary key.
+        db.execute(update(model), failed_updates)
+
+
 def send_push_to_subscriptions(
     db: Session,
     *,
@@ -379,36 +531,59 @@ def send_push_to_subscriptions(
     title: str,
     body: str,
     data: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    return _send_push_to_device_targets(
+        db,
+        targets=[
+            _DevicePushTarget(
+                id=row.id,
+                device_id=row.device_id,
+                employee_id=row.device.employee_id if row.device is not None else None,
+                endpoint=row.endpoint,
+                p256dh=row.p256dh,
+                auth=row.auth,
+                is_active=row.is_active,
+            )
+            for row in subscriptions
+        ],
+        title=title,
+        body=body,
+        data=data,
+    )
+
+
+def _send_push_to_device_targets(
+    db: Session,
+    *,
+    targets: Sequence[_DevicePushTarget],
+    title: str,
+    body: str,
+    data: dict[str, Any] | None,
 ) -> dict[str, Any]:
     sent = 0
     failed = 0
     deactivated = 0
     failures: list[dict[str, Any]] = []
     deliveries: list[dict[str, Any]] = []
+    sent_ids: list[int] = []
+    failed_updates: list[dict[str, Any]] = []
     now_utc = _utcnow()
+    results = _send_to_subscription_rows(
+        [(row.endpoint, row.p256dh, row.auth) for row in targets],
+        title=title,
+        body=body,
+        data=data,
+    )
 
-    for row in subscriptions:
-        employee_id: int | None = None
-        if row.device is not None:
-            employee_id = row.device.employee_id
-
-        ok, error_text, status_code = _send_to_subscription_row(
-            endpoint=row.endpoint,
-            p256dh=row.p256dh,
-            auth_key=row.auth,
-            title=title,
-            body=body,
-            data=data,
-        )
-        row.last_seen_at = now_utc
+    for row, (ok, error_text, status_code) in zip(targets, results):
         if ok:
             sent += 1
-            row.last_error = None
+            sent_ids.append(row.id)
             deliveries.append(
                 {
                     "subscription_id": row.id,
                     "device_id": row.device_id,
-                    "employee_id": employee_id,
+                    "employee_id": row.employee_id,
                     "endpoint": row.endpoint,
                     "status": "SENT",
                 }
@@ -416,16 +591,23 @@ def send_push_to_subscriptions(
             continue
 
         failed += 1
-        row.last_error = error_text
-        if status_code in {404, 410}:
-            if row.is_active:
-                row.is_active = False
-                deactivated += 1
+        is_active = row.is_active
+        if status_code in {404, 410} and is_active:
+            is_active = False
+            deactivated += 1
+        failed_updates.append(
+            {
+                "id": row.id,
+                "last_error": error_text,
+                "last_seen_at": now_utc,
+                "is_active": is_active,
+            }
+        )
         failures.append(
             {
                 "subscription_id": row.id,
                 "device_id": row.device_id,
-                "employee_id": employee_id,
+                "employee_id": row.employee_id,
                 "endpoint": row.endpoint,
                 "status_code": status_code,
                 "error": error_text,
@@ -435,7 +617,7 @@ def send_push_to_subscriptions(
             {
                 "subscription_id": row.id,
                 "device_id": row.device_id,
-                "employee_id": employee_id,
+                "employee_id": row.employee_id,
                 "endpoint": row.endpoint,
                 "status": "FAILED",
                 "status_code": status_code,
@@ -443,9 +625,16 @@ def send_push_to_subscriptions(
             }
         )
 
+    _apply_push_delivery_outcomes(
+        db,
+        DevicePushSubscription,
+        sent_ids=sent_ids,
+        failed_updates=failed_updates,
+        now_utc=now_utc,
+    )
     db.commit()
     return {
-        "total_targets": len(subscriptions),
+        "total_targets": len(targets),
         "sent": sent,
         "failed": failed,
         "deactivated": deactivated,
@@ -525,7 +714,15 @@ def send_push_to_employees(
     data: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     stmt = (
-        select(DevicePushSubscription)
+        select(
+            DevicePushSubscription.id,
+            DevicePushSubscription.device_id,
+            Device.employee_id,
+            DevicePushSubscription.endpoint,
+            DevicePushSubscription.p256dh,
+            DevicePushSubscription.auth,
+            DevicePushSubscription.is_active,
+        )
         .join(Device, Device.id == DevicePushSubscription.device_id)
         .join(Employee, Employee.id == Device.employee_id)
         .where(
@@ -538,15 +735,15 @@ def send_push_to_employees(
     if employee_ids:
         stmt = stmt.where(Device.employee_id.in_(employee_ids))
 
-    subscriptions = list(db.scalars(stmt).all())
-    result = send_push_to_subscriptions(
+    targets = [_DevicePushTarget(*row) for row in db.execute(stmt)]
+    result = _send_push_to_device_targets(
         db,
-        subscriptions=subscriptions,
+        targets=targets,
         title=title,
         body=body,
         data=data,
     )
-    result["employee_ids"] = sorted({item.device.employee_id for item in subscriptions if item.device is not None})
+    result["employee_ids"] = sorted({item.employee_id for item in targets if item.employee_id is not None})
     return result
 
 
@@ -557,27 +754,53 @@ def send_push_to_admin_subscriptions(
     title: str,
     body: str,
     data: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    return _send_push_to_admin_targets(
+        db,
+        targets=[
+            _AdminPushTarget(
+                id=row.id,
+                admin_user_id=row.admin_user_id,
+                admin_username=row.admin_username,
+                endpoint=row.endpoint,
+                p256dh=row.p256dh,
+                auth=row.auth,
+            )
+            for row in subscriptions
+        ],
+        title=title,
+        body=body,
+        data=data,
+    )
+
+
+def _send_push_to_admin_targets(
+    db: Session,
+    *,
+    targets: Sequence[_AdminPushTarget],
+    title: str,
+    body: str,
+    data: dict[str, Any] | None,
 ) -> dict[str, Any]:
     sent = 0
     failed = 0
     deactivated = 0
     failures: list[dict[str, Any]] = []
     deliveries: list[dict[str, Any]] = []
+    sent_ids: list[int] = []
+    failed_updates: list[dict[str, Any]] = []
     now_utc = _utcnow()
+    results = _send_to_subscription_rows(
+        [(row.endpoint, row.p256dh, row.auth) for row in targets],
+        title=title,
+        body=body,
+        data=data,
+    )
 
-    for row in subscriptions:
-        ok, error_text, status_code = _send_to_subscription_row(
-            endpoint=row.endpoint,
-            p256dh=row.p256dh,
-            auth_key=row.auth,
-            title=title,
-            body=body,
-            data=data,
-        )
-        row.last_seen_at = now_utc
+    for row, (ok, error_text, status_code) in zip(targets, results):
         if ok:
             sent += 1
-            row.last_error = None
+            sent_ids.append(row.id)
             deliveries.append(
                 {
                     "subscription_id": row.id,
@@ -590,7 +813,7 @@ def send_push_to_admin_subscriptions(
             continue
 
         failed += 1
-        row.last_error = error_text
+        failed_updates.append({"id": row.id, "last_error": error_text, "last_seen_at": now_utc})
         failures.append(
             {
                 "subscription_id": row.id,
@@ -613,9 +836,16 @@ def send_push_to_admin_subscriptions(
             }
         )
 
+    _apply_push_delivery_outcomes(
+        db,
+        AdminPushSubscription,
+        sent_ids=sent_ids,
+        failed_updates=failed_updates,
+        now_utc=now_utc,
+    )
     db.commit()
     return {
-        "total_targets": len(subscriptions),
+        "total_targets": len(targets),
         "sent": sent,
         "failed": failed,
         "deactivated": deactivated,
@@ -633,7 +863,14 @@ def send_push_to_admins(
     data: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
     stmt = (
-        select(AdminPushSubscription)
+        select(
+            AdminPushSubscription.id,
+            AdminPushSubscription.admin_user_id,
+            AdminPushSubscription.admin_username,
+            AdminPushSubscription.endpoint,
+            AdminPushSubscription.p256dh,
+            AdminPushSubscription.auth,
+        )
         .outerjoin(AdminUser, AdminUser.id == AdminPushSubscription.admin_user_id)
         .where(
             AdminPushSubscription.is_active.is_(True),
@@ -644,18 +881,18 @@ def send_push_to_admins(
     if admin_user_ids:
         stmt = stmt.where(AdminPushSubscription.admin_user_id.in_(admin_user_ids))
 
-    subscriptions = list(db.scalars(stmt).all())
-    result = send_push_to_admin_subscriptions(
+    targets = [_AdminPushTarget(*row) for row in db.execute(stmt)]
+    result = _send_push_to_admin_targets(
         db,
-        subscriptions=subscriptions,
+        targets=targets,
         title=title,
         body=body,
         data=data,
     )
     result["admin_user_ids"] = sorted(
-        {item.admin_user_id for item in subscriptions if item.admin_user_id is not None}
+        {item.admin_user_id for item in targets if item.admin_user_id is not None}
     )
-    result["admin_usernames"] = sorted({item.admin_username for item in subscriptions if item.admin_username})
+    result["admin_usernames"] = sorted({item.admin_username for item in targets if item.admin_username})
     return result
 
 
@@ -700,23 +937,40 @@ def run_admin_push_claim_health_check(
     max_batch = max(1, int(batch_size or settings.admin_push_healthcheck_batch_size or 0))
     stale_cutoff = now_utc - timedelta(minutes=stale_minutes)
 
-    rows = list_active_admin_push_subscriptions(db)
-    stale_rows: list[AdminPushSubscription] = []
-    for row in rows:
-        row_last_seen_at = _as_utc_datetime(row.last_seen_at)
-        has_error = bool((row.last_error or "").strip())
-        is_stale = row_last_seen_at is None or row_last_seen_at < stale_cutoff
-        if has_error or is_stale:
-            stale_rows.append(row)
-
-    stale_rows.sort(
-        key=lambda row: (
-            0 if bool((row.last_error or "").strip()) else 1,
-            _as_utc_datetime(row.last_seen_at) or datetime.min.replace(tzinfo=timezone.utc),
-            row.id,
+    has_error = func.length(func.trim(func.coalesce(AdminPushSubscription.last_error, ""))) > 0
+    is_stale = or_(
+        AdminPushSubscription.last_seen_at.is_(None),
+        AdminPushSubscription.last_seen_at < stale_cutoff,
+    )
+    active_filters = (
+        AdminPushSubscription.is_active.is_(True),
+        (AdminPushSubscription.admin_user_id.is_(None) | AdminUser.is_active.is_(True)),
+    )
+    counts = db.execute(
+        select(
+            func.count().label("total_active"),
+            func.count().filter(or_(has_error, is_stale)).label("stale_candidates"),
+            func.count().filter(and_(~has_error, ~is_stale)).label("healthy_active"),
+            func.count().filter(has_error).label("with_error_active"),
+            func.count().filter(is_stale).label("stale_active"),
         )
+        .select_from(AdminPushSubscription)
+        .outerjoin(AdminUser, AdminUser.id == AdminPushSubscription.admin_user_id)
+        .where(*active_filters)
+    ).one()
+    checked_ids = list(
+        db.execute(
+            select(AdminPushSubscription.id)
+            .outerjoin(AdminUser, AdminUser.id == AdminPushSubscription.admin_user_id)
+            .where(*active_filters, or_(has_error, is_stale))
+            .order_by(
+                case((has_error, 0), else_=1),
+                AdminPushSubscription.last_seen_at.asc().nulls_first(),
+                AdminPushSubscription.id.asc(),
+            )
+            .limit(max_batch)
+        ).scalars().all()
     )
-    checked_rows = stale_rows[:max_batch]
 
     ping_summary: dict[str, Any] = {
         "total_targets": 0,
@@ -724,39 +978,25 @@ def run_admin_push_claim_health_check(
         "failed": 0,
         "deactivated": 0,
     }
-    if checked_rows:
+    if checked_ids:
         # Passive health mode: do not emit silent push pings.
         # Browsers may penalize subscriptions that receive background pushes
         # without a user-visible notification, which hurts reliability on mobile.
-        ping_summary["total_targets"] = len(checked_rows)
-
-    healthy_active = 0
-    with_error_active = 0
-    stale_active = 0
-    for row in rows:
-        row_last_seen_at = _as_utc_datetime(row.last_seen_at)
-        has_error = bool((row.last_error or "").strip())
-        is_stale = row_last_seen_at is None or row_last_seen_at < stale_cutoff
-        if has_error:
-            with_error_active += 1
-        if is_stale:
-            stale_active += 1
-        if (not has_error) and (not is_stale):
-            healthy_active += 1
+        ping_summary["total_targets"] = len(checked_ids)
 
     return {
         "push_enabled": True,
         "checked_at_utc": now_utc.isoformat(),
         "stale_after_minutes": stale_minutes,
-        "total_active": len(rows),
-        "stale_candidates": len(stale_rows),
-        "checked": len(checked_rows),
-        "healthy_active": healthy_active,
-        "with_error_active": with_error_active,
-        "stale_active": stale_active,
+        "total_active": int(counts.total_active or 0),
+        "stale_candidates": int(counts.stale_candidates or 0),
+        "checked": len(checked_ids),
+        "healthy_active": int(counts.healthy_active or 0),
+        "with_error_active": int(counts.with_error_active or 0),
+        "stale_active": int(counts.stale_active or 0),
         "ping_total_targets": int(ping_summary.get("total_targets", 0)),
         "ping_sent": int(ping_summary.get("sent", 0)),
         "ping_failed": int(ping_summary.get("failed", 0)),
         "ping_deactivated": int(ping_summary.get("deactivated", 0)),
-        "checked_subscription_ids": [int(row.id) for row in checked_rows],
+        "checked_subscription_ids": [int(subscription_id) for subscription_id in checked_ids],
     }
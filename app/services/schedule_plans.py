@@ -97,3 +97,44 @@ def resolve_effective_plan_for_employee_day(
         end_date=day_date,
     )
     return resolve_best_plan_for_day(plans, employee_id=employee.id, day_date=day_date)
+
+
+def resolve_effective_plans_for_employees_day(
+    db: Session,
+    *,
+    employees: list[Employee],
+    day_date: date,
+) -> dict[int, DepartmentSchedulePlan]:
+    department_ids = sorted(
+        {employee.department_id for employee in employees if employee.department_id is not None}
+    )
+    if not department_ids:
+        return {}
+
+    plans = db.scalars(
+        select(DepartmentSchedulePlan)
+        .options(selectinload(DepartmentSchedulePlan.target_employees))
+        .where(
+            DepartmentSchedulePlan.department_id.in_(department_ids),
+            DepartmentSchedulePlan.is_active.is_(True),
+            DepartmentSchedulePlan.start_date <= day_date,
+            DepartmentSchedulePlan.end_date >= day_date,
+        )
+        .order_by(DepartmentSchedulePlan.id.asc())
+    ).all()
+    plans_by_department: dict[int, list[DepartmentSchedulePlan]] = {}
+    for plan in plans:
+        plans_by_department.setdefault(plan.department_id, []).append(plan)
+
+    resolved: dict[int, DepartmentSchedulePlan] = {}
+    for employee in employees:
+        if employee.department_id is None:
+            continue
+        plan = resolve_best_plan_for_day(
+            plans_by_department.get(employee.department_id, []),
+            employee_id=employee.id,
+            day_date=day_date,
+        )
+        if plan is not None:
+            resolved[employee.id] = plan
+    return resolved
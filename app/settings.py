@@ -32,6 +32,9 @@ class Settings(BaseSettings):
     notification_worker_enabled: bool = True
     notification_worker_interval_seconds: int = 60
     notification_email_enabled: bool = False
+    # AUDIT_COMMIT_ASYNC=true commits notification audit rows with
+    # synchronous_commit=off; rows from the last moments before a crash may be lost.
+    audit_commit_async: bool = False
     admin_push_healthcheck_enabled: bool = True
     admin_push_healthcheck_interval_seconds: int = 1800
     admin_push_healthcheck_stale_minutes: int = 720
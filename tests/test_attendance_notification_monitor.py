@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import hashlib
 import unittest
+from dataclasses import replace
+from types import SimpleNamespace
 from datetime import date, datetime, time, timezone, timedelta
 from unittest.mock import patch
 
@@ -15,8 +17,11 @@ from app.services.attendance_notification_monitor import (
     TYPE_OVERRIDE_INFO,
     TYPE_OVERTIME_6H_CLOSED,
     DayAssessment,
+    _build_event_identity,
     _is_checkin_outside_shift,
     _create_notification_job,
+    _load_existing_event_hashes,
+    _resolve_shift_for_day,
     _schedule_absence,
     _schedule_early_checkout,
     _schedule_late_checkin,
@@ -128,6 +133,99 @@ class AttendanceNotificationMonitorTests(unittest.TestCase):
         self.assertIsNone(job)
         self.assertEqual(session.added, [])
 
+    def test_existing_event_hash_lookup_includes_jobs_without_local_day(self) -> None:
+        statements: list[str] = []
+
+        class _HashSession:
+            def scalars(self, statement):  # type: ignore[no-untyped-def]
+                statements.append(str(statement.compile(compile_kwargs={"literal_binds": True})))
+                return SimpleNamespace(all=lambda: ["legacy-hash", "today-hash"])
+
+        hashes = _load_existing_event_hashes(
+            _HashSession(),  # type: ignore[arg-type]
+            local_days=[date(2026, 3, 1), date(2026, 3, 2)],
+        )
+
+        self.assertEqual(hashes, frozenset({"legacy-hash", "today-hash"}))
+        self.assertIn("notification_jobs.local_day IS NULL", statements[0])
+        self.assertIn("notification_jobs.local_day IN", statements[0])
+
+    def test_resolve_shift_for_day_uses_prefetched_shifts(self) -> None:
+        employee = Employee(id=7, full_name="Ahmet Yilmaz", department_id=10, shift_id=101, is_active=True)
+        shift = DepartmentShift(
+            id=101,
+            department_id=10,
+            name="Gunduz",
+            start_time_local=time(10, 0),
+            end_time_local=time(18, 0),
+            break_minutes=60,
+            is_active=True,
+        )
+        session = _DummySession()
+
+        with (
+            patch(
+                "app.services.attendance_notification_monitor._resolve_department_work_rule",
+                return_value=None,
+            ),
+            patch(
+                "app.services.attendance_notification_monitor.resolve_employee_day_shift_candidates",
+                return_value=[],
+            ),
+            patch.object(session, "get", side_effect=AssertionError("shift should come from the prefetch"), create=True),
+        ):
+            resolved = _resolve_shift_for_day(
+                session,  # type: ignore[arg-type]
+                employee=employee,
+                local_day=date(2026, 3, 1),
+                first_checkin_event=None,
+                plans_by_employee_id={},
+                shifts_by_id={101: shift},
+            )
+
+        self.assertIs(resolved[1], shift)
+        self.assertIs(resolved[2], shift)
+
+    def test_create_notification_job_uses_prefetched_event_hashes(self) -> None:
+        assessment = _build_assessment(override_active=False, checkout_ts_utc=datetime(2026, 3, 1, 14, 0, tzinfo=timezone.utc))
+        _event_id, event_hash = _build_event_identity(
+            employee_id=assessment.employee.id,
+            local_day=assessment.local_day,
+            notification_type=TYPE_EARLY_CHECKOUT,
+            audience=AUDIENCE_ADMIN,
+        )
+        job_kwargs = {
+            "notification_type": TYPE_EARLY_CHECKOUT,
+            "audience": AUDIENCE_ADMIN,
+            "risk_level": "Uyari",
+            "event_ts_utc": datetime(2026, 3, 1, 14, 0, tzinfo=timezone.utc),
+            "scheduled_at_utc": datetime(2026, 3, 1, 14, 0, tzinfo=timezone.utc),
+            "title": "Erken Cikis",
+            "description": "demo",
+            "actual_time_summary": "demo",
+            "suggested_action": "demo",
+        }
+        existing_job = NotificationJob(id=99, job_type="ATTENDANCE_MONITOR", scheduled_at_utc=datetime.now(timezone.utc), status="SENT", attempts=0, idempotency_key="x")
+
+        known_session = _DummySession(scalar_values=[None])
+        known_job = _create_notification_job(
+            known_session,  # type: ignore[arg-type]
+            assessment=replace(assessment, existing_event_hashes=frozenset({event_hash})),
+            **job_kwargs,
+        )
+        fresh_session = _DummySession(scalar_values=[existing_job])
+        fresh_job = _create_notification_job(
+            fresh_session,  # type: ignore[arg-type]
+            assessment=replace(assessment, existing_event_hashes=frozenset()),
+            **job_kwargs,
+        )
+
+        self.assertIsNone(known_job)
+        self.assertEqual(known_session.added, [])
+        self.assertIsNotNone(fresh_job)
+        self.assertEqual(fresh_session.added, [fresh_job])
+        self.assertEqual(fresh_session.scalar_values, [existing_job])
+
     def test_schedule_early_checkout_creates_admin_job_only(self) -> None:
         session = _DummySession(scalar_values=[None])
         assessment = _build_assessment(
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import socket
+import unittest
+from email.message import Message
+from io import BytesIO
+from unittest.mock import patch
+from urllib import error as urllib_error
+
+from app.services.notifications_alerts import _post_json
+
+
+def _http_error(status_code: int, *, retry_after: str | None = None) -> urllib_error.HTTPError:
+    headers = Message()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return urllib_error.HTTPError(
+        "https://hooks.example.com/alarm",
+        status_code,
+        "error",
+        headers,
+        BytesIO(b"upstream error"),
+    )
+
+
+class _OkResponse:
+    status = 204
+    headers = Message()
+
+    def __enter__(self) -> _OkResponse:
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        return None
+
+
+class AlarmPostRetryTests(unittest.TestCase):
+    def _post(self, side_effect: list[object]):  # type: ignore[no-untyped-def]
+        with (
+            patch("app.services.notifications_alerts.urllib_request.urlopen", side_effect=side_effect) as urlopen_mock,
+            patch("app.services.notifications_alerts.time.sleep") as sleep_mock,
+        ):
+            result = _post_json(url="https://hooks.example.com/alarm", payload={"status": "ALARM"})
+        return result, urlopen_mock, sleep_mock
+
+    def test_retries_server_errors_and_honors_retry_after(self) -> None:
+        result, urlopen_mock, sleep_mock = self._post(
+            [_http_error(503, retry_after="3"), _OkResponse()]
+        )
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(urlopen_mock.call_count, 2)
+        self.assertGreaterEqual(sleep_mock.call_args.args[0], 3)
+
+    def test_retries_connection_failures(self) -> None:
+        result, urlopen_mock, _sleep_mock = self._post(
+            [urllib_error.URLError(ConnectionRefusedError("refused")), _OkResponse()]
+        )
+
+        self.assertTrue(result["ok"])
+        self.assertEqual(urlopen_mock.call_count, 2)
+
+    def test_does_not_retry_client_errors_read_timeouts_or_bad_urls(self) -> None:
+        for failure in (_http_error(400), socket.timeout("read timed out"), ValueError("unknown url type")):
+            with self.subTest(failure=type(failure).__name__):
+                result, urlopen_mock, sleep_mock = self._post([failure])
+
+                self.assertFalse(result["ok"])
+                self.assertEqual(urlopen_mock.call_count, 1)
+                sleep_mock.assert_not_called()
+
+    def test_gives_up_when_retry_after_exceeds_the_cap(self) -> None:
+        result, urlopen_mock, sleep_mock = self._post([_http_error(429, retry_after="120")])
+
+        self.assertEqual(result["status_code"], 429)
+        self.assertEqual(urlopen_mock.call_count, 1)
+        sleep_mock.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,12 @@ from __future__ import annotations
 import unittest
 from datetime import date, datetime, time, timezone
 import os
+import smtplib
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from sqlalchemy.dialects import postgresql
+
 from app.models import (
     AdminDailyReportArchive,
     AttendanceEvent,
@@ -25,7 +28,9 @@ from app.services.notifications import (
     JOB_TYPE_ADMIN_MISSING_CHECKIN,
     JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT,
     JOB_TYPE_EMPLOYEE_MISSED_CHECKOUT_NIGHTLY,
+    _admin_notification_emails,
     _ensure_daily_report_notification_job,
+    _load_day_attendance_bounds,
     _is_checkin_outside_shift,
     _build_message_for_job,
     get_daily_report_job_health,
@@ -33,7 +38,9 @@ from app.services.notifications import (
     get_notification_channel_health,
     get_employees_with_open_shift,
     get_employees_with_stale_open_shift,
+    EmailChannel,
     NotificationMessage,
+    _safe_send_email,
     repair_auto_midnight_checkout_events,
     schedule_missing_checkin_notifications,
     send_admin_notification_test_email,
@@ -57,24 +64,48 @@ class _ScalarRows:
     def all(self):
         return self._rows
 
+    def __iter__(self):
+        return iter(self._rows)
+
+    def one(self):
+        return self._rows[0]
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+def _rows_for_statement(statement, rows_by_table):  # type: ignore[no-untyped-def]
+    statement_text = str(statement)
+    # Match the outermost FROM so correlated subqueries on other tables do not win.
+    positions = {
+        table_name: statement_text.find(f"FROM {table_name}")
+        for table_name in rows_by_table
+        if f"FROM {table_name}" in statement_text
+    }
+    if not positions:
+        return []
+    return rows_by_table[min(positions, key=positions.__getitem__)]
+
 
 class _FakeNotificationDB:
-    def __init__(self, *, employees, scalar_values, get_map):
+    def __init__(self, *, employees, scalar_values, get_map, rows_by_table=None):
         self._employees = employees
         self._scalar_values = list(scalar_values)
         self._get_map = get_map
+        self._rows_by_table = {"employees": employees, **(rows_by_table or {})}
 
     def scalars(self, statement):  # type: ignore[no-untyped-def]
-        if "department_weekday_shift_assignments" in str(statement):
-            return _ScalarRows([])
-        return _ScalarRows(self._employees)
+        return _ScalarRows(_rows_for_statement(statement, self._rows_by_table))
 
     def scalar(self, _statement):  # type: ignore[no-untyped-def]
         if not self._scalar_values:
             return None
         return self._scalar_values.pop(0)
 
-    def get(self, model, pk):  # type: ignore[no-untyped-def]
+    def execute(self, _statement):  # type: ignore[no-untyped-def]
+        return _ScalarRows([(None, None)])
+
+    def get(self, model, pk, **_kwargs):  # type: ignore[no-untyped-def]
         return self._get_map.get((model, pk))
 
 
@@ -83,11 +114,22 @@ class _FakeDailyReportJobSession:
         self._existing_job = existing_job
         self.added: list[NotificationJob] = []
 
-    def scalar(self, _statement):  # type: ignore[no-untyped-def]
-        return self._existing_job
-
-    def add(self, job):  # type: ignore[no-untyped-def]
-        self.added.append(job)
+    def execute(self, statement):  # type: ignore[no-untyped-def]
+        values = statement.compile(dialect=postgresql.dialect()).params
+        row_values = {
+            column.key: values[column.key]
+            for column in NotificationJob.__table__.columns
+            if column.key in values
+        }
+        if self._existing_job is None:
+            job = NotificationJob(**row_values)
+            self.added.append(job)
+            return _ScalarRows([(job, True)])
+        if self._existing_job.status not in {"FAILED", "CANCELED"}:
+            return _ScalarRows([])
+        for key in ("status", "scheduled_at_utc", "attempts", "last_error", "payload"):
+            setattr(self._existing_job, key, row_values[key])
+        return _ScalarRows([(self._existing_job, False)])
 
 
 class _FakeDailyReportHealthSession:
@@ -97,12 +139,24 @@ class _FakeDailyReportHealthSession:
         job: NotificationJob | None,
         archive: AdminDailyReportArchive | None = None,
     ):
-        self._scalar_values = [job, archive]
+        self._job = job
+        self._archive = archive
 
-    def scalar(self, _statement):  # type: ignore[no-untyped-def]
-        if not self._scalar_values:
-            return None
-        return self._scalar_values.pop(0)
+    def execute(self, _statement):  # type: ignore[no-untyped-def]
+        if self._job is None and self._archive is None:
+            return _ScalarRows([])
+        archive = self._archive
+        return _ScalarRows(
+            [
+                (
+                    self._job,
+                    archive.id if archive is not None else None,
+                    archive.created_at if archive is not None else None,
+                    archive.employee_count if archive is not None else None,
+                    archive.file_size_bytes if archive is not None else None,
+                )
+            ]
+        )
 
 
 class _FakeMissingCheckinSession:
@@ -112,12 +166,16 @@ class _FakeMissingCheckinSession:
         self.added: list[NotificationJob] = []
         self.commit_count = 0
 
-    def scalars(self, statement):  # type: ignore[no-untyped-def]
+    def scalars(self, statement, params=None):  # type: ignore[no-untyped-def]
+        if params is not None:
+            inserted = [NotificationJob(**row) for row in params]
+            self.added.extend(inserted)
+            return _ScalarRows(inserted)
         if "department_weekday_shift_assignments" in str(statement):
             return _ScalarRows([])
         return _ScalarRows(self._events)
 
-    def get(self, model, pk):  # type: ignore[no-untyped-def]
+    def get(self, model, pk, **_kwargs):  # type: ignore[no-untyped-def]
         return self._get_map.get((model, pk))
 
     def scalar(self, _statement):  # type: ignore[no-untyped-def]
@@ -131,23 +189,22 @@ class _FakeMissingCheckinSession:
 
 
 class _FakeAutoCheckoutRepairSession:
-    def __init__(self, *, events, scalar_values, get_map):
+    def __init__(self, *, events, scalar_values, get_map, rows_by_table=None):
         self._events = events
         self._scalar_values = list(scalar_values)
         self._get_map = get_map
+        self._rows_by_table = {"attendance_events": events, **(rows_by_table or {})}
         self.commit_count = 0
 
     def scalars(self, statement):  # type: ignore[no-untyped-def]
-        if "department_weekday_shift_assignments" in str(statement):
-            return _ScalarRows([])
-        return _ScalarRows(self._events)
+        return _ScalarRows(_rows_for_statement(statement, self._rows_by_table))
 
     def scalar(self, _statement):  # type: ignore[no-untyped-def]
         if not self._scalar_values:
             return None
         return self._scalar_values.pop(0)
 
-    def get(self, model, pk):  # type: ignore[no-untyped-def]
+    def get(self, model, pk, **_kwargs):  # type: ignore[no-untyped-def]
         return self._get_map.get((model, pk))
 
     def commit(self) -> None:
@@ -159,10 +216,20 @@ class _FakeScheduledNotificationTaskSession:
         self._tasks = list(tasks or [])
         self._scalar_values = list(scalar_values or [])
         self.added: list[object] = []
+        self.executed: list[tuple[object, object]] = []
         self.commit_count = 0
         self.flush_count = 0
 
-    def scalars(self, statement):  # type: ignore[no-untyped-def]
+    def execute(self, statement, params=None):  # type: ignore[no-untyped-def]
+        self.executed.append((statement, params))
+        return None
+
+    def scalars(self, statement, params=None):  # type: ignore[no-untyped-def]
+        if params is not None:
+            inserted = [NotificationJob(**row) for row in params]
+            for job in inserted:
+                self.add(job)
+            return _ScalarRows(inserted)
         statement_text = str(statement)
         if "scheduled_notification_tasks" in statement_text:
             return _ScalarRows(self._tasks)
@@ -197,11 +264,14 @@ class _FakeNotificationRunnerSession:
         self.commit_count = 0
         self.refresh_count = 0
 
-    def get(self, model, pk):  # type: ignore[no-untyped-def]
+    def get(self, model, pk, **_kwargs):  # type: ignore[no-untyped-def]
         if model is NotificationJob and pk == self.job.id:
             return self.job
         return None
 
+    def execute(self, _statement):  # type: ignore[no-untyped-def]
+        return _ScalarRows([])
+
     def commit(self) -> None:
         self.commit_count += 1
 
@@ -215,11 +285,14 @@ class _FakeMultiNotificationRunnerSession:
         self.commit_count = 0
         self.refresh_count = 0
 
-    def get(self, model, pk):  # type: ignore[no-untyped-def]
+    def get(self, model, pk, **_kwargs):  # type: ignore[no-untyped-def]
         if model is NotificationJob:
             return self.jobs.get(int(pk))
         return None
 
+    def execute(self, _statement):  # type: ignore[no-untyped-def]
+        return _ScalarRows([])
+
     def commit(self) -> None:
         self.commit_count += 1
 
@@ -277,16 +350,16 @@ class NotificationServiceTests(unittest.TestCase):
 
         fake_db = _FakeNotificationDB(
             employees=[employee],
-            scalar_values=[
-                first_in,  # first IN event
-                None,      # no OUT event -> open shift
-                None,      # no manual override
-                work_rule, # work rule
-            ],
-            get_map={(DepartmentShift, 100): shift},
+            scalar_values=[],
+            get_map={},
+            rows_by_table={
+                "attendance_events": [first_in],  # no OUT event -> open shift
+                "work_rules": [work_rule],
+                "department_shifts": [shift],
+            },
         )
 
-        with patch("app.services.notifications.resolve_effective_plan_for_employee_day", return_value=None):
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
             results = get_employees_with_open_shift(
                 now_utc=datetime(2026, 2, 8, 22, 30, tzinfo=timezone.utc),  # local day is 2026-02-09
                 db=fake_db,
@@ -330,11 +403,16 @@ class NotificationServiceTests(unittest.TestCase):
 
         fake_db = _FakeNotificationDB(
             employees=[employee],
-            scalar_values=[first_in, None, None, work_rule],
-            get_map={(DepartmentShift, 101): shift},
+            scalar_values=[],
+            get_map={},
+            rows_by_table={
+                "attendance_events": [first_in],
+                "work_rules": [work_rule],
+                "department_shifts": [shift],
+            },
         )
 
-        with patch("app.services.notifications.resolve_effective_plan_for_employee_day", return_value=None):
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
             results = get_employees_with_open_shift(
                 now_utc=datetime(2026, 2, 9, 20, 0, tzinfo=timezone.utc),  # local day: 2026-02-09
                 db=fake_db,
@@ -347,6 +425,71 @@ class NotificationServiceTests(unittest.TestCase):
         self.assertEqual(record.grace_deadline_utc, datetime(2026, 2, 10, 3, 5, tzinfo=timezone.utc))
         self.assertEqual(record.escalation_deadline_utc, datetime(2026, 2, 10, 3, 35, tzinfo=timezone.utc))
 
+    def test_open_shift_batch_skips_checked_out_employees(self) -> None:
+        department = Department(id=14, name="Depo")
+        open_employee = Employee(id=5, full_name="Open User", department_id=14, shift_id=103, is_active=True)
+        closed_employee = Employee(id=6, full_name="Closed User", department_id=14, shift_id=103, is_active=True)
+        open_employee.department = department
+        closed_employee.department = department
+        shift = DepartmentShift(
+            id=103,
+            department_id=14,
+            name="Gunduz 08-17",
+            start_time_local=time(8, 0),
+            end_time_local=time(17, 0),
+            break_minutes=60,
+            is_active=True,
+        )
+        events = [
+            AttendanceEvent(
+                id=51,
+                employee_id=5,
+                device_id=1,
+                type=AttendanceType.IN,
+                ts_utc=datetime(2026, 2, 9, 5, 0, tzinfo=timezone.utc),
+                location_status=LocationStatus.NO_LOCATION,
+                flags={},
+            ),
+            AttendanceEvent(
+                id=61,
+                employee_id=6,
+                device_id=2,
+                type=AttendanceType.IN,
+                ts_utc=datetime(2026, 2, 9, 5, 5, tzinfo=timezone.utc),
+                location_status=LocationStatus.NO_LOCATION,
+                flags={},
+            ),
+            AttendanceEvent(
+                id=62,
+                employee_id=6,
+                device_id=2,
+                type=AttendanceType.OUT,
+                ts_utc=datetime(2026, 2, 9, 9, 0, tzinfo=timezone.utc),
+                location_status=LocationStatus.NO_LOCATION,
+                flags={},
+            ),
+        ]
+
+        fake_db = _FakeNotificationDB(
+            employees=[open_employee, closed_employee],
+            scalar_values=[],
+            get_map={},
+            rows_by_table={
+                "attendance_events": events,
+                "department_shifts": [shift],
+            },
+        )
+
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
+            results = get_employees_with_open_shift(
+                now_utc=datetime(2026, 2, 9, 10, 0, tzinfo=timezone.utc),
+                db=fake_db,
+            )
+
+        self.assertEqual([record.employee_id for record in results], [5])
+        self.assertEqual(results[0].department_name, "Depo")
+        self.assertEqual(results[0].shift_name, "Gunduz 08-17")
+
     def test_manual_override_with_checkout_finalizes_day(self) -> None:
         employee = Employee(id=3, full_name="Override User", department_id=12, shift_id=None, is_active=True)
         first_in = AttendanceEvent(
@@ -370,15 +513,15 @@ class NotificationServiceTests(unittest.TestCase):
 
         fake_db = _FakeNotificationDB(
             employees=[employee],
-            scalar_values=[
-                first_in,  # first IN
-                None,      # no OUT
-                override,  # manual override closes day
-            ],
+            scalar_values=[],
             get_map={},
+            rows_by_table={
+                "attendance_events": [first_in],  # no OUT
+                "manual_day_overrides": [override],  # manual override closes day
+            },
         )
 
-        with patch("app.services.notifications.resolve_effective_plan_for_employee_day", return_value=None):
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
             results = get_employees_with_open_shift(
                 now_utc=datetime(2026, 2, 9, 10, 0, tzinfo=timezone.utc),
                 db=fake_db,
@@ -416,15 +559,16 @@ class NotificationServiceTests(unittest.TestCase):
 
         fake_db = _FakeNotificationDB(
             employees=[employee],
-            scalar_values=[
-                latest_open_in,  # latest event is open IN
-                None,            # no manual override
-                work_rule,       # work rule
-            ],
-            get_map={(DepartmentShift, 102): shift},
+            scalar_values=[],
+            get_map={},
+            rows_by_table={
+                "attendance_events": [latest_open_in],  # latest event is open IN
+                "work_rules": [work_rule],
+                "department_shifts": [shift],
+            },
         )
 
-        with patch("app.services.notifications.resolve_effective_plan_for_employee_day", return_value=None):
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
             results = get_employees_with_stale_open_shift(
                 now_utc=datetime(2026, 2, 23, 9, 0, tzinfo=timezone.utc),
                 db=fake_db,
@@ -657,22 +801,26 @@ class NotificationServiceTests(unittest.TestCase):
             note="Sistem gece 00:00 otomatik cikis",
         )
         auto_out_event.employee = employee
+        employee_auto_job = NotificationJob(
+            id=501,
+            employee_id=11,
+            job_type=JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT,
+            payload={"shift_date": "2026-02-13"},
+            scheduled_at_utc=datetime(2026, 2, 13, 21, 0, tzinfo=timezone.utc),
+            status="PENDING",
+            attempts=0,
+            idempotency_key=f"{JOB_TYPE_EMPLOYEE_AUTO_MIDNIGHT_CHECKOUT}:11:2026-02-13",
+        )
         fake_db = _FakeAutoCheckoutRepairSession(
             events=[auto_out_event],
             scalar_values=[
                 first_in_event,  # first IN for repair lookup
-                None,            # no manual override
-                None,            # no work rule
-                None,            # no employee auto job
-                None,            # no admin auto job
             ],
-            get_map={
-                (DepartmentShift, 301): shift,
-                (Department, 31): department,
-            },
+            get_map={},
+            rows_by_table={"department_shifts": [shift], "notification_jobs": [employee_auto_job]},
         )
 
-        with patch("app.services.notifications.resolve_effective_plan_for_employee_day", return_value=None):
+        with patch("app.services.notifications.resolve_effective_plans_for_employees_day", return_value={}):
             repaired = repair_auto_midnight_checkout_events(
                 now_utc=datetime(2026, 2, 14, 1, 0, tzinfo=timezone.utc),
                 db=fake_db,  # type: ignore[arg-type]
@@ -682,6 +830,35 @@ class NotificationServiceTests(unittest.TestCase):
         self.assertEqual(auto_out_event.ts_utc, datetime(2026, 2, 13, 14, 30, tzinfo=timezone.utc))
         self.assertEqual(auto_out_event.note, "Sistem gece 00:00 otomatik cikis tetikledi")
         self.assertGreaterEqual(fake_db.commit_count, 1)
+        self.assertEqual(employee_auto_job.payload["shift_date"], "2026-02-13")
+        self.assertEqual(employee_auto_job.payload["auto_checkout_utc"], "2026-02-13T14:30:00+00:00")
+
+    def test_day_attendance_bounds_pick_first_in_and_last_out_per_employee_day(self) -> None:
+        rows = [
+            (7, AttendanceType.IN, datetime(2026, 2, 12, 8, 0, tzinfo=timezone.utc)),
+            (7, AttendanceType.IN, datetime(2026, 2, 12, 7, 30, tzinfo=timezone.utc)),
+            (7, AttendanceType.OUT, datetime(2026, 2, 12, 12, 0, tzinfo=timezone.utc)),
+            (7, AttendanceType.OUT, datetime(2026, 2, 12, 17, 0, tzinfo=timezone.utc)),
+            (7, AttendanceType.IN, datetime(2026, 2, 13, 7, 0, tzinfo=timezone.utc)),
+            (8, AttendanceType.OUT, datetime(2026, 2, 13, 16, 0, tzinfo=timezone.utc)),
+        ]
+        session = SimpleNamespace(execute=lambda _statement: _ScalarRows(rows))
+        with patch("app.services.notifications._attendance_timezone", return_value=timezone.utc):
+            bounds = _load_day_attendance_bounds(
+                session,  # type: ignore[arg-type]
+                keys={(7, date(2026, 2, 12)), (8, date(2026, 2, 13))},
+            )
+
+        self.assertEqual(
+            bounds,
+            {
+                (7, date(2026, 2, 12)): (
+                    datetime(2026, 2, 12, 7, 30, tzinfo=timezone.utc),
+                    datetime(2026, 2, 12, 17, 0, tzinfo=timezone.utc),
+                ),
+                (8, date(2026, 2, 13)): (None, datetime(2026, 2, 13, 16, 0, tzinfo=timezone.utc)),
+            },
+        )
 
     def test_admin_escalation_message_is_detailed(self) -> None:
         employee = Employee(id=7, full_name="Hüseyincan Orman", department_id=10, shift_id=100, is_active=True)
@@ -781,6 +958,31 @@ class NotificationServiceTests(unittest.TestCase):
         self.assertEqual(existing_job.payload.get("archive_id"), 99)
         self.assertEqual(existing_job.payload.get("file_name"), "puantaj-gunluk-2026-02-19.xlsx")
 
+    def test_ensure_daily_report_job_leaves_sent_job_unchanged(self) -> None:
+        existing_job = NotificationJob(
+            id=89,
+            job_type="ADMIN_DAILY_REPORT_READY",
+            payload={"report_date": "2026-02-19", "archive_id": 55},
+            scheduled_at_utc=datetime(2026, 2, 20, 0, 0, tzinfo=timezone.utc),
+            status="SENT",
+            attempts=1,
+            idempotency_key="ADMIN_DAILY_REPORT_READY:2026-02-19",
+        )
+        fake_session = _FakeDailyReportJobSession(existing_job=existing_job)
+
+        job, state = _ensure_daily_report_notification_job(
+            fake_session,  # type: ignore[arg-type]
+            report_date=date(2026, 2, 19),
+            archive_id=99,
+            file_name="puantaj-gunluk-2026-02-19.xlsx",
+            scheduled_at_utc=datetime(2026, 2, 21, 0, 1, tzinfo=timezone.utc),
+        )
+
+        self.assertIsNone(job)
+        self.assertEqual(state, "unchanged")
+        self.assertEqual(existing_job.status, "SENT")
+        self.assertEqual(existing_job.payload.get("archive_id"), 55)
+
     def test_daily_report_health_alarm_when_job_missing_after_window(self) -> None:
         fake_session = _FakeDailyReportHealthSession(job=None, archive=None)
         with patch("app.services.notifications._attendance_timezone", return_value=timezone.utc):
@@ -904,6 +1106,122 @@ class NotificationServiceTests(unittest.TestCase):
         self.assertEqual(result["mode"], "send_exception")
         self.assertIn("smtp_down", str(result.get("error")))
 
+    def test_admin_notification_emails_are_resolved_once_per_session(self) -> None:
+        session = SimpleNamespace(info={})
+        with patch(
+            "app.services.notifications.get_admin_notification_email_recipients",
+            return_value=["admin@example.com"],
+        ) as recipients_mock:
+            first = _admin_notification_emails(session)  # type: ignore[arg-type]
+            first.append("mutated@example.com")
+            second = _admin_notification_emails(session)  # type: ignore[arg-type]
+
+        self.assertEqual(second, ["admin@example.com"])
+        recipients_mock.assert_called_once()
+
+    def test_email_channel_batch_reuses_one_smtp_connection(self) -> None:
+        env = {"SMTP_HOST": "smtp.example.com", "SMTP_FROM": "noreply@example.com", "SMTP_USE_TLS": "false"}
+        message = NotificationMessage(recipients=["admin@example.com"], subject="test", body="body")
+        with (
+            patch.dict(os.environ, env, clear=True),
+            patch("app.services.notifications.get_settings", return_value=SimpleNamespace(notification_email_enabled=True)),
+            patch("app.services.notifications.smtplib.SMTP") as smtp_factory,
+        ):
+            smtp_client = smtp_factory.return_value
+            smtp_client.noop.return_value = (250, b"OK")
+            with EmailChannel() as channel:
+                first = channel.send(message)
+                second = channel.send(message)
+
+        self.assertEqual(first["mode"], "sent")
+        self.assertEqual(second["mode"], "sent")
+        self.assertEqual(smtp_factory.call_count, 1)
+        self.assertEqual(smtp_client.send_message.call_count, 2)
+        smtp_client.noop.assert_not_called()
+        smtp_client.quit.assert_called_once()
+
+    def test_email_channel_batch_reconnects_idle_connection_after_socket_error(self) -> None:
+        env = {"SMTP_HOST": "smtp.example.com", "SMTP_FROM": "noreply@example.com", "SMTP_USE_TLS": "false"}
+        message = NotificationMessage(recipients=["admin@example.com"], subject="test", body="body")
+        with (
+            patch.dict(os.environ, env, clear=True),
+            patch("app.services.notifications.get_settings", return_value=SimpleNamespace(notification_email_enabled=True)),
+            patch("app.services.notifications.smtplib.SMTP") as smtp_factory,
+            patch("app.services.notifications.monotonic", side_effect=[100.0, 100.0, 200.0, 200.0, 200.0]),
+        ):
+            smtp_client = smtp_factory.return_value
+            smtp_client.noop.side_effect = ConnectionResetError("connection reset by peer")
+            with EmailChannel() as channel:
+                first = channel.send(message)
+                second = channel.send(message)
+
+        self.assertEqual(first["mode"], "sent")
+        self.assertEqual(second["mode"], "sent")
+        smtp_client.noop.assert_called_once()
+        self.assertEqual(smtp_factory.call_count, 2)
+
+    def test_email_channel_batch_refills_one_message_template(self) -> None:
+        env = {"SMTP_HOST": "smtp.example.com", "SMTP_FROM": "noreply@example.com"}
+        with (
+            patch.dict(os.environ, env, clear=True),
+            patch("app.services.notifications.get_settings", return_value=SimpleNamespace(notification_email_enabled=True)),
+        ):
+            with EmailChannel() as channel:
+                first = channel._build_email_message(recipients=["a@example.com"], subject="ilk", body="bir")
+                second = channel._build_email_message(recipients=["b@example.com"], subject="ikinci", body="iki")
+            standalone = channel._build_email_message(recipients=["c@example.com"], subject="tek", body="uc")
+
+        self.assertIs(first, second)
+        self.assertEqual(second.get_all("To"), ["b@example.com"])
+        self.assertEqual(second.get_all("Subject"), ["ikinci"])
+        self.assertEqual(second.get_all("From"), ["noreply@example.com"])
+        self.assertEqual(second.get_content().strip(), "iki")
+        self.assertIsNot(standalone, second)
+
+    def test_email_channel_batch_aborts_after_repeated_failures(self) -> None:
+        env = {"SMTP_HOST": "smtp.example.com", "SMTP_FROM": "noreply@example.com", "SMTP_USE_TLS": "false"}
+        message = NotificationMessage(recipients=["admin@example.com"], subject="test", body="body")
+        with (
+            patch.dict(os.environ, env, clear=True),
+            patch("app.services.notifications.get_settings", return_value=SimpleNamespace(notification_email_enabled=True)),
+            patch("app.services.notifications.smtplib.SMTP") as smtp_factory,
+        ):
+            smtp_factory.return_value.send_message.side_effect = smtplib.SMTPServerDisconnected("smtp_down")
+            with EmailChannel() as channel:
+                results = [_safe_send_email(channel, message) for _ in range(4)]
+
+        self.assertEqual(
+            [result["mode"] for result in results],
+            ["send_exception", "send_exception", "send_exception", "batch_aborted"],
+        )
+        self.assertEqual(smtp_factory.return_value.send_message.call_count, 3)
+
+    def test_email_channel_batch_keeps_going_after_refused_recipient(self) -> None:
+        env = {"SMTP_HOST": "smtp.example.com", "SMTP_FROM": "noreply@example.com", "SMTP_USE_TLS": "false"}
+        message = NotificationMessage(recipients=["admin@example.com"], subject="test", body="body")
+        with (
+            patch.dict(os.environ, env, clear=True),
+            patch("app.services.notifications.get_settings", return_value=SimpleNamespace(notification_email_enabled=True)),
+            patch("app.services.notifications.smtplib.SMTP") as smtp_factory,
+        ):
+            smtp_client = smtp_factory.return_value
+            smtp_client.noop.return_value = (250, b"OK")
+            smtp_client.send_message.side_effect = [
+                smtplib.SMTPRecipientsRefused({"bad@example.com": (550, b"unknown user")}),
+                None,
+                None,
+                None,
+            ]
+            with EmailChannel() as channel:
+                results = [_safe_send_email(channel, message) for _ in range(4)]
+
+        self.assertEqual(
+            [result["mode"] for result in results],
+            ["send_exception", "sent", "sent", "sent"],
+        )
+        self.assertEqual(smtp_factory.call_count, 1)
+        smtp_client.close.assert_not_called()
+
     def test_send_pending_notifications_soft_skips_zero_target_jobs(self) -> None:
         job = NotificationJob(
             id=1339,
@@ -921,7 +1239,7 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job]),
             patch(
@@ -938,7 +1256,7 @@ class NotificationServiceTests(unittest.TestCase):
                 },
             ),
             patch("app.services.notifications._record_delivery_logs", return_value=None),
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -970,7 +1288,7 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job]),
             patch(
@@ -988,7 +1306,7 @@ class NotificationServiceTests(unittest.TestCase):
                 },
             ),
             patch("app.services.notifications._record_delivery_logs", return_value=None),
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -1020,10 +1338,10 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job]),
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -1086,7 +1404,7 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job_one, job_two]),
             patch("app.services.notifications._admin_notification_emails", return_value=["admin@example.com"]),
@@ -1101,7 +1419,7 @@ class NotificationServiceTests(unittest.TestCase):
             ) as push_mock,
             patch("app.services.notifications._send_push_for_job") as single_push_mock,
             patch("app.services.notifications._record_delivery_logs", return_value=None) as delivery_log_mock,
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -1174,7 +1492,7 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job_one, job_two]),
             patch("app.services.notifications._admin_notification_emails", return_value=["admin@example.com"]),
@@ -1189,7 +1507,7 @@ class NotificationServiceTests(unittest.TestCase):
                 },
             ),
             patch("app.services.notifications._record_delivery_logs", return_value=None),
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -1221,10 +1539,10 @@ class NotificationServiceTests(unittest.TestCase):
         with (
             patch(
                 "app.services.notifications.get_settings",
-                return_value=SimpleNamespace(notification_email_enabled=False),
+                return_value=SimpleNamespace(notification_email_enabled=False, audit_commit_async=False),
             ),
             patch("app.services.notifications._claim_due_pending_jobs", return_value=[job]),
-            patch("app.services.notifications.log_audit", return_value=None),
+            patch("app.services.notifications.log_audit_many", return_value=0),
         ):
             processed = send_pending_notifications(
                 limit=10,
@@ -1305,7 +1623,7 @@ class NotificationServiceTests(unittest.TestCase):
             timezone_name="Europe/Istanbul",
             is_active=True,
         )
-        fake_db = _FakeScheduledNotificationTaskSession(tasks=[task], scalar_values=[None])
+        fake_db = _FakeScheduledNotificationTaskSession(tasks=[task])
 
         jobs = enqueue_due_scheduled_notification_tasks(
             now_utc=datetime(2026, 3, 2, 7, 5, tzinfo=timezone.utc),
@@ -1320,6 +1638,10 @@ class NotificationServiceTests(unittest.TestCase):
         self.assertFalse(task.is_active)
         self.assertEqual(task.last_enqueued_local_date, date(2026, 3, 2))
         self.assertGreaterEqual(fake_db.commit_count, 1)
+        audit_batches = [params for _statement, params in fake_db.executed if params]
+        self.assertEqual(len(audit_batches), 1)
+        self.assertEqual(audit_batches[0][0]["action"], "SCHEDULED_NOTIFICATION_TASK_ENQUEUED")
+        self.assertEqual(audit_batches[0][0]["details"]["created_job_ids"], [jobs[0].id])
 
 
 if __name__ == "__main__":
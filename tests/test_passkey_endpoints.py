@@ -161,5 +161,16 @@ class PasskeyEndpointsTests(unittest.TestCase):
         self.assertEqual(body['device_fingerprint'], 'fp-rec-ok')
 
 
+class PasskeyOptionsSerializationTests(unittest.TestCase):
+    def test_json_fallback_matches_options_helper(self) -> None:
+        from webauthn import generate_authentication_options
+
+        from app.services.passkeys import _options_to_json_dict_fallback, options_to_json_dict
+
+        options = generate_authentication_options(rp_id='example.com', challenge=b'0123456789abcdef')
+
+        self.assertEqual(_options_to_json_dict_fallback(options), options_to_json_dict(options))
+
+
 if __name__ == '__main__':
     unittest.main()
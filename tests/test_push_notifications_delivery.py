@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from py_vapid import Vapid
+from py_vapid.utils import b64urlencode
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+
+from app.services.push_notifications import (
+    _send_to_subscription_rows,
+    run_admin_push_claim_health_check,
+    send_push_to_employees,
+    send_push_to_subscriptions,
+)
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.commit_calls = 0
+        self.executed: list[tuple[object, object]] = []
+        self.target_rows: list[tuple] = []
+
+    def execute(self, statement, params=None):
+        if isinstance(statement, Select):
+            return iter(self.target_rows)
+        self.executed.append((statement, params))
+        return None
+
+    def commit(self) -> None:
+        self.commit_calls += 1
+
+
+class _FakeWebPusher:
+    sent: list[tuple[str, dict[str, str]]] = []
+    payloads: list[bytes] = []
+
+    def __init__(self, subscription_info: dict, requests_session=None) -> None:
+        self.endpoint = subscription_info["endpoint"]
+        self.requests_session = requests_session
+
+    def send(self, data, headers, **_kwargs):
+        self.sent.append((self.endpoint, dict(headers)))
+        self.payloads.append(data)
+        return SimpleNamespace(status_code=201, reason="Created", text="")
+
+
+def _vapid_settings() -> SimpleNamespace:
+    vapid = Vapid()
+    vapid.generate_keys()
+    private_raw = vapid.private_key.private_numbers().private_value.to_bytes(32, "big")
+    return SimpleNamespace(
+        push_vapid_private_key=b64urlencode(private_raw),
+        push_vapid_subject="mailto:ops@example.com",
+    )
+
+
+def _subscription(subscription_id: int, *, employee_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=subscription_id,
+        device_id=subscription_id * 10,
+        device=SimpleNamespace(employee_id=employee_id),
+        endpoint=f"https://push.example.com/{subscription_id}",
+        p256dh=f"p256dh-{subscription_id}",
+        auth=f"auth-{subscription_id}",
+        is_active=True,
+        last_error="previous_error",
+        last_seen_at=None,
+    )
+
+
+class PushDeliveryTests(unittest.TestCase):
+    def test_parallel_delivery_results_map_back_to_rows(self) -> None:
+        subscriptions = [_subscription(index, employee_id=100 + index) for index in range(1, 6)]
+
+        def fake_send(*, endpoint: str, **_kwargs):
+            if endpoint.endswith("/2"):
+                return False, "gone", 410
+            if endpoint.endswith("/4"):
+                return False, "timeout", None
+            return True, None, None
+
+        db = _FakeSession()
+        with (
+            patch("app.services.push_notifications.is_push_enabled", return_value=True),
+            patch(
+                "app.services.push_notifications._sign_vapid_headers",
+                side_effect=lambda audiences: {audience: {} for audience in audiences},
+            ) as sign_mock,
+            patch("app.services.push_notifications._deliver_push", side_effect=fake_send),
+        ):
+            result = send_push_to_subscriptions(
+                db,
+                subscriptions=subscriptions,
+                title="Title",
+                body="Body",
+            )
+
+        self.assertEqual(db.commit_calls, 1)
+        self.assertEqual(sign_mock.call_count, 1)
+        self.assertEqual(result["total_targets"], 5)
+        self.assertEqual(result["sent"], 3)
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual(result["deactivated"], 1)
+        self.assertEqual([item["subscription_id"] for item in result["deliveries"]], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [(item["subscription_id"], item["employee_id"], item["status_code"]) for item in result["failures"]],
+            [(2, 102, 410), (4, 104, None)],
+        )
+        self.assertEqual(len(db.executed), 2)
+        sent_statement, sent_params = db.executed[0]
+        self.assertIsNone(sent_params)
+        self.assertEqual(
+            sorted(sent_statement.compile().params["id_1"]),
+            [1, 3, 5],
+        )
+        _failed_statement, failed_params = db.executed[1]
+        self.assertEqual(
+            [(item["id"], item["last_error"], item["is_active"]) for item in failed_params],
+            [(2, "gone", False), (4, "timeout", True)],
+        )
+
+    def test_employee_broadcast_uses_column_rows(self) -> None:
+        db = _FakeSession()
+        db.target_rows = [
+            (1, 10, 7, "https://push.example.com/1", "p256dh-1", "auth-1", True),
+            (2, 20, 3, "https://push.example.com/2", "p256dh-2", "auth-2", True),
+            (3, 30, 7, "https://push.example.com/3", "p256dh-3", "auth-3", True),
+        ]
+        with (
+            patch("app.services.push_notifications.is_push_enabled", return_value=True),
+            patch(
+                "app.services.push_notifications._sign_vapid_headers",
+                side_effect=lambda audiences: {audience: {} for audience in audiences},
+            ),
+            patch("app.services.push_notifications._deliver_push", return_value=(False, "boom", 500)),
+        ):
+            result = send_push_to_employees(db, employee_ids=[3, 7], title="Title", body="Body")
+
+        self.assertEqual(result["employee_ids"], [3, 7])
+        self.assertEqual(result["failed"], 3)
+        self.assertEqual([item["device_id"] for item in result["failures"]], [10, 20, 30])
+        _failed_statement, failed_params = db.executed[0]
+        self.assertEqual([item["id"] for item in failed_params], [1, 2, 3])
+
+    def test_vapid_headers_are_signed_once_per_push_origin(self) -> None:
+        _FakeWebPusher.sent = []
+        _FakeWebPusher.payloads = []
+        targets = [
+            ("https://fcm.googleapis.com/fcm/send/a", "p256dh-a", "auth-a"),
+            ("https://fcm.googleapis.com/fcm/send/b", "p256dh-b", "auth-b"),
+            ("https://updates.push.services.mozilla.com/wpush/v2/c", "p256dh-c", "auth-c"),
+        ]
+        with (
+            patch("app.services.push_notifications.is_push_enabled", return_value=True),
+            patch("app.services.push_notifications.get_settings", return_value=_vapid_settings()),
+            patch("app.services.push_notifications.WebPusher", _FakeWebPusher),
+            patch("app.services.push_notifications.Vapid.sign", autospec=True, side_effect=Vapid.sign) as sign_mock,
+        ):
+            results = _send_to_subscription_rows(targets, title="Title", body="Body", data=None)
+
+        self.assertEqual(results, [(True, None, None)] * 3)
+        self.assertEqual(sign_mock.call_count, 2)
+        headers_by_endpoint = dict(_FakeWebPusher.sent)
+        fcm_a = headers_by_endpoint["https://fcm.googleapis.com/fcm/send/a"]
+        fcm_b = headers_by_endpoint["https://fcm.googleapis.com/fcm/send/b"]
+        mozilla = headers_by_endpoint["https://updates.push.services.mozilla.com/wpush/v2/c"]
+        self.assertEqual(fcm_a["Authorization"], fcm_b["Authorization"])
+        self.assertNotEqual(fcm_a["Authorization"], mozilla["Authorization"])
+        self.assertTrue(fcm_a["Authorization"].startswith("vapid t="))
+        self.assertEqual(fcm_a["Urgency"], "high")
+        self.assertEqual(len({id(payload) for payload in _FakeWebPusher.payloads}), 1)
+        self.assertIn(b'"title": "Title"', _FakeWebPusher.payloads[0])
+
+
+class _FakeHealthCheckSession:
+    def __init__(self, *, counts: SimpleNamespace, checked_ids: list[int]) -> None:
+        self.counts = counts
+        self.checked_ids = checked_ids
+        self.statements: list[str] = []
+
+    def execute(self, statement):
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(compiled)
+        if "count(*)" in compiled:
+            return SimpleNamespace(one=lambda: self.counts)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: list(self.checked_ids)))
+
+
+class AdminPushClaimHealthCheckTests(unittest.TestCase):
+    def test_counts_and_candidates_come_from_sql(self) -> None:
+        db = _FakeHealthCheckSession(
+            counts=SimpleNamespace(
+                total_active=5,
+                stale_candidates=4,
+                healthy_active=1,
+                with_error_active=2,
+                stale_active=3,
+            ),
+            checked_ids=[5, 3, 4],
+        )
+        settings = SimpleNamespace(
+            admin_push_healthcheck_stale_minutes=60,
+            admin_push_healthcheck_batch_size=3,
+        )
+        with (
+            patch("app.services.push_notifications.is_push_enabled", return_value=True),
+            patch("app.services.push_notifications.get_settings", return_value=settings),
+        ):
+            result = run_admin_push_claim_health_check(db=db)
+
+        self.assertEqual(result["total_active"], 5)
+        self.assertEqual(result["healthy_active"], 1)
+        self.assertEqual(result["with_error_active"], 2)
+        self.assertEqual(result["stale_active"], 3)
+        self.assertEqual(result["stale_candidates"], 4)
+        self.assertEqual(result["checked"], 3)
+        self.assertEqual(result["ping_total_targets"], 3)
+        self.assertEqual(result["checked_subscription_ids"], [5, 3, 4])
+        self.assertEqual(len(db.statements), 2)
+        candidate_sql = db.statements[1]
+        self.assertIn("NULLS FIRST", candidate_sql)
+        self.assertIn("LIMIT", candidate_sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
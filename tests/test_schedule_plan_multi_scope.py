@@ -6,9 +6,31 @@ from datetime import date
 from app.models import (
     DepartmentSchedulePlan,
     DepartmentSchedulePlanEmployee,
+    Employee,
     SchedulePlanTargetType,
 )
-from app.services.schedule_plans import plan_applies_to_employee
+from app.services.schedule_plans import (
+    plan_applies_to_employee,
+    resolve_effective_plans_for_employees_day,
+)
+
+
+class _ScalarRows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakePlanSession:
+    def __init__(self, *, plans):
+        self._plans = plans
+        self.scalars_calls = 0
+
+    def scalars(self, _statement):  # type: ignore[no-untyped-def]
+        self.scalars_calls += 1
+        return _ScalarRows(self._plans)
 
 
 class SchedulePlanMultiScopeTests(unittest.TestCase):
@@ -68,6 +90,47 @@ class SchedulePlanMultiScopeTests(unittest.TestCase):
         self.assertTrue(plan_applies_to_employee(plan, employee_id=42))
         self.assertFalse(plan_applies_to_employee(plan, employee_id=41))
 
+    def test_batch_resolution_uses_single_query_for_all_employees(self) -> None:
+        department_plan = DepartmentSchedulePlan(
+            id=10,
+            department_id=10,
+            target_type=SchedulePlanTargetType.DEPARTMENT,
+            target_employee_id=None,
+            start_date=date(2026, 2, 1),
+            end_date=date(2026, 2, 28),
+            is_locked=False,
+            is_active=True,
+        )
+        department_plan.target_employees = []
+        employee_plan = DepartmentSchedulePlan(
+            id=11,
+            department_id=10,
+            target_type=SchedulePlanTargetType.ONLY_EMPLOYEE,
+            target_employee_id=2,
+            start_date=date(2026, 2, 1),
+            end_date=date(2026, 2, 28),
+            is_locked=False,
+            is_active=True,
+        )
+        employee_plan.target_employees = []
+        session = _FakePlanSession(plans=[department_plan, employee_plan])
+        employees = [
+            Employee(id=1, full_name="A", department_id=10, is_active=True),
+            Employee(id=2, full_name="B", department_id=10, is_active=True),
+            Employee(id=3, full_name="C", department_id=None, is_active=True),
+        ]
+
+        plans = resolve_effective_plans_for_employees_day(
+            session,  # type: ignore[arg-type]
+            employees=employees,
+            day_date=date(2026, 2, 10),
+        )
+
+        self.assertEqual(session.scalars_calls, 1)
+        self.assertIs(plans[1], department_plan)
+        self.assertIs(plans[2], employee_plan)
+        self.assertNotIn(3, plans)
+
 
 if __name__ == "__main__":
     unittest.main()